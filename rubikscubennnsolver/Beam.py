@@ -0,0 +1,216 @@
+#!/usr/bin/env python3
+
+"""
+Beam search across the phases of a solver.
+
+Taking the first solution from each phase gives you a short phase but the
+next phase may have a long way to go from there. The TPR 4x4x4 solver (see
+misc/TODO.txt) instead keeps many candidates from each phase:
+
+- find lots of phase1 solutions and keep the best 500, the ones with the
+  lowest phase2 heuristic
+- search phase2 for all 500 in lockstep, every candidate is searched at
+  threshold N before any candidate is searched at threshold N+1. Keep the
+  best 100.
+- do the same for phase3 and keep the best one
+
+beam_search() does that with the solve_many() of each phase's table, the
+IDA phases search every candidate one threshold at a time with
+solve_many_threshold(). A phase stops raising its threshold once it has
+width candidates, it has explored node_budget nodes or it is out of time.
+"""
+
+from rubikscubennnsolver.LookupTable import LookupTableIDA, NoIDASolution
+import logging
+import time
+
+log = logging.getLogger(__name__)
+
+# The smallest transposition table a candidate gets in beam_phase_ida()
+min_transposition_table_bytes = 64 * 1024
+
+
+class BeamPhase(object):
+    """
+    table is the LookupTable/LookupTableIDA for the phase, keep the best width
+    solutions ranked by score (see LookupTable.solve_many()). settings are
+    passed on to the table's solve_many().
+    """
+
+    def __init__(self, table, width, score=None, **settings):
+        self.table = table
+        self.width = width
+        self.score = score
+        self.settings = settings
+
+    def __str__(self):
+        return "%s (width %d)" % (self.table, self.width)
+
+
+def score_with_heuristic(table):
+    """
+    Return a score for solve_many() that adds table's IDA heuristic to the
+    length of the solution, use this to rank the solutions of a phase by how
+    much work the next phase will have to do
+    """
+
+    def score(cube):
+        return cube.get_solution_len_minus_rotates(cube.solution) + table.ida_heuristic()
+
+    return score
+
+
+def beam_keep(results, width):
+    """
+    Keep the best width of the (score, state, solution) results, if several
+    get to the same state keep the one with the best score
+
+    >>> beam_keep([(3, ['a'], ['U']), (1, ['b'], ['F']), (2, ['a'], ['R'])], 5)
+    [(1, ['b'], ['F']), (2, ['a'], ['R'])]
+    """
+    best = {}
+
+    for result in results:
+        key = tuple(result[1])
+
+        if key not in best or result[0] < best[key][0]:
+            best[key] = result
+
+    return sorted(best.values(), key=lambda result: result[0])[:width]
+
+
+def beam_phase(cube, phase, candidates):
+    """
+    Run solve_many() once for each candidate
+    """
+    results = []
+
+    for (candidate_score, state, solution) in candidates:
+        cube.state = state[:]
+        cube.solution = solution[:]
+        results.extend(phase.table.solve_many(phase.width, phase.score, **phase.settings))
+
+    return results
+
+
+def beam_phase_ida(cube, phase, candidates, node_budget, deadline=None):
+    """
+    Search all of the candidates at threshold N before searching any of
+    them at threshold N+1. Each candidate keeps its IDASearch (see
+    LookupTableIDA.solve_many_begin()) from one threshold to the next so its
+    transposition table is not thrown away, the table's
+    transposition_table_bytes are split between the candidates.
+
+    node_budget is for all of the candidates together. If we are still
+    searching at deadline (a time.time()) we settle for what we have.
+    """
+    start_time = time.time()
+    table = phase.table
+    max_ida_threshold = phase.settings.get('max_ida_threshold', 99)
+    transposition_table_bytes = max(int(table.transposition_table_bytes / len(candidates)), min_transposition_table_bytes)
+    searches = []
+
+    for (candidate_score, state, solution) in candidates:
+        cube.state = state[:]
+        cube.solution = solution[:]
+        searches.append(table.solve_many_begin(phase.width, None, max_ida_threshold, transposition_table_bytes))
+
+    nodes = 0
+    out_of_time = False
+
+    for threshold in range(min([search.min_ida_threshold for search in searches]), max_ida_threshold + 1):
+        for search in searches:
+
+            if node_budget is not None and nodes >= node_budget:
+                break
+
+            if deadline is not None and time.time() > deadline:
+                out_of_time = True
+                break
+
+            search_nodes = search.total_ida_count
+
+            if node_budget is None:
+                table.solve_many_threshold(search, threshold, None, deadline)
+            else:
+                table.solve_many_threshold(search, threshold, node_budget - nodes, deadline)
+
+            nodes += search.total_ida_count - search_nodes
+            out_of_time = out_of_time or search.out_of_time
+
+        states = set()
+
+        for search in searches:
+            states.update(search.solutions.keys())
+
+        log.info("%s: threshold %d, explored %d nodes, %d solutions" % (phase, threshold, nodes, len(states)))
+
+        if len(states) >= phase.width or out_of_time:
+            break
+
+        # Over budget, settle for what we have if we have anything
+        if states and node_budget is not None and nodes >= node_budget:
+            break
+
+    results = []
+
+    for search in searches:
+        table.original_state = search.state[:]
+        table.original_solution = search.solution[:]
+        results.extend(table.solve_many_results(search.solutions, phase.width, phase.score))
+
+    if out_of_time:
+        degraded = {
+            'phase': str(table),
+            'fallback': 'kept %d candidates' % len(results) if results else 'gave up',
+            'seconds': time.time() - start_time,
+        }
+        cube.degraded_phases.append(degraded)
+        log.warning("%s: ran out of time at threshold %d, %s" % (phase, threshold, degraded['fallback']))
+
+    if not results:
+        raise NoIDASolution("%s: no solution for any of the %d candidates" % (phase, len(candidates)))
+
+    return beam_keep(results, phase.width)
+
+
+def beam_search(cube, phases, node_budget=None):
+    """
+    Solve the phases in order keeping the best candidates from each one, the
+    cube ends up in the state of the best candidate from the last phase.
+    node_budget is per IDA phase. If the cube has a deadline (see
+    RubiksCube.solve()) each IDA phase searches for its share of the time
+    that is left, see LookupTableIDA.ida_phase_budget().
+    """
+    candidates = [(0, cube.state[:], cube.solution[:])]
+
+    for phase in phases:
+        if isinstance(phase.table, LookupTableIDA):
+            if cube.deadline is not None:
+                deadline = time.time() + phase.table.ida_phase_budget()
+            else:
+                deadline = None
+
+            results = beam_phase_ida(cube, phase, candidates, node_budget, deadline)
+        else:
+            results = beam_phase(cube, phase, candidates)
+
+        candidates = beam_keep(results, phase.width)
+        log.info("%s: kept %d candidates, best score %s" % (phase, len(candidates), candidates[0][0] if candidates else None))
+
+        if not candidates:
+            raise NoIDASolution("%s: no solutions" % phase)
+
+    (candidate_score, state, solution) = candidates[0]
+    cube.state = state[:]
+    cube.solution = solution[:]
+
+
+if __name__ == '__main__':
+    import doctest
+
+    logging.basicConfig(level=logging.INFO,
+                        format='%(asctime)s %(filename)16s %(levelname)8s: %(message)s')
+    log = logging.getLogger(__name__)
+
+    doctest.testmod()
@@ -0,0 +1,88 @@
+#!/usr/bin/env python3
+
+"""
+A Bloom filter of the states in a lookup table.
+
+Most of the lookups that LookupTableIDA does are for states that are not in
+the table. A Bloom filter can say "definitely not in the table" for almost all
+of those without touching the table file, it is only wrong in the other
+direction (it says "maybe" for a small percentage of states that are not
+there) so a "maybe" still has to be confirmed by searching the table.
+
+The bit positions come from a blake2b digest of the state rather than hash()
+because the filter is saved to disk and str hash() changes from one process
+to the next.
+"""
+
+from hashlib import blake2b
+import logging
+import math
+
+log = logging.getLogger(__name__)
+
+
+class BloomFilter(object):
+    """
+    >>> bloom = BloomFilter.for_capacity(1000, 0.01)
+    >>> (bloom.size, bloom.hash_count)
+    (9586, 7)
+    >>> for state in ('UUUULLLL', 'LLLLUUUU'):
+    ...     bloom.add(state)
+    >>> 'UUUULLLL' in bloom
+    True
+    >>> 'FFFFFFFF' in bloom
+    False
+    """
+
+    def __init__(self, size, hash_count, bits=None):
+        self.size = size
+        self.hash_count = hash_count
+
+        if bits is None:
+            self.bits = bytearray(int((size + 7) / 8))
+        else:
+            self.bits = bits
+
+    @classmethod
+    def for_capacity(cls, capacity, error_rate):
+        """
+        Size the filter so that with capacity states in it roughly error_rate
+        of the states that are not in it will be reported as "maybe"
+        """
+        capacity = max(1, capacity)
+        size = int(math.ceil(-capacity * math.log(error_rate) / (math.log(2) ** 2)))
+        hash_count = max(1, int(round((size / capacity) * math.log(2))))
+        return cls(size, hash_count)
+
+    def positions(self, state):
+        digest = blake2b(state.encode('utf-8'), digest_size=16).digest()
+        h1 = int.from_bytes(digest[:8], 'big')
+        h2 = int.from_bytes(digest[8:], 'big') | 1
+        size = self.size
+
+        return [(h1 + (i * h2)) % size for i in range(self.hash_count)]
+
+    def add(self, state):
+        bits = self.bits
+
+        for position in self.positions(state):
+            bits[position >> 3] |= 1 << (position & 7)
+
+    def __contains__(self, state):
+        bits = self.bits
+
+        for position in self.positions(state):
+            if not bits[position >> 3] & (1 << (position & 7)):
+                return False
+
+        return True
+
+
+if __name__ == '__main__':
+    import doctest
+
+    logging.basicConfig(level=logging.INFO,
+                        format='%(asctime)s %(filename)16s %(levelname)8s: %(message)s')
+    log = logging.getLogger(__name__)
+
+    doctest.testmod()
@@ -0,0 +1,157 @@
+#!/usr/bin/env python3
+
+"""
+Coordinates for the IDA searches.
+
+rotate_xxx() moves every square of the cube but most of our tables only look
+at a few of them, LookupTable444UDCentersStageCostOnly only cares about the
+24 centers. A table that declares which squares its state() looks at can be
+searched on just those squares.
+
+A table opts in by declaring
+- state_positions: the cube indexes that state() looks at, in order
+- state_pattern: a dict of square -> the character state() uses for it
+- state_from_pattern(): turns the joined characters into what state() returns
+
+The heuristics are looked up via the table's pattern_state() so tables with
+symmetry (see Symmetry.py) use their canonical state.
+
+Two kinds of coordinates are built from that
+- ProjectionCoordinate: the tuple of pattern characters. A move is a
+  precomputed itemgetter that shuffles the tuple.
+- RankCoordinate: the rank of the pattern (see Ranking.py). A move is one
+  index into a precomputed move table and the heuristic is one index into a
+  precomputed table of costs. These are built by utils/build-move-table.py
+  and saved next to the lookup table, see LookupTable.load_move_table()
+"""
+
+from operator import itemgetter
+import logging
+
+log = logging.getLogger(__name__)
+
+
+def move_permutations(rotate_xxx, width, moves):
+    """
+    For each move return a tuple where entry i is the index of the square
+    that the move puts at index i. rotate_xxx() never looks at the values of
+    the squares so we can find out by rotating a list of indexes.
+
+    >>> from rubikscubennnsolver.RubiksCube222 import rotate_222
+    >>> move_permutations(rotate_222, 25, ("U",))[0][1:5]
+    (3, 1, 4, 2)
+    """
+    identity = list(range(width))
+    return [tuple(rotate_xxx(identity, move)) for move in moves]
+
+
+def projected_permutations(positions, permutations):
+    """
+    Restrict each permutation to positions. Entry j of the result is the
+    index in positions of the square that the move puts at positions[j].
+
+    positions must be closed under the moves, if a move brings a square from
+    outside of positions into positions we raise a ValueError.
+
+    >>> projected_permutations((1, 2, 3, 4), [(0, 3, 1, 4, 2)])
+    [(2, 0, 3, 1)]
+    """
+    index = {}
+
+    for (i, position) in enumerate(positions):
+        index[position] = i
+
+    result = []
+
+    for permutation in permutations:
+        try:
+            result.append(tuple([index[permutation[position]] for position in positions]))
+        except KeyError:
+            raise ValueError("state_positions are not closed under the moves")
+
+    return result
+
+
+class ProjectionCoordinate(object):
+    """
+    The tuple of pattern characters at the table's state_positions
+
+    >>> class Table(object):
+    ...     state_positions = (1, 2, 3, 4)
+    ...     state_pattern = {'U': '1', 'D': '1', 'L': '0', 'F': '0', 'R': '0', 'B': '0'}
+    ...     def state_from_pattern(self, pattern):
+    ...         return int(pattern, 2)
+    >>> projection = ProjectionCoordinate(Table(), [(0, 3, 1, 4, 2)])
+    >>> coord = projection.from_cube(['x', 'U', 'L', 'L', 'D'])
+    >>> coord
+    ('1', '0', '0', '1')
+    >>> projection.move(coord, 0)
+    ('0', '1', '1', '0')
+    >>> projection.state(projection.move(coord, 0))
+    6
+    """
+
+    def __init__(self, table, permutations):
+        assert len(table.state_positions) > 1, "%s: itemgetter needs at least two state_positions" % table
+        self.table = table
+        self.positions = tuple(table.state_positions)
+        self.pattern = table.state_pattern
+        self.getters = [itemgetter(*permutation) for permutation in projected_permutations(self.positions, permutations)]
+
+    def from_cube(self, cube_state):
+        pattern = self.pattern
+        return tuple([pattern[cube_state[x]] for x in self.positions])
+
+    def move(self, coord, move_id):
+        return self.getters[move_id](coord)
+
+    def state(self, coord):
+        return self.table.state_from_pattern(''.join(coord))
+
+    def heuristic(self, coord):
+        return self.table.state_heuristic(self.table.pattern_state(''.join(coord)))
+
+
+class RankCoordinate(object):
+    """
+    The rank of the pattern at the table's state_positions
+
+    next_ranks[(rank * move_count) + column] is the rank after the move in
+    move table column column, costs[rank] is the table's heuristic for rank.
+    move_columns[move_id] is the move table column for each of the IDA
+    table's moves.
+    """
+
+    def __init__(self, table, ranker, next_ranks, costs, move_count, move_columns):
+        self.table = table
+        self.positions = tuple(table.state_positions)
+        self.pattern = table.state_pattern
+        self.ranker = ranker
+        self.next_ranks = next_ranks
+        self.costs = costs
+        self.move_count = move_count
+        self.move_columns = move_columns
+
+    def from_cube(self, cube_state):
+        pattern = self.pattern
+        return self.ranker.rank(''.join([pattern[cube_state[x]] for x in self.positions]))
+
+    def move(self, coord, move_id):
+        return self.next_ranks[(coord * self.move_count) + self.move_columns[move_id]]
+
+    def state(self, coord):
+        return self.table.state_from_pattern(self.ranker.unrank(coord))
+
+    def heuristic(self, coord):
+        self.table.heuristic_calls += 1
+        return self.costs[coord]
+
+
+if __name__ == '__main__':
+    import doctest
+
+    logging.basicConfig(level=logging.INFO,
+                        format='%(asctime)s %(filename)16s %(levelname)8s: %(message)s')
+    log = logging.getLogger(__name__)
+
+    doctest.testmod()
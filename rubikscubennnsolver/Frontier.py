@@ -0,0 +1,202 @@
+#!/usr/bin/env python3
+
+"""
+Frontier layers for LookupTableIDA.bidirectional_search()
+
+A layer is every state that is N moves from the scramble (or from the
+state_target) stored as a sorted array of 64-bit ints, see PatternEncoder.
+That is 8 bytes per state instead of the 50+ bytes of a str in a set or a
+deque, the memory problem that utils/lt_builder_exp.py ran into.
+
+When the layers use more than their memory budget the older ones are
+spilled to a temporary file and mmap'd. Finding a state in a layer is a
+binary search either way.
+
+numpy is optional, if it is installed it is used to sort and compare the
+layers which is a good bit faster than doing it in python.
+"""
+
+from array import array
+from bisect import bisect_left
+from rubikscubennnsolver.Ranking import StateRanker
+import logging
+import mmap
+import tempfile
+
+# numpy is optional, it is only used to speed up sorting and comparing layers
+try:
+    import numpy
+except ImportError:
+    numpy = None
+
+log = logging.getLogger(__name__)
+
+
+def sorted_unique(ranks):
+    """
+    >>> list(sorted_unique(array('Q', [5, 1, 5, 3])))
+    [1, 3, 5]
+    """
+    if numpy is not None:
+        return array('Q', numpy.unique(numpy.frombuffer(ranks, dtype=numpy.uint64)).tobytes())
+
+    return array('Q', sorted(set(ranks)))
+
+
+class PatternEncoder(object):
+    """
+    Turn a pattern (see Coordinates.py) into an int that fits in 64-bits and
+    back. If the pattern is short enough it is read as a base
+    len(alphabet) number which is much faster than ranking it.
+
+    >>> encoder = PatternEncoder('FLU', 4, [2, 1, 1])
+    >>> encoder.encode('LUFF')
+    45
+    >>> encoder.decode(45)
+    'LUFF'
+    >>> encoder = PatternEncoder('01', 70, [62, 8])
+    >>> encoder.ranker is not None
+    True
+    >>> encoder.decode(encoder.encode('01' * 8 + '0' * 54)) == '01' * 8 + '0' * 54
+    True
+    """
+
+    def __init__(self, alphabet, width, counts):
+        self.alphabet = alphabet
+        self.width = width
+        self.base = len(alphabet)
+        self.ranker = None
+
+        if self.base ** width >= 2 ** 64:
+            self.ranker = StateRanker('str', width, [list(range(width))], alphabet, [counts])
+
+            if self.ranker.size >= 2 ** 64:
+                raise ValueError("%d patterns do not fit in 64-bits" % self.ranker.size)
+
+        self.digits = str.maketrans(alphabet, '0123456789abcdef'[:self.base])
+
+    def encode(self, pattern):
+        if self.ranker is not None:
+            return self.ranker.rank(pattern)
+
+        return int(pattern.translate(self.digits), self.base)
+
+    def decode(self, code):
+        if self.ranker is not None:
+            return self.ranker.unrank(code)
+
+        alphabet = self.alphabet
+        base = self.base
+        result = []
+
+        for x in range(self.width):
+            (code, digit) = divmod(code, base)
+            result.append(alphabet[digit])
+
+        return ''.join(reversed(result))
+
+
+class FrontierLayer(object):
+    """
+    >>> layer = FrontierLayer(1, array('Q', [9, 4, 7, 4]))
+    >>> len(layer)
+    3
+    >>> 7 in layer, 8 in layer
+    (True, False)
+    >>> layer.discard(FrontierLayer(0, array('Q', [4])))
+    >>> list(layer.ranks)
+    [7, 9]
+    >>> layer.spill()
+    >>> 9 in layer, layer.nbytes()
+    (True, 0)
+    >>> layer.intersection(FrontierLayer(2, array('Q', [1, 9])))
+    [9]
+    >>> layer.close()
+    """
+
+    def __init__(self, depth, ranks):
+        self.depth = depth
+        self.ranks = sorted_unique(ranks)
+        self.fh = None
+        self.mm = None
+
+    def __len__(self):
+        return len(self.ranks)
+
+    def __contains__(self, rank):
+        ranks = self.ranks
+        index = bisect_left(ranks, rank)
+        return index < len(ranks) and ranks[index] == rank
+
+    def nbytes(self):
+        """
+        The bytes of memory we are using, 0 once we have been spilled
+        """
+        if self.mm is not None:
+            return 0
+
+        return len(self.ranks) * 8
+
+    def discard(self, other):
+        """
+        Remove the ranks that are also in other
+        """
+        if not len(self.ranks) or not len(other.ranks):
+            return
+
+        if numpy is not None:
+            ranks = numpy.frombuffer(self.ranks, dtype=numpy.uint64)
+            other_ranks = numpy.frombuffer(other.ranks, dtype=numpy.uint64)
+            self.ranks = array('Q', numpy.setdiff1d(ranks, other_ranks, assume_unique=True).tobytes())
+        else:
+            self.ranks = array('Q', [rank for rank in self.ranks if rank not in other])
+
+    def intersection(self, other):
+        """
+        Return a sorted list of the ranks that are in both layers
+        """
+        if numpy is not None:
+            ranks = numpy.frombuffer(self.ranks, dtype=numpy.uint64)
+            other_ranks = numpy.frombuffer(other.ranks, dtype=numpy.uint64)
+            return [int(rank) for rank in numpy.intersect1d(ranks, other_ranks, assume_unique=True)]
+
+        # Binary search the larger layer for each rank in the smaller one
+        if len(self) <= len(other):
+            (smaller, larger) = (self, other)
+        else:
+            (smaller, larger) = (other, self)
+
+        return [rank for rank in smaller.ranks if rank in larger]
+
+    def spill(self):
+        """
+        Move our ranks to a temporary file
+        """
+        if self.mm is not None or not len(self.ranks):
+            return
+
+        self.fh = tempfile.TemporaryFile()
+        self.ranks.tofile(self.fh)
+        self.fh.flush()
+        self.mm = mmap.mmap(self.fh.fileno(), 0, access=mmap.ACCESS_READ)
+        self.ranks = memoryview(self.mm).cast('Q')
+
+    def close(self):
+        if self.mm is not None:
+            self.ranks.release()
+            self.mm.close()
+            self.fh.close()
+            self.mm = None
+            self.fh = None
+
+        self.ranks = array('Q')
+
+
+if __name__ == '__main__':
+    import doctest
+
+    logging.basicConfig(level=logging.INFO,
+                        format='%(asctime)s %(filename)16s %(levelname)8s: %(message)s')
+    log = logging.getLogger(__name__)
+
+    doctest.testmod()
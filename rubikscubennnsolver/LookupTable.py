@@ -1,13 +1,38 @@
 #!/usr/bin/env python3
 
+from array import array
+from collections import OrderedDict
+from concurrent.futures import ProcessPoolExecutor, TimeoutError as FuturesTimeoutError
 import datetime as dt
+from operator import itemgetter
 from pprint import pformat
+from rubikscubennnsolver.BloomFilter import BloomFilter
+from rubikscubennnsolver.Coordinates import (
+    move_permutations,
+    projected_permutations,
+    ProjectionCoordinate,
+    RankCoordinate,
+)
+from rubikscubennnsolver.Frontier import FrontierLayer, PatternEncoder
+from rubikscubennnsolver.Ranking import StateRanker
 from rubikscubennnsolver.RubiksSide import SolveError
+from rubikscubennnsolver.Telemetry import IDATelemetry
+from rubikscubennnsolver.TranspositionTable import TranspositionTable
 from subprocess import call
+import json
 import logging
+import mmap
+import multiprocessing
 import os
+import struct
 import sys
+import time
 
+# numpy is optional, it is only used for bulk cost-only lookups
+try:
+    import numpy
+except ImportError:
+    numpy = None
 
 log = logging.getLogger(__name__)
 
@@ -24,6 +49,33 @@ class NoIDASolution(Exception):
     pass
 
 
+class IDADeadline(Exception):
+    pass
+
+
+def get_rotate_xxx(size):
+    """
+    Return the rotate_xxx() for a size of cube
+    """
+    if size == 2:
+        from rubikscubennnsolver.RubiksCube222 import rotate_222
+        return rotate_222
+    elif size == 4:
+        from rubikscubennnsolver.RubiksCube444 import rotate_444
+        return rotate_444
+    elif size == 5:
+        from rubikscubennnsolver.RubiksCube555 import rotate_555
+        return rotate_555
+    elif size == 6:
+        from rubikscubennnsolver.RubiksCube666 import rotate_666
+        return rotate_666
+    elif size == 7:
+        from rubikscubennnsolver.RubiksCube777 import rotate_777
+        return rotate_777
+    else:
+        raise ImplementThis("Need rotate_xxx for %dx%dx%d" % (size, size, size))
+
+
 def get_characters_common_count(strA, strB, start_index):
     """
     This assumes strA and strB are the same length
@@ -147,646 +199,4264 @@ def steps_on_same_face_and_layer(prev_step, step):
     return False
 
 
-def pretty_time(delta):
-    delta = str(delta)
+# The axis that each face turns around, all of the moves around an axis commute
+face_axis = {
+    'U': 'UD',
+    'D': 'UD',
+    'L': 'LR',
+    'R': 'LR',
+    'F': 'FB',
+    'B': 'FB',
+}
 
-    if delta.startswith('0:00:00.'):
-        delta_us = int(delta.split('.')[1])
-        delta_ms = int(delta_us/1000)
 
-        if delta_ms >= 500:
-            return "\033[91m%sms\033[0m" % delta_ms
-        else:
-            return "%sms" % delta_ms
+def step_face_and_rows(step):
+    """
+    Return the face that step turns and the number of rows it turns
 
-    elif delta.startswith('0:00:01.'):
-        delta_us = int(delta.split('.')[1])
-        delta_ms = 1000 + int(delta_us/1000)
-        return "\033[91m%sms\033[0m" % delta_ms
+    >>> step_face_and_rows("U")
+    ('U', 1)
 
-    else:
-        return "\033[91m%s\033[0m" % delta
+    >>> step_face_and_rows("Lw'")
+    ('L', 2)
 
+    >>> step_face_and_rows("3Fw2")
+    ('F', 3)
+    """
+    step = step.rstrip("'2")
 
-class LookupTable(object):
+    if step[0].isdigit():
+        return (step[1], int(step[0]))
+    elif 'w' in step:
+        return (step[0], 2)
+    else:
+        return (step[0], 1)
 
-    def __init__(self, parent, filename, state_target, linecount, max_depth=None, filesize=None):
-        self.parent = parent
-        self.sides_all = (self.parent.sideU, self.parent.sideL, self.parent.sideF, self.parent.sideR, self.parent.sideB, self.parent.sideD)
-        self.filename = filename
-        self.filename_gz = filename + '.gz'
-        self.desc = filename.replace('lookup-table-', '').replace('.txt', '')
-        self.filename_exists = False
-        self.linecount = linecount
-        self.max_depth = max_depth
-        self.avoid_oll = False
-        self.avoid_pll = False
-        self.preloaded_state_set = False
-        self.preloaded_cache = False
-        self.ida_all_the_way = False
-        self.use_lt_as_prune = False
-        self.fh_txt_seek_calls = 0
-        self.cache = {}
-        self.filesize = filesize
 
-        assert self.filename.startswith('lookup-table'), "We only support lookup-table*.txt files"
-        assert self.filename.endswith('.txt'), "We only support lookup-table*.txt files"
+# The integer value of each hex character, indexed by the character's byte value.
+# Used by LookupTableCostOnly to decode an mmap'd byte without building a str.
+hex_byte_value = [0] * 256
 
-        if 'dummy' not in self.filename:
-            assert self.linecount, "%s linecount is %s" % (self, self.linecount)
+for (value, char) in enumerate('0123456789abcdef'):
+    hex_byte_value[ord(char)] = value
+    hex_byte_value[ord(char.upper())] = value
 
-        # This only happens if a new copy of the lookup table has been checked in...we need to delete
-        # the one we have and download the new one.
-        if os.path.exists(self.filename) and self.filesize is not None and os.path.getsize(self.filename) != self.filesize:
-            log.info("%s: filesize %s does not equal target filesize %s" % (self, os.path.getsize(self.filename), self.filesize))
-            os.remove(self.filename)
 
-            if os.path.exists(self.filename_gz):
-                os.remove(self.filename_gz)
+def mmap_table(fh):
+    """
+    Return a read-only mmap of fh. The mapping is MAP_SHARED so every process
+    that maps the same table shares one copy of it in the page cache.
+    """
+    mm = mmap.mmap(fh.fileno(), 0, access=mmap.ACCESS_READ)
+
+    # Our lookups are binary searches so readahead just wastes page cache
+    if hasattr(mm, 'madvise') and hasattr(mmap, 'MADV_RANDOM'):
+        mm.madvise(mmap.MADV_RANDOM)
+
+    return mm
+
+
+# =====================
+# Binary lookup tables
+# =====================
+# A lookup-table-*.bin file is the binary equivalent of a lookup-table-*.txt
+# file.  It starts with a header (magic, a 4 byte length and a json blob)
+# followed by fixed width rows.  Each row is
+#
+# - the state, packed into key_width bytes via StatePacker
+# - steps_width bytes of move codes, 0 is padding and N is header['moves'][N-1]
+#
+# The packed keys sort in the same order as the states in the .txt file so
+# we can binary search the .bin file exactly the same way.
+#
+# A 'ranked' .bin table is for tables whose states are a k-of-n pattern.
+# There are no keys, the row for a state is at the state's rank (see
+# Ranking.py) and a row of all 0s means the state is not in the table.
+#
+# A 'cost-only' .bin table is the equivalent of a .cost-only.txt table, the
+# number of steps to solve each state.  With 'nibble' packing there are two
+# states per byte, the even state is in the high nibble.  With 'byte' packing
+# there is one state per byte.
+binary_table_magic = b'RCLTBIN1'
+base_digits = '0123456789abcdefghijklmnopqrstuv'
+
+
+class InvalidStateCharacter(dict):
+    """
+    Translation table for str.translate(). Any character that is not in the
+    table's alphabet is mapped to 'z' which is not a valid digit for int()
+    in any of the bases StatePacker uses.
+    """
 
-        if not os.path.exists(self.filename):
-            if not os.path.exists(self.filename_gz):
-                url = "https://github.com/dwalton76/rubiks-cube-lookup-tables-%sx%sx%s/raw/master/%s" % (self.parent.size, self.parent.size, self.parent.size, self.filename_gz)
-                log.info("Downloading table via 'wget %s'" % url)
-                call(['wget', url])
+    def __missing__(self, key):
+        return 'z'
 
-            log.warning("gunzip %s" % self.filename_gz)
-            call(['gunzip', self.filename_gz])
 
-        # Find the state_width for the entries in our .txt file
-        with open(self.filename, 'r') as fh:
-            first_line = next(fh)
-            self.width = len(first_line)
-            (state, steps) = first_line.split(':')
-            self.state_width = len(state)
+class StatePacker(object):
+    """
+    Pack a state string into bytes, using the fewest bits per character that
+    can represent the table's alphabet.  UUUULLLLFFFFLLLLFFFFUUUU has an
+    alphabet of FLU so it packs into 48 bits.
+
+    >>> packer = StatePacker('FLU', 24)
+    >>> packer.key_width
+    6
+    >>> packer.unpack(packer.pack('UUUULLLLFFFFLLLLFFFFUUUU'))
+    'UUUULLLLFFFFLLLLFFFFUUUU'
+    >>> packer.pack('UUUULLLLFFFFLLLLFFFFUUUU') > packer.pack('UUUULLLLFFFFLLLLFFFFLUUU')
+    True
+    >>> packer.pack('UUUULLLLFFFFLLLLFFFFUUUx') is None
+    True
+    """
 
-        self.hex_format = '%' + "0%dx" % self.state_width
-        self.filename_exists = True
+    def __init__(self, alphabet, state_width):
+        self.alphabet = ''.join(sorted(alphabet))
+        self.state_width = state_width
+        self.bits = max(1, (len(self.alphabet) - 1).bit_length())
+        self.mask = (1 << self.bits) - 1
+        self.key_width = int((self.bits * state_width + 7) / 8)
+        self.pad_bits = (self.key_width * 8) - (self.bits * state_width)
+        self.code = {}
+
+        for (code, char) in enumerate(self.alphabet):
+            self.code[char] = code
+
+        # For alphabets of up to 32 characters we can str.translate() the state
+        # into base 2^bits digits and let int() do the packing in C
+        if self.bits <= 5:
+            self.base = 1 << self.bits
+            self.translation = InvalidStateCharacter()
+
+            for (char, code) in self.code.items():
+                self.translation[ord(char)] = base_digits[code]
+        else:
+            self.base = None
 
-        if isinstance(state_target, tuple):
-            self.state_target = set(state_target)
-        elif isinstance(state_target, list):
-            self.state_target = set(state_target)
+    def pack(self, state):
+        """
+        Return the packed bytes for state or None if state can not be in the table
+        """
+        if len(state) != self.state_width:
+            return None
+
+        if self.base is not None:
+            try:
+                value = int(state.translate(self.translation), self.base)
+            except ValueError:
+                return None
         else:
-            self.state_target = set((state_target, ))
+            value = 0
+            for char in state:
+                code = self.code.get(char)
 
-        # 'rb' mode is about 3x faster than 'r' mode
-        self.fh_txt = open(self.filename, mode='rb')
+                if code is None:
+                    return None
+                value = (value << self.bits) | code
 
-    def __str__(self):
-        return self.desc
+        return (value << self.pad_bits).to_bytes(self.key_width, 'big')
 
-    def binary_search(self, state_to_find):
-        first = 0
-        last = self.linecount - 1
-        b_state_to_find = bytearray(state_to_find, encoding='utf-8')
+    def unpack(self, b_key):
+        value = int.from_bytes(b_key, 'big') >> self.pad_bits
+        chars = []
 
-        while first <= last:
-            midpoint = int((first + last)/2)
-            self.fh_txt.seek(midpoint * self.width)
-            self.fh_txt_seek_calls += 1
+        for x in range(self.state_width):
+            chars.append(self.alphabet[value & self.mask])
+            value >>= self.bits
 
-            # Only read the 'state' part of the line (for speed)
-            b_state = self.fh_txt.read(self.state_width)
+        return ''.join(reversed(chars))
 
-            if b_state_to_find < b_state:
-                last = midpoint - 1
 
-            # If this is the line we are looking for, then read the entire line
-            elif b_state_to_find == b_state:
-                self.fh_txt.seek(midpoint * self.width)
-                line = self.fh_txt.read(self.width)
-                return line.decode('utf-8').rstrip()
+class CompactRows(object):
+    """
+    A preloaded table stored as one bytes buffer of fixed width rows, the
+    same rows as a 'sorted' .bin table.  Each row is the packed state followed
+    by the move codes for its steps.  This is a small fraction of the memory
+    of a dict of state -> list of steps, a lookup is a binary search through
+    the buffer instead of a hash.
+
+    get() works like dict.get() so it can stand in for the dict that
+    preload_cache() builds.
+    """
 
-            else:
-                first = midpoint + 1
+    def __init__(self, rows, packer, steps_width, moves):
+        self.rows = rows
+        self.packer = packer
+        self.key_width = packer.key_width
+        self.width = packer.key_width + steps_width
+        self.moves = [None, ] + list(moves)
+        self.linecount = int(len(rows) / self.width)
 
-        return None
+    @classmethod
+    def from_lines(cls, iter_lines):
+        """
+        Build from the sorted 'state:steps' lines that iter_lines() yields.
+        We need two passes over the lines so iter_lines is a function that
+        returns a new iterator each time it is called, LookupTable.iter_lines
+        for example, not an iterator.
+
+        >>> rows = CompactRows.from_lines(lambda: iter(['LU:F', 'UL:R U']))
+        >>> rows.get('UL'), rows.get('UU')
+        (['R', 'U'], None)
+        """
+        alphabet = set()
+        moves = set()
+        state_width = None
+        steps_width = 0
 
-    def preload_cache(self):
-        log.info("%s: begin preload cache" % self)
+        for line in iter_lines():
+            (state, steps) = line.split(':')
+            alphabet.update(state)
+            moves.update(steps.split())
+            state_width = len(state)
+            steps_width = max(steps_width, len(steps.split()))
 
-        # Another option here would be to store a list of (state, step) tuples and
-        # then binary search through it. That takes about 1/6 the amount of memory
-        # but would be slower.  I have not measured how much slower.
-        with open(self.filename, 'r') as fh:
+        if len(moves) > 255:
+            raise SolveError("table has %d moves, we can only encode 255" % len(moves))
 
-            # The bottleneck is the building of the dictionary, moreso that reading from disk.
-            for line in fh:
-                (state, steps) = line.rstrip().split(':')
-                self.cache[state] = steps.split()
+        moves = sorted(moves)
+        move_code = {}
 
-        self.preloaded_cache = True
-        log.info("%s: end preload cache (%d bytes)" % (self, sys.getsizeof(self.cache)))
+        for (code, move) in enumerate(moves, 1):
+            move_code[move] = code
 
-    def steps(self, state_to_find=None):
-        """
-        Return a list of the steps found in the lookup table for the current cube state
-        """
-        if state_to_find is None:
-            state_to_find = self.state()
+        packer = StatePacker(''.join(alphabet), state_width or 1)
+        rows = bytearray()
 
-        # If we are at one of our state_targets we do not need to do anything
-        if state_to_find in self.state_target:
-            return None
+        for line in iter_lines():
+            (state, steps) = line.split(':')
+            rows += packer.pack(state)
+            rows += bytes([move_code[step] for step in steps.split()]).ljust(steps_width, b'\0')
 
-        if self.preloaded_cache:
-            return self.cache.get(state_to_find)
+        return cls(bytes(rows), packer, steps_width, moves)
 
-        line = self.binary_search(state_to_find)
+    def __len__(self):
+        return self.linecount
 
-        if line:
-            (state, steps) = line.strip().split(':')
-            steps_list = steps.split()
-            return steps_list
+    def get(self, state, default=None):
+        b_key = self.packer.pack(state)
 
-        else:
-            return None
+        if b_key is None:
+            return default
 
-    def steps_cost(self, state_to_find=None):
+        rows = self.rows
+        width = self.width
+        key_width = self.key_width
+        first = 0
+        last = self.linecount - 1
 
-        if state_to_find is None:
-            state_to_find = self.state()
+        while first <= last:
+            midpoint = (first + last) >> 1
+            offset = midpoint * width
+            b_state = rows[offset:offset + key_width]
 
-        steps = self.steps(state_to_find)
+            if b_key < b_state:
+                last = midpoint - 1
+
+            elif b_key == b_state:
+                moves = self.moves
+                return [moves[code] for code in rows[offset + key_width:offset + width].rstrip(b'\0')]
 
-        if steps is None:
-            #log.info("%s: steps_cost None for %s (stage_target)" % (self, state_to_find))
-            return 0
-        else:
-            if steps[0].isdigit():
-                return int(steps[0])
             else:
-                #log.info("%s: steps_cost %d for %s (%s)" % (self, len(steps), state_to_find, ' '.join(steps)))
-                return len(steps)
+                first = midpoint + 1
 
-    def solve(self):
+        return default
 
-        if not self.filename_exists:
-            raise SolveError("%s does not exist" % self.filename)
 
-        if 'TBD' in self.state_target:
-            tbd = True
-        else:
-            tbd = False
+def write_binary_table_header(fh, header):
+    blob = json.dumps(header, sort_keys=True).encode('utf-8')
 
-        while True:
-            state = self.state()
+    # Pad the header so that the rows start on an 8 byte boundary
+    blob += b' ' * (-(len(binary_table_magic) + 4 + len(blob)) % 8)
 
-            if tbd:
-                log.info("%s: solve() state %s vs state_target %s" % (self, state, pformat(self.state_target)))
+    fh.write(binary_table_magic)
+    fh.write(struct.pack('>I', len(blob)))
+    fh.write(blob)
 
-            if state in self.state_target:
-                break
 
-            steps = self.steps(state)
+def read_binary_table_header(filename):
+    with open(filename, 'rb') as fh:
+        magic = fh.read(len(binary_table_magic))
 
-            if steps:
-                #log.info("%s: PRE solve() state %s found %s" % (self, state, ' '.join(steps)))
-                #self.parent.print_cube()
-                #log.info("%s: %d steps" % (self, len(steps)))
+        if magic != binary_table_magic:
+            raise SolveError("%s is not a binary lookup table" % filename)
 
-                for step in steps:
-                    self.parent.rotate(step)
+        (blob_len, ) = struct.unpack('>I', fh.read(4))
+        header = json.loads(fh.read(blob_len).decode('utf-8'))
 
-                #log.info("%s: POST solve()" % self)
-                #self.parent.print_cube()
+    header['data_offset'] = len(binary_table_magic) + 4 + blob_len
+    return header
 
+
+def convert_to_binary_table(filename, state_target=()):
+    """
+    Convert lookup-table-*.txt to lookup-table-*.bin, return the .bin filename
+    """
+    filename_bin = filename.replace('.txt', '.bin')
+    alphabet = set()
+    moves = set()
+    linecount = 0
+    state_width = None
+    steps_width = 0
+    max_depth = 0
+    prev_state = None
+
+    # Pass 1 - find the alphabet, the moves and the widths
+    with open(filename, 'r') as fh:
+        for line in fh:
+            (state, steps) = line.rstrip().split(':')
+            steps = steps.split()
+
+            if state_width is None:
+                state_width = len(state)
+            elif len(state) != state_width:
+                raise SolveError("%s: state %s is not %d characters wide" % (filename, state, state_width))
+
+            if prev_state is not None and state <= prev_state:
+                raise SolveError("%s: state %s is not sorted" % (filename, state))
+
+            alphabet.update(state)
+            moves.update(steps)
+            steps_width = max(steps_width, len(steps))
+
+            if steps[0].isdigit():
+                max_depth = max(max_depth, int(steps[0]))
             else:
-                self.parent.print_cube()
-                raise NoSteps("%s: state %s does not have steps" % (self, state))
+                max_depth = max(max_depth, len(steps))
+
+            prev_state = state
+            linecount += 1
+
+    if len(moves) > 255:
+        raise SolveError("%s: has %d moves, we can only encode 255" % (filename, len(moves)))
+
+    moves = sorted(moves)
+    move_code = {}
+
+    for (code, move) in enumerate(moves, 1):
+        move_code[move] = code
+
+    packer = StatePacker(''.join(alphabet), state_width)
+    header = {
+        'format': 'sorted',
+        'linecount': linecount,
+        'state_width': state_width,
+        'max_depth': max_depth,
+        'state_target': list(state_target),
+        'alphabet': packer.alphabet,
+        'key_width': packer.key_width,
+        'steps_width': steps_width,
+        'moves': moves,
+    }
+
+    # Pass 2 - write the rows
+    with open(filename_bin, 'wb') as fh_bin:
+        write_binary_table_header(fh_bin, header)
+
+        with open(filename, 'r') as fh:
+            for line in fh:
+                (state, steps) = line.rstrip().split(':')
+                codes = bytes([move_code[step] for step in steps.split()])
+                fh_bin.write(packer.pack(state))
+                fh_bin.write(codes.ljust(steps_width, b'\0'))
 
-    def heuristic(self):
-        pt_state = self.state()
+    log.info("%s: wrote %d rows (%d bytes per row) to %s" % (filename, linecount, packer.key_width + steps_width, filename_bin))
+    return filename_bin
 
-        if pt_state in self.state_target:
-            return 0
 
-        else:
-            pt_steps_cost = self.steps_cost(pt_state)
+def build_state_ranker(patterns, encoding, width, orbits=None):
+    """
+    Return a StateRanker for the patterns (an iterable of equal width strings).
+    Positions that never change are fixed, if orbits is None every other
+    position is put in one orbit.
+    """
+    position_chars = [set() for x in range(width)]
+    first_pattern = None
 
-            if pt_steps_cost:
-                return pt_steps_cost
+    for pattern in patterns:
+        if first_pattern is None:
+            first_pattern = pattern
 
-            elif self.max_depth:
-                # This is the exception to the rule but some prune tables such
-                # as lookup-table-6x6x6-step23-UD-oblique-edge-pairing-LFRB-only.txt
-                # are partial tables so use the max_depth of the table +1
-                return self.max_depth + 1
+        for (position, char) in enumerate(pattern):
+            position_chars[position].add(char)
 
-        self.parent.print_cube()
-        raise SolveError("%s does not have max_depth and does not have steps for %s, state_width %d" % (self, pt_state, self.state_width))
+    if orbits is None:
+        orbits = [[position for position in range(width) if len(position_chars[position]) > 1]]
 
+    in_orbit = set()
 
-    def find_edge_entries_with_loose_signature(self, signature_to_find):
-        """
-        Given a signature such as 001001010110, return a list of all of the lines
-        in our lookup-table that will not break up any of the paired edges (a 1
-        represents a paired edge).
+    for orbit in orbits:
+        in_orbit.update(orbit)
 
-        This is only used by the 4x4x4 and 5x5x5 edges tables
-        """
-        result = []
-        signature_to_find = int(signature_to_find, 2)
+    fixed = {}
 
-        with open(self.filename, 'r') as fh:
-            for line in fh:
+    for position in range(width):
+        if position not in in_orbit:
+            if len(position_chars[position]) > 1:
+                raise SolveError("position %d is not fixed but it is not in an orbit" % position)
+            fixed[position] = list(position_chars[position])[0]
 
-                # If signature_to_find is 0 we will add every line so no
-                # need to bitwise AND the signatures
-                if signature_to_find == 0:
-                    result.append(line.rstrip())
-                else:
-                    signature = line.split('_')[0]
-                    signature = int(signature, 2)
+    if encoding == 'str':
+        alphabet = set()
 
-                    if (signature & signature_to_find) == signature_to_find:
-                        result.append(line.rstrip())
+        for orbit in orbits:
+            for position in orbit:
+                alphabet.update(position_chars[position])
 
-        return result
+        alphabet = ''.join(sorted(alphabet))
+    else:
+        alphabet = '01'
 
-    def find_edge_entries_with_signature(self, signature_to_find):
-        """
-        Given a signature such as 001001010110, return a list of all of the lines
-        in our lookup-table that start with that signature.
+    counts = []
 
-        This is only used by 4x4x4 edges tables
-        """
-        self.fh_txt.seek(0)
-        result = []
+    for orbit in orbits:
+        orbit_chars = [first_pattern[position] for position in orbit]
+        counts.append([orbit_chars.count(char) for char in alphabet])
 
-        first = 0
-        last = self.linecount - 1
-        signature_width = len(signature_to_find)
-        b_signature_to_find = bytearray(signature_to_find, encoding='utf-8')
+    return StateRanker(encoding, width, orbits, alphabet, counts, fixed)
 
-        fh = self.fh_txt
 
-        # Find an entry with signature_to_find
-        while first <= last:
-            midpoint = int((first + last)/2)
-            fh.seek(midpoint * self.width)
+def state_to_pattern(state, encoding, width):
+    if encoding == 'str':
+        return state
+    elif encoding == 'hex':
+        state = int(state, 16)
+    return format(state, '0%db' % width)
 
-            # Only read the 'state' part of the line (for speed)
-            b_signature = fh.read(signature_width)
 
-            if b_signature_to_find < b_signature:
-                last = midpoint - 1
+def iter_table_entries(filename):
+    """
+    Yield a (state, steps) tuple for each line of a lookup-table-*.txt file
+    """
+    with open(filename, 'r') as fh:
+        for line in fh:
+            (state, steps) = line.rstrip().split(':')
+            yield (state, steps.split())
 
-            # If this is the line we are looking for
-            elif b_signature_to_find == b_signature:
-                break
 
-            else:
-                first = midpoint + 1
+def convert_to_ranked_table(filename, state_target=(), encoding=None, orbits=None):
+    """
+    Convert lookup-table-*.txt to a ranked lookup-table-*.bin, return the .bin filename
+    """
+    filename_bin = filename.replace('.txt', '.bin')
+    state_chars = set()
+    moves = set()
+    state_width = None
+    steps_width = 0
+    max_depth = 0
+
+    # Pass 1 - find the moves and the widths
+    for (state, steps) in iter_table_entries(filename):
+        state_chars.update(state)
+        moves.update(steps)
+        state_width = len(state)
+        steps_width = max(steps_width, len(steps))
+
+        if steps[0].isdigit():
+            max_depth = max(max_depth, int(steps[0]))
         else:
-            log.warning("could not find signature %s" % signature_to_find)
-            return result
+            max_depth = max(max_depth, len(steps))
 
-        line_number_midpoint_signature_to_find = midpoint
+    if len(moves) > 255:
+        raise SolveError("%s: has %d moves, we can only encode 255" % (filename, len(moves)))
 
-        # Go back one line at a time until we are at the first line with signature_to_find
-        while True:
-            fh.seek(midpoint * self.width)
+    # The tables that use self.hex_format have lowercase hex states
+    if encoding is None:
+        if state_chars.issubset(set('0123456789abcdef')):
+            encoding = 'hex'
+        else:
+            encoding = 'str'
 
-            line = fh.read(self.width)
-            line = line.decode('utf-8').rstrip()
-            (edges_state, steps) = line.split(':')
-            (signature, _) = edges_state.split('_')
+    if encoding == 'hex':
+        width = state_width * 4
+    else:
+        width = state_width
+
+    # Pass 2 - find which positions are fixed and how many of each color the orbits have
+    ranker = build_state_ranker(
+        (state_to_pattern(state, encoding, width) for (state, steps) in iter_table_entries(filename)),
+        encoding, width, orbits)
+
+    moves = sorted(moves)
+    move_code = {}
+
+    for (code, move) in enumerate(moves, 1):
+        move_code[move] = code
+
+    header = {
+        'format': 'ranked',
+        'linecount': ranker.size,
+        'state_width': state_width,
+        'max_depth': max_depth,
+        'state_target': list(state_target),
+        'key_width': 0,
+        'steps_width': steps_width,
+        'moves': moves,
+        'rank': ranker.to_spec(),
+    }
+    entries = 0
+
+    # Pass 3 - write each entry at the row for its rank
+    with open(filename_bin, 'wb') as fh_bin:
+        write_binary_table_header(fh_bin, header)
+        data_offset = fh_bin.tell()
+        fh_bin.truncate(data_offset + (ranker.size * steps_width))
+
+        for (state, steps) in iter_table_entries(filename):
+            rank = ranker.rank(state)
+
+            if rank is None:
+                raise SolveError("%s: state %s does not fit %s, try specifying the orbits" % (filename, state, ranker.to_spec()))
+
+            fh_bin.seek(data_offset + (rank * steps_width))
+            fh_bin.write(bytes([move_code[step] for step in steps]))
+            entries += 1
+
+    log.info("%s: wrote %d entries to %s, %d rows (%d percent full)" %
+        (filename, entries, filename_bin, ranker.size, int((entries * 100) / ranker.size)))
+
+    if ranker.size > entries * 4:
+        log.warning("%s: is less than 25 percent full, the orbits may need to be split up" % filename_bin)
+
+    return filename_bin
+
+
+def convert_cost_only_to_ranked_table(filename, orbits=None):
+    """
+    Convert lookup-table-*.cost-only.txt to a ranked lookup-table-*.cost-only.bin, return the .bin filename
+    """
+    filename_bin = filename.replace('.txt', '.bin')
+
+    with open(filename, 'rb') as fh:
+        mm = mmap_table(fh)
+        width = (len(mm) - 1).bit_length()
+
+        # Every state that has a cost must fit the pattern, use those to build the ranker
+        ranker = build_state_ranker(
+            (format(index, '0%db' % width) for index in range(len(mm)) if hex_byte_value[mm[index]]),
+            'int', width, orbits)
+        max_depth = 0
+
+        for index in range(len(mm)):
+            cost = hex_byte_value[mm[index]]
+
+            if cost:
+                max_depth = max(max_depth, cost)
+
+                if ranker.rank(index) is None:
+                    raise SolveError("%s: state %d does not fit %s, try specifying the orbits" % (filename, index, ranker.to_spec()))
+
+        header = {
+            'format': 'cost-only',
+            'packing': 'nibble',
+            'linecount': ranker.size,
+            'max_depth': max_depth,
+            'rank': ranker.to_spec(),
+        }
+
+        with open(filename_bin, 'wb') as fh_bin:
+            write_binary_table_header(fh_bin, header)
+            writer = NibbleWriter(fh_bin)
+
+            for rank in range(ranker.size):
+                writer.write(hex_byte_value[mm[ranker.unrank(rank)]])
+
+            writer.close()
+
+    log.info("%s: wrote %d rows to %s" % (filename, ranker.size, filename_bin))
+    return filename_bin
+
+
+class NibbleWriter(object):
+    """
+    Write costs for a 'nibble' packed cost-only table, two per byte with the
+    even index in the high nibble
+    """
+
+    def __init__(self, fh):
+        self.fh = fh
+        self.pending = None
+
+    def write(self, cost):
+        assert 0 <= cost <= 15, "cost %d does not fit in a nibble" % cost
+
+        if self.pending is None:
+            self.pending = cost
+        else:
+            self.fh.write(bytes([(self.pending << 4) | cost]))
+            self.pending = None
+
+    def write_zeros(self, count):
+        if count and self.pending is not None:
+            self.write(0)
+            count -= 1
+
+        self.fh.write(bytes(count >> 1))
+
+        if count & 1:
+            self.write(0)
+
+    def close(self):
+        if self.pending is not None:
+            self.fh.write(bytes([self.pending << 4]))
+            self.pending = None
+
+
+def convert_to_cost_only_table(filename):
+    """
+    Convert lookup-table-*.txt, whose states are hex, to a nibble packed
+    lookup-table-*.cost-only.bin. The cost for a state is at int(state, 16).
+    Return the .bin filename.
+    """
+    filename_bin = filename.replace('.txt', '.cost-only.bin')
+    max_depth = 0
+    last_state_int = None
+
+    # Pass 1 - find the max_depth and the last state
+    for (state, steps) in iter_table_entries(filename):
+
+        if steps[0].isdigit():
+            steps_len = int(steps[0])
+        else:
+            steps_len = len(steps)
+
+        max_depth = max(max_depth, steps_len)
+        last_state_int = int(state, 16)
+
+    if max_depth > 15:
+        log.warning("%s: max_depth %d is > 15...saving as 15" % (filename, max_depth))
+
+    header = {
+        'format': 'cost-only',
+        'packing': 'nibble',
+        'linecount': last_state_int + 1,
+        'max_depth': min(max_depth, 15),
+    }
+
+    # Pass 2 - write the costs, the states that are not in the table get a 0
+    with open(filename_bin, 'wb') as fh_bin:
+        write_binary_table_header(fh_bin, header)
+        writer = NibbleWriter(fh_bin)
+        prev_state_int = -1
+
+        for (state, steps) in iter_table_entries(filename):
+            state_int = int(state, 16)
+            writer.write_zeros(state_int - prev_state_int - 1)
+
+            if steps[0].isdigit():
+                steps_len = int(steps[0])
+            else:
+                steps_len = len(steps)
+
+            writer.write(min(steps_len, 15))
+            prev_state_int = state_int
+
+        writer.close()
+
+    log.info("%s: wrote %d states to %s" % (filename, header['linecount'], filename_bin))
+    return filename_bin
+
+
+def sparse_index_layout(filename, budget):
+    """
+    Return (header, width, data_offset) for the .idx sparse index of a
+    lookup-table-*.txt or sorted lookup-table-*.bin file with a budget of bytes.
+    The header is what build_sparse_index() writes and what
+    LookupTable.load_sparse_index() expects, if the table changes so does the
+    header.
+    """
+    if filename.endswith('.bin'):
+        table_header = read_binary_table_header(filename)
+
+        if table_header['format'] != 'sorted':
+            raise SolveError("%s: %s tables do not need a sparse index" % (filename, table_header['format']))
+
+        key_width = table_header['key_width']
+        width = key_width + table_header['steps_width']
+        data_offset = table_header['data_offset']
+        linecount = table_header['linecount']
+    else:
+        with open(filename, 'r') as fh:
+            first_line = next(fh)
+
+        width = len(first_line)
+        key_width = len(first_line.split(':')[0])
+        data_offset = 0
+        linecount = int(os.path.getsize(filename) / width)
+
+    entries = max(1, int(budget / key_width))
+    table_stat = os.stat(filename)
+    header = {
+        'format': 'sparse-index',
+        'stride': max(1, int((linecount + entries - 1) / entries)),
+        'key_width': key_width,
+        'linecount': linecount,
+        'table_size': table_stat.st_size,
+        'table_mtime_ns': table_stat.st_mtime_ns,
+    }
+    return (header, width, data_offset)
+
+
+def sparse_index_filename(filename):
+    return filename.replace('.txt', '.idx').replace('.bin', '.bin.idx')
+
+
+def build_sparse_index(filename, budget):
+    """
+    Write the .idx sparse index for lookup-table-*.txt or lookup-table-*.bin,
+    return the .idx filename. For a big table this is a seek per index key so
+    do it up front (utils/build-sparse-index.py or RubiksCube.lt_warm_all()),
+    not in the middle of a solve.
+    """
+    (header, width, data_offset) = sparse_index_layout(filename, budget)
+    filename_idx = sparse_index_filename(filename)
+    stride = header['stride']
+    key_width = header['key_width']
+    keys = []
+
+    with open(filename, 'rb') as fh:
+        for line_number in range(0, header['linecount'], stride):
+            fh.seek(data_offset + (line_number * width))
+            keys.append(fh.read(key_width))
+
+    with open(filename_idx, 'wb') as fh:
+        write_binary_table_header(fh, header)
+        fh.write(b''.join(keys))
+
+    log.info("%s: wrote %d keys, one every %d rows, to %s" % (filename, len(keys), stride, filename_idx))
+    return filename_idx
+
+
+def pretty_time(delta):
+    delta = str(delta)
+
+    if delta.startswith('0:00:00.'):
+        delta_us = int(delta.split('.')[1])
+        delta_ms = int(delta_us/1000)
+
+        if delta_ms >= 500:
+            return "\033[91m%sms\033[0m" % delta_ms
+        else:
+            return "%sms" % delta_ms
+
+    elif delta.startswith('0:00:01.'):
+        delta_us = int(delta.split('.')[1])
+        delta_ms = 1000 + int(delta_us/1000)
+        return "\033[91m%sms\033[0m" % delta_ms
+
+    else:
+        return "\033[91m%s\033[0m" % delta
+
+
+class LookupTableRegistry(object):
+    """
+    The opened (and possibly preloaded) storage for every table file in this
+    process, keyed by filename.
+
+    The NNN solvers build a fake 4x4x4, 5x5x5, etc for every orbit and call
+    lt_init() on each one. Without this every one of those would reopen the
+    same files and rebuild the same preloaded caches. With it the first table
+    for a file does the work and every table after that borrows its storage,
+    each table still has its own parent so state() is for its own cube.
+    """
+
+    def __init__(self):
+        self.storage = {}
+
+    def __contains__(self, filename):
+        return filename in self.storage
+
+    def get(self, filename):
+        return self.storage.get(filename)
+
+    def register(self, table):
+        storage = {}
+
+        for name in table.shared_attributes:
+            if hasattr(table, name):
+                storage[name] = getattr(table, name)
+
+        self.storage[table.filename] = storage
+        return storage
+
+    def clear(self):
+        """
+        Forget every table, the next table for a file will reopen it. Tables
+        that already exist keep using the storage they have.
+        """
+        self.storage = {}
+
+
+lookup_table_registry = LookupTableRegistry()
+lru_cache_miss = object()
+
+
+class LazyLookupTable(object):
+    """
+    A lookup table attribute of a RubiksCube class that is only opened the
+    first time it is used, a solve that never reaches a phase never pays
+    to open (or preload) that phase's tables.
+
+        lt_UD_centers_stage = LazyLookupTable(LookupTable444UDCentersStageCostOnly)
+        lt_ULFRBD_centers_stage = LazyLookupTable(LookupTableIDA444ULFRBDCentersStage, preload=True, avoid_oll=True)
+
+    Any keyword arguments are set as attributes on the table after it is built.
+    The table is stored in the cube's __dict__ so after the first access this
+    descriptor is no longer involved.  See RubiksCube.lt_warm_all() to open
+    every table up front.
+    """
+
+    def __init__(self, table_class, preload=False, **settings):
+        self.table_class = table_class
+        self.preload = preload
+        self.settings = settings
+        self.name = None
+
+    def __set_name__(self, owner, name):
+        self.name = name
+
+    def __get__(self, cube, owner):
+        if cube is None:
+            return self
+
+        table = self.table_class(cube)
+
+        for (name, value) in self.settings.items():
+            setattr(table, name, value)
+
+        if self.preload:
+            table.preload_cache()
+
+        cube.__dict__[self.name] = table
+        return table
+
+
+class LookupTable(object):
+
+    # The attributes that describe the table file rather than the cube, these
+    # are shared via lookup_table_registry
+    shared_attributes = (
+        'width', 'state_width', 'linecount', 'fh_txt', 'mm',
+        'binary', 'packer', 'ranker', 'key_width', 'data_offset', 'binary_moves',
+        'cache', 'preloaded_cache',
+        'sparse_index', 'sparse_index_stride', 'sparse_index_key_width',
+        'bloom_filter', 'lru_cache',
+        'signature_index', 'signature_index_width',
+    )
+
+    # The number of bytes of RAM we are willing to spend on a sparse index of
+    # the table's keys, None means no sparse index.  See load_sparse_index().
+    sparse_index_budget = None
+
+    # The false positive rate for a Bloom filter of the table's keys, None
+    # means no Bloom filter.  See load_bloom_filter().
+    bloom_filter_error_rate = None
+    bloom_filter = None
+
+    # See load_signature_index()
+    signature_index = None
+    signature_index_width = None
+
+    # The max number of steps() results to keep in an LRU cache, None means no
+    # LRU cache.  This can be changed at any time.  See lru_cache_stats().
+    lru_cache_size = None
+
+    # How preload_cache() stores the table
+    # - 'dict' a dict of state -> list of steps, the fastest lookups
+    # - 'compact' a CompactRows, a fraction of the memory but each lookup is a binary search
+    preload_mode = 'dict'
+
+    # The cube indexes that state() looks at and the character state() uses
+    # for each square, see state_from_pattern() and Coordinates.py
+    state_positions = None
+    state_pattern = None
+
+    # The whole cube rotations and reflections that map our state_target onto
+    # itself, see Symmetry.py. Lookups are done with the canonical state so
+    # the table only needs the canonical rows, see utils/reduce-symmetry.py
+    symmetry = None
+    symmetry_pattern_transforms = None
+
+    # Counters for the IDA telemetry, see Telemetry.py
+    heuristic_calls = 0
+    fh_txt_seek_calls_total = 0
+
+    def __init__(self, parent, filename, state_target, linecount, max_depth=None, filesize=None, use_mmap=True, sparse_index_budget=None, bloom_filter_error_rate=None):
+        self.parent = parent
+        self.sides_all = (self.parent.sideU, self.parent.sideL, self.parent.sideF, self.parent.sideR, self.parent.sideB, self.parent.sideD)
+        self.filename = filename
+        self.filename_gz = filename + '.gz'
+        self.desc = filename.replace('lookup-table-', '').replace('.txt', '')
+        self.filename_exists = False
+        self.linecount = linecount
+        self.max_depth = max_depth
+        self.avoid_oll = False
+        self.avoid_pll = False
+        self.preloaded_state_set = False
+        self.preloaded_cache = False
+        self.ida_all_the_way = False
+        self.use_lt_as_prune = False
+        self.fh_txt_seek_calls = 0
+        self.bloom_filter_negatives = 0
+        self.bloom_filter_positives = 0
+        self.bloom_filter_false_positives = 0
+        self.lru_cache = OrderedDict()
+        self.lru_cache_hits = 0
+        self.lru_cache_misses = 0
+        self.lru_cache_evictions = 0
+        self.cache = {}
+        self.filesize = filesize
+
+        assert self.filename.startswith('lookup-table'), "We only support lookup-table*.txt files"
+        assert self.filename.endswith('.txt'), "We only support lookup-table*.txt files"
+
+        if 'dummy' not in self.filename:
+            assert self.linecount, "%s linecount is %s" % (self, self.linecount)
+
+        if isinstance(state_target, tuple):
+            self.state_target = set(state_target)
+        elif isinstance(state_target, list):
+            self.state_target = set(state_target)
+        else:
+            self.state_target = set((state_target, ))
+
+        # If someone has run utils/convert-to-binary.py on this table use the .bin
+        # version, it is a fraction of the size and the rows do not need parsing.
+        self.filename_bin = filename.replace('.txt', '.bin')
+        self.binary = None
+        self.packer = None
+        self.ranker = None
+        self.sparse_index = None
+
+        if sparse_index_budget is not None:
+            self.sparse_index_budget = sparse_index_budget
+
+        if bloom_filter_error_rate is not None:
+            self.bloom_filter_error_rate = bloom_filter_error_rate
+
+        storage = lookup_table_registry.get(self.filename)
+
+        if storage is not None:
+            self.__dict__.update(storage)
+
+            if self.max_depth is None and self.binary is not None:
+                self.max_depth = self.binary['max_depth']
+        else:
+            if os.path.exists(self.filename_bin):
+                self.load_binary()
+            else:
+                self.load_txt(use_mmap)
+
+            lookup_table_registry.register(self)
+
+        if self.sparse_index_budget and self.sparse_index is None:
+            self.load_sparse_index(self.sparse_index_budget)
+            lookup_table_registry.register(self)
+
+        if self.bloom_filter_error_rate and self.bloom_filter is None:
+            self.load_bloom_filter(self.bloom_filter_error_rate)
+            lookup_table_registry.register(self)
+
+        self.hex_format = '%' + "0%dx" % self.state_width
+        self.filename_exists = True
+
+    def load_txt(self, use_mmap):
+        # This only happens if a new copy of the lookup table has been checked in...we need to delete
+        # the one we have and download the new one.
+        if os.path.exists(self.filename) and self.filesize is not None and os.path.getsize(self.filename) != self.filesize:
+            log.info("%s: filesize %s does not equal target filesize %s" % (self, os.path.getsize(self.filename), self.filesize))
+            os.remove(self.filename)
+
+            if os.path.exists(self.filename_gz):
+                os.remove(self.filename_gz)
+
+        if not os.path.exists(self.filename):
+            if not os.path.exists(self.filename_gz):
+                url = "https://github.com/dwalton76/rubiks-cube-lookup-tables-%sx%sx%s/raw/master/%s" % (self.parent.size, self.parent.size, self.parent.size, self.filename_gz)
+                log.info("Downloading table via 'wget %s'" % url)
+                call(['wget', url])
+
+            log.warning("gunzip %s" % self.filename_gz)
+            call(['gunzip', self.filename_gz])
+
+        # Find the state_width for the entries in our .txt file
+        with open(self.filename, 'r') as fh:
+            first_line = next(fh)
+            self.width = len(first_line)
+            (state, steps) = first_line.split(':')
+            self.state_width = len(state)
+
+        # utils/reduce-symmetry.py leaves only the rows for the canonical
+        # states, the rows are all the same width so we can count them
+        if self.symmetry is not None:
+            linecount = int(os.path.getsize(self.filename) / self.width)
+
+            if self.linecount != linecount:
+                log.info("%s: linecount is %s but %s has %d rows" % (self, self.linecount, self.filename, linecount))
+                self.linecount = linecount
+
+        # 'rb' mode is about 3x faster than 'r' mode
+        self.fh_txt = open(self.filename, mode='rb')
+
+        # With use_mmap the binary search probes slice the mapping directly
+        # instead of doing a seek() + read() syscall pair per probe
+        if use_mmap and self.linecount:
+            self.mm = mmap_table(self.fh_txt)
+        else:
+            self.mm = None
+
+    def load_binary(self):
+        """
+        The .bin tables are always mmap'd
+        """
+        header = read_binary_table_header(self.filename_bin)
+        self.binary = header
+
+        if header['format'] == 'ranked':
+            self.ranker = StateRanker.from_spec(header['rank'])
+        elif header['format'] == 'sorted':
+            self.packer = StatePacker(header['alphabet'], header['state_width'])
+        else:
+            raise SolveError("%s: %s format is not supported" % (self, header['format']))
+
+        self.state_width = header['state_width']
+        self.key_width = header['key_width']
+        self.width = header['key_width'] + header['steps_width']
+        self.data_offset = header['data_offset']
+        self.binary_moves = [None, ] + header['moves']
+
+        if self.linecount != header['linecount']:
+            log.info("%s: linecount is %s but %s has %d rows" % (self, self.linecount, self.filename_bin, header['linecount']))
+            self.linecount = header['linecount']
+
+        if self.max_depth is None:
+            self.max_depth = header['max_depth']
+
+        self.fh_txt = open(self.filename_bin, mode='rb')
+        self.mm = mmap_table(self.fh_txt)
+
+    def __str__(self):
+        return self.desc
+
+    def sparse_index_table_filename(self):
+        # The file that the binary search reads the keys from
+        if self.binary is not None:
+            return self.filename_bin
+        return self.filename
+
+    def load_sparse_index(self, budget):
+        """
+        Keep every Kth key of the table in RAM, K is picked so the index fits in
+        budget bytes.  A lookup then bisects the index to find the K rows that
+        could hold the key and only has to search those on disk, for a large
+        table that is one or two blocks instead of log2(linecount) reads
+        scattered across the file.
+
+        The index is read from the .idx file next to the table. Building it
+        means a seek per key so we never do that here, a table is opened on
+        the first lookup in the middle of a solve and the table directory
+        might be read-only. If the .idx is missing or does not match the table
+        the lookups do a plain binary search, see build_sparse_index().
+        """
+        if not self.linecount or self.ranker is not None:
+            return
+
+        filename = self.sparse_index_table_filename()
+        filename_idx = sparse_index_filename(filename)
+
+        if not os.path.exists(filename_idx):
+            log.info("%s: %s does not exist, run utils/build-sparse-index.py to build it" % (self, filename_idx))
+            return
+
+        (header, width, data_offset) = sparse_index_layout(filename, budget)
+        idx_header = read_binary_table_header(filename_idx)
+        idx_data_offset = idx_header.pop('data_offset')
+
+        if idx_header != header:
+            log.warning("%s: %s is stale, run utils/build-sparse-index.py to rebuild it" % (self, filename_idx))
+            return
+
+        with open(filename_idx, 'rb') as fh:
+            fh.seek(idx_data_offset)
+            sparse_index = fh.read()
+
+        self.sparse_index = sparse_index
+        self.sparse_index_stride = header['stride']
+        self.sparse_index_key_width = header['key_width']
+        log.info("%s: sparse index has %d keys, one every %d rows (%d bytes)" %
+            (self, int(len(sparse_index) / header['key_width']), header['stride'], len(sparse_index)))
+
+    def build_sparse_index(self):
+        """
+        Build (or rebuild) our .idx and load it, see RubiksCube.lt_warm_all()
+        """
+        if not self.sparse_index_budget or not self.linecount or self.ranker is not None:
+            return
+
+        try:
+            build_sparse_index(self.sparse_index_table_filename(), self.sparse_index_budget)
+        except (IOError, OSError) as e:
+            log.warning("%s: could not build the sparse index: %s" % (self, e))
+            return
+
+        self.load_sparse_index(self.sparse_index_budget)
+        lookup_table_registry.register(self)
+
+    def load_bloom_filter(self, error_rate):
+        """
+        Load (or build and save) a Bloom filter of every state in the table.
+        steps() checks it first, a state the filter says is not in the table
+        is a miss without searching the table.
+
+        The filter is cached in a .bloom file next to the table, it is rebuilt
+        if it does not match the table. A table that is rebuilt with the same
+        linecount has the same size so we also check the mtime, a stale filter
+        would say no to states that are in the table.
+        """
+        if not self.linecount or self.ranker is not None:
+            return
+
+        # The file that iter_lines() reads the states from
+        if self.binary is not None:
+            filename = self.filename_bin
+        else:
+            filename = self.filename
+
+        filename_bloom = self.filename.replace('.txt', '.bloom')
+        bloom_filter = BloomFilter.for_capacity(self.linecount, error_rate)
+        table_stat = os.stat(filename)
+        header = {
+            'format': 'bloom',
+            'size': bloom_filter.size,
+            'hash_count': bloom_filter.hash_count,
+            'linecount': self.linecount,
+            'table_size': table_stat.st_size,
+            'table_mtime_ns': table_stat.st_mtime_ns,
+        }
+
+        if os.path.exists(filename_bloom):
+            bloom_header = read_binary_table_header(filename_bloom)
+            bloom_data_offset = bloom_header.pop('data_offset')
+
+            if bloom_header == header:
+                with open(filename_bloom, 'rb') as fh:
+                    fh.seek(bloom_data_offset)
+                    bloom_filter.bits = bytearray(fh.read())
+
+                self.bloom_filter = bloom_filter
+                return
+
+            log.info("%s: %s is stale, rebuilding it" % (self, filename_bloom))
+
+        log.info("%s: begin building bloom filter" % self)
+
+        for line in self.iter_lines():
+            bloom_filter.add(line.split(':')[0])
+
+        try:
+            with open(filename_bloom, 'wb') as fh:
+                write_binary_table_header(fh, header)
+                fh.write(bloom_filter.bits)
+        except (IOError, OSError) as e:
+            log.warning("%s: could not save %s: %s" % (self, filename_bloom, e))
+
+        self.bloom_filter = bloom_filter
+        log.info("%s: end building bloom filter (%d bytes)" % (self, len(bloom_filter.bits)))
+
+    def log_seek_calls(self):
+        """
+        Log and reset our seek and Bloom filter counters
+        """
+        if self.bloom_filter is not None:
+            log.info("%s: %d seek calls, bloom filter %d negative, %d positive, %d false positive" %
+                (self, self.fh_txt_seek_calls, self.bloom_filter_negatives, self.bloom_filter_positives, self.bloom_filter_false_positives))
+            self.bloom_filter_negatives = 0
+            self.bloom_filter_positives = 0
+            self.bloom_filter_false_positives = 0
+        else:
+            log.info("%s: %d seek calls" % (self, self.fh_txt_seek_calls))
+
+        self.fh_txt_seek_calls_total += self.fh_txt_seek_calls
+        self.fh_txt_seek_calls = 0
+
+    def sparse_index_bounds(self, b_key):
+        """
+        Return the (first, last) rows that b_key must be between if it is in the
+        table. last is less than first if b_key sorts before the first row.
+        """
+        sparse_index = self.sparse_index
+        key_width = self.sparse_index_key_width
+        first = 0
+        last = int(len(sparse_index) / key_width)
+
+        # Find how many of the index keys are <= b_key
+        while first < last:
+            midpoint = (first + last) >> 1
+            offset = midpoint * key_width
+
+            if b_key < sparse_index[offset:offset + key_width]:
+                last = midpoint
+            else:
+                first = midpoint + 1
+
+        if not first:
+            return (0, -1)
+
+        first_row = (first - 1) * self.sparse_index_stride
+        return (first_row, min(first_row + self.sparse_index_stride, self.linecount) - 1)
+
+    def binary_search_mmap(self, state_to_find):
+        mm = self.mm
+        width = self.width
+        state_width = self.state_width
+        b_state_to_find = state_to_find.encode('utf-8')
+
+        if self.sparse_index is not None:
+            (first, last) = self.sparse_index_bounds(b_state_to_find)
+        else:
+            first = 0
+            last = self.linecount - 1
+
+        while first <= last:
+            midpoint = (first + last) >> 1
+            offset = midpoint * width
+            self.fh_txt_seek_calls += 1
+
+            # Only compare the 'state' part of the line (for speed)
+            b_state = mm[offset:offset + state_width]
+
+            if b_state_to_find < b_state:
+                last = midpoint - 1
+
+            # If this is the line we are looking for, then return the entire line
+            elif b_state_to_find == b_state:
+                return mm[offset:offset + width].decode('utf-8').rstrip()
+
+            else:
+                first = midpoint + 1
+
+        return None
+
+    def binary_search_packed(self, b_key):
+        """
+        Return the offset of the row for b_key in our .bin table, None if it is not there
+        """
+        mm = self.mm
+        width = self.width
+        key_width = self.key_width
+        data_offset = self.data_offset
+
+        if self.sparse_index is not None:
+            (first, last) = self.sparse_index_bounds(b_key)
+        else:
+            first = 0
+            last = self.linecount - 1
+
+        while first <= last:
+            midpoint = (first + last) >> 1
+            offset = data_offset + (midpoint * width)
+            self.fh_txt_seek_calls += 1
+            b_state = mm[offset:offset + key_width]
+
+            if b_key < b_state:
+                last = midpoint - 1
+
+            elif b_key == b_state:
+                return offset
+
+            else:
+                first = midpoint + 1
+
+        return None
+
+    def binary_row_steps(self, offset):
+        """
+        Return the list of steps for the .bin row at offset
+        """
+        moves = self.binary_moves
+        return [moves[code] for code in self.mm[offset + self.key_width:offset + self.width].rstrip(b'\0')]
+
+    def binary_row_line(self, offset):
+        """
+        Return the .bin row at offset formatted as a 'state:steps' line
+        """
+        if self.ranker is not None:
+            state = self.ranker.unrank(int((offset - self.data_offset) / self.width))
+        else:
+            state = self.packer.unpack(self.mm[offset:offset + self.key_width])
+
+        return "%s:%s" % (state, ' '.join(self.binary_row_steps(offset)))
+
+    def binary_steps(self, state_to_find):
+
+        # For a ranked table the row is at the state's rank, no searching required
+        if self.ranker is not None:
+            rank = self.ranker.rank(state_to_find)
+
+            if rank is None:
+                return None
+
+            steps = self.binary_row_steps(self.data_offset + (rank * self.width))
+
+            if not steps:
+                return None
+
+            return steps
+
+        b_key = self.packer.pack(state_to_find)
+
+        if b_key is None:
+            return None
+
+        offset = self.binary_search_packed(b_key)
+
+        if offset is None:
+            return None
+
+        return self.binary_row_steps(offset)
+
+    def iter_lines(self):
+        """
+        Yield every 'state:steps' line in the table
+        """
+        if self.binary is None:
+            with open(self.filename, 'r') as fh:
+                for line in fh:
+                    yield line.rstrip()
+        else:
+            for line_number in range(self.linecount):
+                offset = self.data_offset + (line_number * self.width)
+
+                # The empty rows in a ranked table are states that are not in the table
+                if self.ranker is not None and not self.mm[offset:offset + self.width].rstrip(b'\0'):
+                    continue
+
+                yield self.binary_row_line(offset)
+
+    def binary_search(self, state_to_find):
+
+        if self.binary is not None:
+            steps = self.binary_steps(state_to_find)
+
+            if steps is None:
+                return None
+
+            return "%s:%s" % (state_to_find, ' '.join(steps))
+
+        if self.mm is not None:
+            return self.binary_search_mmap(state_to_find)
+
+        if self.sparse_index is not None:
+            return self.binary_search_sparse(state_to_find)
+
+        first = 0
+        last = self.linecount - 1
+        b_state_to_find = bytearray(state_to_find, encoding='utf-8')
+
+        while first <= last:
+            midpoint = int((first + last)/2)
+            self.fh_txt.seek(midpoint * self.width)
+            self.fh_txt_seek_calls += 1
+
+            # Only read the 'state' part of the line (for speed)
+            b_state = self.fh_txt.read(self.state_width)
+
+            if b_state_to_find < b_state:
+                last = midpoint - 1
+
+            # If this is the line we are looking for, then read the entire line
+            elif b_state_to_find == b_state:
+                self.fh_txt.seek(midpoint * self.width)
+                line = self.fh_txt.read(self.width)
+                return line.decode('utf-8').rstrip()
+
+            else:
+                first = midpoint + 1
+
+        return None
+
+    def binary_search_sparse(self, state_to_find):
+        """
+        Read the rows the sparse index says state_to_find must be in with a
+        single read() and binary search them in memory
+        """
+        width = self.width
+        state_width = self.state_width
+        b_state_to_find = state_to_find.encode('utf-8')
+        (first_row, last_row) = self.sparse_index_bounds(b_state_to_find)
+
+        if last_row < first_row:
+            return None
+
+        self.fh_txt.seek(first_row * width)
+        self.fh_txt_seek_calls += 1
+        chunk = self.fh_txt.read((last_row - first_row + 1) * width)
+        first = 0
+        last = last_row - first_row
+
+        while first <= last:
+            midpoint = (first + last) >> 1
+            offset = midpoint * width
+            b_state = chunk[offset:offset + state_width]
+
+            if b_state_to_find < b_state:
+                last = midpoint - 1
+
+            elif b_state_to_find == b_state:
+                return chunk[offset:offset + width].decode('utf-8').rstrip()
+
+            else:
+                first = midpoint + 1
+
+        return None
+
+    def preload_cache(self, preload_mode=None):
+
+        if self.preloaded_cache:
+            return
+
+        # Another cube in this process has already preloaded this table
+        storage = lookup_table_registry.get(self.filename)
+
+        if storage is not None and storage.get('preloaded_cache'):
+            self.cache = storage['cache']
+            self.preloaded_cache = True
+            return
+
+        if preload_mode is None:
+            preload_mode = self.preload_mode
+
+        log.info("%s: begin preload cache (%s)" % (self, preload_mode))
+
+        if preload_mode == 'compact':
+
+            # A sorted .bin table is already in the CompactRows format
+            if self.packer is not None:
+                rows = self.mm[self.data_offset:self.data_offset + (self.linecount * self.width)]
+                self.cache = CompactRows(rows, self.packer, self.width - self.key_width, self.binary['moves'])
+            else:
+                self.cache = CompactRows.from_lines(self.iter_lines)
+
+            cache_size = len(self.cache.rows)
+
+        elif preload_mode == 'dict':
+            self.cache = {}
+
+            # The bottleneck is the building of the dictionary, moreso that reading from disk.
+            for line in self.iter_lines():
+                (state, steps) = line.split(':')
+                self.cache[state] = steps.split()
+
+            cache_size = sys.getsizeof(self.cache)
+
+        else:
+            raise SolveError("%s: invalid preload_mode %s" % (self, preload_mode))
+
+        self.preloaded_cache = True
+        lookup_table_registry.register(self)
+        log.info("%s: end preload cache (%d bytes)" % (self, cache_size))
+
+    def steps(self, state_to_find=None):
+        """
+        Return a list of the steps found in the lookup table for the current cube state
+        """
+        if state_to_find is None:
+
+            # The table has the steps for the canonical copy of the cube
+            if self.symmetry is not None:
+                (state_to_find, symmetry_index) = self.symmetry_state()
+                steps = self.steps(state_to_find)
+
+                if steps:
+                    steps = self.symmetry_conjugate_steps(symmetry_index, steps)
+
+                return steps
+
+            state_to_find = self.state()
+
+        # If we are at one of our state_targets we do not need to do anything
+        if state_to_find in self.state_target:
+            return None
+
+        if self.preloaded_cache:
+            return self.cache.get(state_to_find)
+
+        if not self.lru_cache_size:
+            return self.lookup_steps(state_to_find)
+
+        lru_cache = self.lru_cache
+
+        # None is a valid result (most lookups are misses) so we need a
+        # different marker for "not cached"
+        steps_list = lru_cache.get(state_to_find, lru_cache_miss)
+
+        if steps_list is not lru_cache_miss:
+            lru_cache.move_to_end(state_to_find)
+            self.lru_cache_hits += 1
+            return steps_list
+
+        self.lru_cache_misses += 1
+        steps_list = self.lookup_steps(state_to_find)
+        lru_cache[state_to_find] = steps_list
+
+        while len(lru_cache) > self.lru_cache_size:
+            lru_cache.popitem(last=False)
+            self.lru_cache_evictions += 1
+
+        return steps_list
+
+    def lookup_steps(self, state_to_find):
+        """
+        steps() without any of the caching
+        """
+        if self.bloom_filter is not None:
+            if state_to_find not in self.bloom_filter:
+                self.bloom_filter_negatives += 1
+                return None
+
+            self.bloom_filter_positives += 1
+
+        # The .bin rows are already move codes, no need to parse a line
+        if self.binary is not None:
+            steps_list = self.binary_steps(state_to_find)
+        else:
+            line = self.binary_search(state_to_find)
+
+            if line:
+                (state, steps) = line.strip().split(':')
+                steps_list = steps.split()
+            else:
+                steps_list = None
+
+        if steps_list is None and self.bloom_filter is not None:
+            self.bloom_filter_false_positives += 1
+
+        return steps_list
+
+    def row_key(self, row):
+        """
+        Return the key (the state for a .txt table, the packed state for a .bin
+        table) of a row
+        """
+        if self.binary is not None:
+            offset = self.data_offset + (row * self.width)
+            return self.mm[offset:offset + self.key_width]
+
+        if self.mm is not None:
+            offset = row * self.width
+            return self.mm[offset:offset + self.state_width]
+
+        self.fh_txt.seek(row * self.width)
+        return self.fh_txt.read(self.state_width)
+
+    def row_steps(self, row):
+        """
+        Return the list of steps for a row
+        """
+        if self.binary is not None:
+            return self.binary_row_steps(self.data_offset + (row * self.width))
+
+        if self.mm is not None:
+            line = self.mm[row * self.width:(row + 1) * self.width]
+        else:
+            self.fh_txt.seek(row * self.width)
+            line = self.fh_txt.read(self.width)
+
+        return line.decode('utf-8').split(':')[1].split()
+
+    def steps_many_walk(self, keys, first_key, last_key, first_row, last_row, rows):
+        """
+        keys[first_key:last_key + 1] are sorted and can only be in rows
+        first_row to last_row.  Binary search for the middle key, that splits
+        both the keys and the rows in two, then recurse on each half.  Every
+        search after the first is over a smaller range of the table than the
+        one before it.
+        """
+        while first_key <= last_key and first_row <= last_row:
+            middle_key = (first_key + last_key) >> 1
+            b_key = keys[middle_key]
+            first = first_row
+            last = last_row
+
+            while first <= last:
+                midpoint = (first + last) >> 1
+                self.fh_txt_seek_calls += 1
+                b_state = self.row_key(midpoint)
+
+                if b_key < b_state:
+                    last = midpoint - 1
+
+                elif b_key == b_state:
+                    rows[middle_key] = midpoint
+                    break
+
+                else:
+                    first = midpoint + 1
+
+            # The keys before middle_key are in the rows before where middle_key
+            # is (or would be), the keys after it are in the rows after it
+            if middle_key in rows:
+                self.steps_many_walk(keys, first_key, middle_key - 1, first_row, midpoint - 1, rows)
+                first_row = midpoint + 1
+            else:
+                self.steps_many_walk(keys, first_key, middle_key - 1, first_row, first - 1, rows)
+                first_row = first
+
+            first_key = middle_key + 1
+
+    def steps_many(self, states):
+        """
+        Return a dict of state -> list of steps for each of states, a state that
+        is not in the table maps to None.
+
+        The states are sorted and de-duplicated and then found in one walk
+        through the table (see steps_many_walk()), this is much less random IO
+        than a steps() call per state.
+        """
+        result = {}
+        states_to_find = []
+
+        for state in sorted(set(states)):
+            if state in self.state_target:
+                result[state] = None
+            elif self.bloom_filter is not None and state not in self.bloom_filter:
+                self.bloom_filter_negatives += 1
+                result[state] = None
+            else:
+                states_to_find.append(state)
+
+        # There is no searching to batch for these
+        if self.preloaded_cache or self.ranker is not None or not self.linecount:
+            for state in states_to_find:
+                result[state] = self.steps(state)
+            return result
+
+        keys = []
+
+        for state in states_to_find:
+            if self.binary is not None:
+                b_key = self.packer.pack(state)
+            else:
+                b_key = state.encode('utf-8')
+
+            # This state has a character that is not in the table
+            if b_key is None:
+                result[state] = None
+            else:
+                keys.append((b_key, state))
+
+        # The packed keys sort in the same order as the states but keep this
+        # honest in case that ever changes
+        keys.sort()
+        rows = {}
+        self.steps_many_walk([b_key for (b_key, state) in keys], 0, len(keys) - 1, 0, self.linecount - 1, rows)
+
+        for (index, (b_key, state)) in enumerate(keys):
+            row = rows.get(index)
+
+            if row is None:
+                result[state] = None
+            else:
+                result[state] = self.row_steps(row)
+
+        return result
+
+    def lru_cache_stats(self):
+        """
+        Return a dict of our LRU cache counters
+        """
+        return {
+            'capacity': self.lru_cache_size,
+            'size': len(self.lru_cache),
+            'hits': self.lru_cache_hits,
+            'misses': self.lru_cache_misses,
+            'evictions': self.lru_cache_evictions,
+        }
+
+    def steps_cost(self, state_to_find=None):
+
+        if state_to_find is None:
+            state_to_find = self.canonical_state()
+
+        # steps() does the LRU caching for us
+        steps = self.steps(state_to_find)
+
+        if steps is None:
+            #log.info("%s: steps_cost None for %s (stage_target)" % (self, state_to_find))
+            return 0
+        else:
+            if steps[0].isdigit():
+                return int(steps[0])
+            else:
+                #log.info("%s: steps_cost %d for %s (%s)" % (self, len(steps), state_to_find, ' '.join(steps)))
+                return len(steps)
+
+    def solve(self):
+
+        if not self.filename_exists:
+            raise SolveError("%s does not exist" % self.filename)
+
+        if 'TBD' in self.state_target:
+            tbd = True
+        else:
+            tbd = False
+
+        while True:
+            if self.symmetry is not None:
+                (state, symmetry_index) = self.symmetry_state()
+            else:
+                state = self.state()
+
+            if tbd:
+                log.info("%s: solve() state %s vs state_target %s" % (self, state, pformat(self.state_target)))
+
+            if state in self.state_target:
+                break
+
+            steps = self.steps(state)
+
+            if steps:
+                if self.symmetry is not None:
+                    steps = self.symmetry_conjugate_steps(symmetry_index, steps)
+
+                #log.info("%s: PRE solve() state %s found %s" % (self, state, ' '.join(steps)))
+                #self.parent.print_cube()
+                #log.info("%s: %d steps" % (self, len(steps)))
+
+                for step in steps:
+                    self.parent.rotate(step)
+
+                #log.info("%s: POST solve()" % self)
+                #self.parent.print_cube()
+
+            else:
+                self.parent.print_cube()
+                raise NoSteps("%s: state %s does not have steps" % (self, state))
+
+    def solve_many_score(self, score):
+        """
+        score() for the cube as it is now, by default the length of the solution
+        """
+        if score is None:
+            return self.parent.get_solution_len_minus_rotates(self.parent.solution)
+
+        return score(self.parent)
+
+    def solve_many_results(self, solutions, k, score):
+        """
+        solutions is a dict of cube state -> solution, score them and return the
+        best k as (score, state, solution) tuples. The cube is left at
+        original_state.
+        """
+        results = []
+
+        try:
+            for (state, solution) in solutions.items():
+                self.parent.state = list(state)
+                self.parent.solution = solution[:]
+                results.append((self.solve_many_score(score), list(state), solution))
+        finally:
+            self.parent.state = self.original_state[:]
+            self.parent.solution = self.original_solution[:]
+
+        # sorted() is stable so ties keep the order we found them in
+        results = sorted(results, key=lambda result: result[0])
+        return results[:k]
+
+    def solve_many(self, k, score=None, moves=None, max_extra_moves=1):
+        """
+        Return up to k solutions as a list of (score, state, solution) tuples,
+        lowest score first. state and solution are the cube's state and
+        solution after that solution. score is called with the cube in the
+        state of each solution, by default it is the length of the solution.
+        The cube is left as it was.
+
+        We only know one way to solve each state, if moves is given we also
+        try every sequence of up to max_extra_moves of them before our steps.
+        """
+        if not self.filename_exists:
+            raise SolveError("%s does not exist" % self.filename)
+
+        self.original_state = self.parent.state[:]
+        self.original_solution = self.parent.solution[:]
+        rotate_xxx = get_rotate_xxx(self.parent.size)
+
+        # cube state -> solution, the first solution that gets us to a state wins
+        solutions = OrderedDict()
+        prefixes = [([], self.original_state)]
+
+        try:
+            for depth in range(max_extra_moves + 1 if moves else 1):
+                next_prefixes = []
+
+                for (prefix, prefix_state) in prefixes:
+                    self.parent.state = prefix_state[:]
+                    state = self.canonical_state()
+
+                    if state in self.state_target or self.steps(state):
+                        self.parent.solution = self.original_solution[:]
+
+                        for step in prefix:
+                            self.parent.solution.append(step)
+
+                        LookupTable.solve(self)
+                        solutions.setdefault(tuple(self.parent.state), self.parent.solution[:])
+
+                    if depth < max_extra_moves and moves:
+                        for step in moves:
+                            if prefix and steps_on_same_face_and_layer(prefix[-1], step):
+                                continue
+
+                            next_prefixes.append((prefix + [step], rotate_xxx(prefix_state, step)))
+
+                prefixes = next_prefixes
+        finally:
+            self.parent.state = self.original_state[:]
+            self.parent.solution = self.original_solution[:]
+
+        log.info("%s: solve_many found %d solutions" % (self, len(solutions)))
+        return self.solve_many_results(solutions, k, score)
+
+    def heuristic(self):
+        """
+        Our cost for the cube as a prune table. This is one lookup so there is
+        nothing to cut short with a bound, LookupTableIDA.ida_heuristic(bound)
+        skips calling us instead.
+        """
+        return self.state_heuristic(self.canonical_state())
+
+    def state_heuristic(self, pt_state):
+        self.heuristic_calls += 1
+
+        if pt_state in self.state_target:
+            return 0
+
+        else:
+            pt_steps_cost = self.steps_cost(pt_state)
+
+            if pt_steps_cost:
+                return pt_steps_cost
+
+            elif self.max_depth:
+                # This is the exception to the rule but some prune tables such
+                # as lookup-table-6x6x6-step23-UD-oblique-edge-pairing-LFRB-only.txt
+                # are partial tables so use the max_depth of the table +1
+                return self.max_depth + 1
+
+        self.parent.print_cube()
+        raise SolveError("%s does not have max_depth and does not have steps for %s, state_width %d" % (self, pt_state, self.state_width))
+
+
+    def load_signature_index(self, signature_width):
+        """
+        The edges tables have states like 001001010110_10425376a8b9ecfdhgkiljnm
+        where the first signature_width characters are a binary signature of
+        which edges are paired. The table is sorted so all of the rows for a
+        signature are together, build (or load) an index of where the rows for
+        each signature start so that finding them is a single read.
+
+        signature_index[signature] is the first row for signature, the last
+        row is signature_index[signature + 1] - 1
+        """
+        filename_index = self.filename.replace('.txt', '.signature-index')
+        signature_count = 1 << signature_width
+
+        # A table rebuilt with the same linecount is the same size, the mtime
+        # tells them apart, see load_bloom_filter()
+        table_stat = os.stat(self.filename)
+        header = {
+            'format': 'signature-index',
+            'signature_width': signature_width,
+            'linecount': self.linecount,
+            'table_size': table_stat.st_size,
+            'table_mtime_ns': table_stat.st_mtime_ns,
+        }
+
+        if os.path.exists(filename_index):
+            index_header = read_binary_table_header(filename_index)
+            index_data_offset = index_header.pop('data_offset')
+
+            if index_header == header:
+                with open(filename_index, 'rb') as fh:
+                    fh.seek(index_data_offset)
+                    self.signature_index = list(struct.unpack('>%dI' % (signature_count + 1), fh.read(4 * (signature_count + 1))))
+                    self.signature_index_width = signature_width
+                    return
+
+            log.info("%s: %s is stale, rebuilding it" % (self, filename_index))
+
+        log.info("%s: begin building signature index" % self)
+        signature_index = []
+        first = 0
+
+        # For each signature find the first row that is >= it
+        for signature in range(signature_count):
+            b_signature = (('{0:0%db}' % signature_width).format(signature)).encode('utf-8')
+            last = self.linecount
+
+            while first < last:
+                midpoint = (first + last) >> 1
+
+                if self.row_key(midpoint)[:signature_width] < b_signature:
+                    first = midpoint + 1
+                else:
+                    last = midpoint
+
+            signature_index.append(first)
+
+        signature_index.append(self.linecount)
+
+        try:
+            with open(filename_index, 'wb') as fh:
+                write_binary_table_header(fh, header)
+                fh.write(struct.pack('>%dI' % (signature_count + 1), *signature_index))
+        except (IOError, OSError) as e:
+            log.warning("%s: could not save %s: %s" % (self, filename_index, e))
+
+        self.signature_index = signature_index
+        self.signature_index_width = signature_width
+        log.info("%s: end building signature index" % self)
+
+    def read_rows(self, first_row, last_row):
+        """
+        Return the lines for rows first_row to last_row, this is one read
+        """
+        if last_row < first_row:
+            return []
+
+        width = self.width
+
+        if self.mm is not None:
+            chunk = self.mm[first_row * width:(last_row + 1) * width]
+        else:
+            self.fh_txt.seek(first_row * width)
+            chunk = self.fh_txt.read((last_row - first_row + 1) * width)
+
+        self.fh_txt_seek_calls += 1
+        chunk = chunk.decode('utf-8')
+        return [chunk[offset:offset + width].rstrip() for offset in range(0, len(chunk), width)]
+
+    def use_signature_index(self, signature_width):
+        """
+        Return True if find_edge_entries_with_signature() and
+        find_edge_entries_with_loose_signature() can use a signature index
+        """
+        if self.binary is not None or signature_width > 16:
+            return False
+
+        if self.signature_index is None or self.signature_index_width != signature_width:
+            self.load_signature_index(signature_width)
+            lookup_table_registry.register(self)
+
+        return True
+
+    def find_edge_entries_with_loose_signature(self, signature_to_find):
+        """
+        Given a signature such as 001001010110, return a list of all of the lines
+        in our lookup-table that will not break up any of the paired edges (a 1
+        represents a paired edge).
+
+        This is only used by the 4x4x4 and 5x5x5 edges tables
+        """
+        result = []
+        signature_width = len(signature_to_find)
+        signature_to_find = int(signature_to_find, 2)
+
+        # Only read the blocks of rows whose signature is a superset of signature_to_find
+        if self.use_signature_index(signature_width):
+            signature_index = self.signature_index
+
+            for signature in range(1 << signature_width):
+                if (signature & signature_to_find) == signature_to_find:
+                    result.extend(self.read_rows(signature_index[signature], signature_index[signature + 1] - 1))
+
+            return result
+
+        for line in self.iter_lines():
+
+            # If signature_to_find is 0 we will add every line so no
+            # need to bitwise AND the signatures
+            if signature_to_find == 0:
+                result.append(line)
+            else:
+                signature = line.split('_')[0]
+                signature = int(signature, 2)
+
+                if (signature & signature_to_find) == signature_to_find:
+                    result.append(line)
+
+        return result
+
+    def find_binary_entries_with_prefix(self, prefix):
+        """
+        Return a list of all of the lines in our .bin table whose state starts with prefix
+        """
+        if self.ranker is not None:
+            return [line for line in self.iter_lines() if line.startswith(prefix)]
+
+        result = []
+        mm = self.mm
+        width = self.width
+        key_width = self.key_width
+        data_offset = self.data_offset
+
+        # The packed key for the smallest state that starts with prefix
+        b_key = self.packer.pack(prefix + self.packer.alphabet[0] * (self.state_width - len(prefix)))
+
+        if b_key is None:
+            return result
+
+        # Find the first row that is >= b_key
+        first = 0
+        last = self.linecount
+
+        while first < last:
+            midpoint = (first + last) >> 1
+            offset = data_offset + (midpoint * width)
+
+            if mm[offset:offset + key_width] < b_key:
+                first = midpoint + 1
+            else:
+                last = midpoint
+
+        # Go forward one row at a time until we have read all the rows with prefix
+        for line_number in range(first, self.linecount):
+            line = self.binary_row_line(data_offset + (line_number * width))
+
+            if not line.startswith(prefix):
+                break
+
+            result.append(line)
+
+        return result
+
+    def find_edge_entries_with_signature(self, signature_to_find):
+        """
+        Given a signature such as 001001010110, return a list of all of the lines
+        in our lookup-table that start with that signature.
+
+        This is only used by 4x4x4 edges tables
+        """
+        if self.binary is not None:
+            return self.find_binary_entries_with_prefix(signature_to_find)
+
+        if self.use_signature_index(len(signature_to_find)):
+            first_row = self.signature_index[int(signature_to_find, 2)]
+            last_row = self.signature_index[int(signature_to_find, 2) + 1] - 1
+
+            if last_row < first_row:
+                log.warning("could not find signature %s" % signature_to_find)
+                return []
+
+            # Return the lines in the same order as the search below would, the
+            # row the binary search lands on and back to first_row, then forward
+            # to last_row.  Which row the binary search lands on only depends
+            # on where the block of rows is.
+            first = 0
+            last = self.linecount - 1
+
+            while True:
+                midpoint = int((first + last)/2)
+
+                if midpoint < first_row:
+                    first = midpoint + 1
+                elif midpoint > last_row:
+                    last = midpoint - 1
+                else:
+                    break
+
+            lines = self.read_rows(first_row, last_row)
+            midpoint -= first_row
+            return list(reversed(lines[:midpoint + 1])) + lines[midpoint + 1:]
+
+        self.fh_txt.seek(0)
+        result = []
+
+        first = 0
+        last = self.linecount - 1
+        signature_width = len(signature_to_find)
+        b_signature_to_find = bytearray(signature_to_find, encoding='utf-8')
+
+        fh = self.fh_txt
+
+        # Find an entry with signature_to_find
+        while first <= last:
+            midpoint = int((first + last)/2)
+            fh.seek(midpoint * self.width)
+
+            # Only read the 'state' part of the line (for speed)
+            b_signature = fh.read(signature_width)
+
+            if b_signature_to_find < b_signature:
+                last = midpoint - 1
+
+            # If this is the line we are looking for
+            elif b_signature_to_find == b_signature:
+                break
+
+            else:
+                first = midpoint + 1
+        else:
+            log.warning("could not find signature %s" % signature_to_find)
+            return result
+
+        line_number_midpoint_signature_to_find = midpoint
+
+        # Go back one line at a time until we are at the first line with signature_to_find
+        while True:
+            fh.seek(midpoint * self.width)
+
+            line = fh.read(self.width)
+            line = line.decode('utf-8').rstrip()
+            (edges_state, steps) = line.split(':')
+            (signature, _) = edges_state.split('_')
+
+            if signature != signature_to_find:
+                break
+
+            result.append(line)
+            midpoint -= 1
+
+            if midpoint < 0:
+                break
+
+
+        # Go forward one line at a time until we have read all the lines
+        # with signature_to_find
+        midpoint = line_number_midpoint_signature_to_find + 1
+
+        while midpoint <= self.linecount - 1:
+            fh.seek(midpoint * self.width)
+            line = fh.read(self.width)
+            line = line.decode('utf-8').rstrip()
+            (edges_state, steps) = line.split(':')
+            (signature, _) = edges_state.split('_')
+
+            if signature == signature_to_find:
+                result.append(line)
+            else:
+                break
+
+            midpoint += 1
+
+        return result
+
+    def state(self):
+        raise Exception("child class must implement state()")
+
+    def state_from_pattern(self, pattern):
+        """
+        A table that sets state_positions and state_pattern can be searched via
+        coordinates (see Coordinates.py). pattern is the joined state_pattern
+        characters of the squares at state_positions, return what state()
+        would return for that pattern.
+        """
+        return pattern
+
+    def symmetry_transforms(self):
+        return self.symmetry.transforms(self.parent.size, get_rotate_xxx(self.parent.size))
+
+    def symmetry_state(self):
+        """
+        Return the canonical state, the lowest state() of all of the symmetric
+        copies of the cube, and the index of the symmetry that made it
+        """
+
+        # If we know which squares state() looks at only move those
+        if self.state_positions is not None:
+            return self.pattern_symmetry_state(self.cube_pattern())
+
+        parent = self.parent
+        original_state = parent.state
+        result = None
+
+        try:
+            for (index, (permutation, recolor)) in enumerate(self.symmetry_transforms()):
+                parent.state = [original_state[0]] + [recolor[original_state[x]] for x in permutation[1:]]
+                state = self.state()
+
+                if result is None or state < result[0]:
+                    result = (state, index)
+        finally:
+            parent.state = original_state
+
+        return result
+
+    def canonical_state(self):
+        """
+        The state to look up in the table
+        """
+        if self.symmetry is None:
+            return self.state()
+
+        return self.symmetry_state()[0]
+
+    def symmetry_conjugate_steps(self, symmetry_index, steps):
+        """
+        steps are from the table for the canonical state made by symmetry_index,
+        return the steps that do the same for the cube
+        """
+        return self.symmetry.conjugate_steps(symmetry_index, steps, self.parent.size, get_rotate_xxx(self.parent.size))
+
+    def pattern_symmetry_state(self, pattern):
+        """
+        symmetry_state() for a pattern of the squares at state_positions
+        """
+        if self.symmetry_pattern_transforms is None:
+            symmetry_transforms = self.symmetry_transforms()
+            getter_permutations = projected_permutations(self.state_positions, [permutation for (permutation, recolor) in symmetry_transforms])
+            transforms = []
+
+            for ((permutation, recolor), getter_permutation) in zip(symmetry_transforms, getter_permutations):
+
+                # The recoloring must work on the pattern characters too, if
+                # two colors with the same character are recolored to colors
+                # with different characters we cannot do this via patterns.
+                # An 'x' square (see fake cubes) is not recolored.
+                pattern_recolor = {}
+
+                for (color, character) in self.state_pattern.items():
+                    recolored = self.state_pattern[recolor.get(color, color)]
+
+                    if pattern_recolor.setdefault(character, recolored) != recolored:
+                        raise ValueError("%s: state_pattern does not survive the symmetry recoloring" % self)
+
+                transforms.append((itemgetter(*getter_permutation), pattern_recolor))
+
+            self.symmetry_pattern_transforms = transforms
+
+        pattern = tuple(pattern)
+        result = None
+
+        for (index, (getter, pattern_recolor)) in enumerate(self.symmetry_pattern_transforms):
+            state = self.state_from_pattern(''.join([pattern_recolor[x] for x in getter(pattern)]))
+
+            if result is None or state < result[0]:
+                result = (state, index)
+
+        return result
+
+    def pattern_state(self, pattern):
+        """
+        state_from_pattern() of the canonical pattern, this is canonical_state()
+        for coordinates
+        """
+        if self.symmetry is None:
+            return self.state_from_pattern(pattern)
+
+        return self.pattern_symmetry_state(pattern)[0]
+
+    def cube_pattern(self):
+        """
+        The joined state_pattern characters of the squares at state_positions
+        """
+        parent_state = self.parent.state
+        return ''.join([self.state_pattern[parent_state[x]] for x in self.state_positions])
+
+    def build_move_table(self, moves, rotate_xxx):
+        """
+        Build the move table for our RankCoordinate and save it next to the
+        table. utils/build-move-table.py calls this, it takes a while so the
+        move table is never built in the middle of a solve.
+
+        The pattern is ranked as one orbit of state_pattern characters. For
+        each rank we store the rank that each move leads to and the
+        state_heuristic() of the rank.
+        """
+        pattern = self.cube_pattern()
+        width = len(pattern)
+        alphabet = ''.join(sorted(set(self.state_pattern.values())))
+        counts = [[pattern.count(char) for char in alphabet]]
+        ranker = StateRanker('str', width, [list(range(width))], alphabet, counts)
+        getters = [itemgetter(*permutation) for permutation in
+                   projected_permutations(self.state_positions, move_permutations(rotate_xxx, len(self.parent.state), moves))]
+        move_count = len(moves)
+        next_ranks = array('I', bytes(4 * ranker.size * move_count))
+        costs = bytearray(ranker.size)
+        log.info("%s: begin building move table, %d ranks x %d moves" % (self, ranker.size, move_count))
+
+        for rank in range(ranker.size):
+            rank_pattern = ranker.unrank(rank)
+            costs[rank] = self.state_heuristic(self.pattern_state(rank_pattern))
+            rank_pattern = tuple(rank_pattern)
+            index = rank * move_count
+
+            for getter in getters:
+                next_ranks[index] = ranker.rank(''.join(getter(rank_pattern)))
+                index += 1
+
+        filename_move_table = self.filename.replace('.txt', '.move-table')
+
+        with open(filename_move_table, 'wb') as fh:
+            write_binary_table_header(fh, self.move_table_header(moves, ranker))
+            fh.write(next_ranks.tobytes())
+            fh.write(costs)
+
+        log.info("%s: end building move table %s" % (self, filename_move_table))
+
+    def move_table_header(self, moves, ranker):
+        if self.binary is not None:
+            table_size = os.path.getsize(self.filename_bin)
+        else:
+            table_size = os.path.getsize(self.filename)
+
+        return {
+            'format': 'move-table',
+            'moves': list(moves),
+            'positions': list(self.state_positions),
+            'pattern': self.state_pattern,
+            'rank': ranker.to_spec(),
+            'table_size': table_size,
+            'byteorder': sys.byteorder,
+            'symmetry': list(self.symmetry.sequences) if self.symmetry is not None else None,
+        }
+
+    def load_move_table(self, moves):
+        """
+        Return a RankCoordinate for searching with moves if there is a move
+        table for us, else None. The move table is mmap'd so every process
+        using it shares one copy.
+        """
+        filename_move_table = self.filename.replace('.txt', '.move-table')
+
+        if not os.path.exists(filename_move_table):
+            return None
+
+        header = read_binary_table_header(filename_move_table)
+        data_offset = header.pop('data_offset')
+        ranker = StateRanker.from_spec(header['rank'])
+
+        # Round trip what we expect through json so the tuples are lists, etc
+        if header != json.loads(json.dumps(self.move_table_header(header['moves'], ranker))):
+            log.warning("%s: %s is stale, rebuild it with utils/build-move-table.py" % (self, filename_move_table))
+            return None
+
+        try:
+            move_columns = [header['moves'].index(move) for move in moves]
+        except ValueError:
+            log.info("%s: %s was not built for all of the moves %s" % (self, filename_move_table, ' '.join(moves)))
+            return None
+
+        move_count = len(header['moves'])
+
+        with open(filename_move_table, 'rb') as fh:
+            mm = mmap_table(fh)
+
+        data = memoryview(mm)
+        next_ranks_end = data_offset + (4 * ranker.size * move_count)
+        next_ranks = data[data_offset:next_ranks_end].cast('I')
+        costs = data[next_ranks_end:next_ranks_end + ranker.size]
+        return RankCoordinate(self, ranker, next_ranks, costs, move_count, move_columns)
+
+
+class LookupTableCostOnly(LookupTable):
+
+    shared_attributes = (
+        'linecount', 'fh_txt', 'mm', 'content',
+        'binary', 'ranker', 'data_offset', 'nibble', 'costs',
+    )
+
+    def __init__(self, parent, filename, state_target, linecount, max_depth=None, load_string=True, use_mmap=True):
+        self.parent = parent
+        self.sides_all = (self.parent.sideU, self.parent.sideL, self.parent.sideF, self.parent.sideR, self.parent.sideB, self.parent.sideD)
+        self.filename = filename
+        self.filename_gz = filename + '.gz'
+        self.desc = filename.replace('lookup-table-', '').replace('.txt', '')
+        self.filename_exists = False
+        self.linecount = linecount
+        self.max_depth = max_depth
+        self.avoid_oll = False
+        self.avoid_pll = False
+        self.preloaded_state_set = False
+        self.ida_all_the_way = False
+        self.use_lt_as_prune = False
+
+        assert self.filename.startswith('lookup-table'), "We only support lookup-table*.txt files"
+        assert self.filename.endswith('.txt'), "We only support lookup-table*.txt files"
+
+        if 'dummy' not in self.filename:
+            assert self.linecount, "%s linecount is %s" % (self, self.linecount)
+
+        self.filename_bin = filename.replace('.txt', '.bin')
+        self.binary = None
+        self.ranker = None
+
+        if not os.path.exists(self.filename) and not os.path.exists(self.filename_bin):
+            if not os.path.exists(self.filename_gz):
+                url = "https://github.com/dwalton76/rubiks-cube-lookup-tables-%sx%sx%s/raw/master/%s" % (self.parent.size, self.parent.size, self.parent.size, self.filename_gz)
+                log.info("Downloading table via 'wget %s'" % url)
+                call(['wget', url])
+
+            log.warning("gunzip %s" % self.filename_gz)
+            call(['gunzip', self.filename_gz])
+
+        self.filename_exists = True
+
+        if isinstance(state_target, tuple):
+            self.state_target = set(state_target)
+        elif isinstance(state_target, list):
+            self.state_target = set(state_target)
+        else:
+            self.state_target = set((state_target, ))
+
+        self.fh_txt_seek_calls = 0
+        self.fh_txt = None
+        self.mm = None
+        self.content = None
+
+        # Some cost-only tables are 2^32 characters, we do not want to read a 4G
+        # string into memory so for those we will seek()/read() through the file.
+        # We do not have to binary_search() though so that cuts way down on the
+        # number of reads.
+        #
+        # mmap gives us the best of both, lookups are a single index into the
+        # mapping and all of the processes using the table share one copy of it
+        # via the page cache.
+        storage = lookup_table_registry.get(self.filename)
+
+        if storage is not None:
+            self.__dict__.update(storage)
+            return
+
+        if os.path.exists(self.filename_bin):
+            self.load_binary()
+        elif use_mmap:
+            self.fh_txt = open(self.filename, mode='rb')
+            self.mm = mmap_table(self.fh_txt)
+        elif load_string:
+            with open(self.filename, 'r') as fh:
+                for line in fh:
+                    self.content = line
+            self.fh_txt_seek_calls += 1
+        else:
+            # 'rb' mode is about 3x faster than 'r' mode
+            self.fh_txt = open(self.filename, mode='rb')
+
+        lookup_table_registry.register(self)
+
+    def load_binary(self):
+        """
+        A .cost-only.bin table, the .bin tables are always mmap'd
+        """
+        header = read_binary_table_header(self.filename_bin)
+
+        if header['format'] != 'cost-only':
+            raise SolveError("%s: %s is not a cost-only table" % (self, self.filename_bin))
+
+        self.binary = header
+        self.data_offset = header['data_offset']
+        self.nibble = bool(header['packing'] == 'nibble')
+
+        if 'rank' in header:
+            self.ranker = StateRanker.from_spec(header['rank'])
+
+        self.fh_txt = open(self.filename_bin, mode='rb')
+        self.mm = mmap_table(self.fh_txt)
+
+        # steps_cost_many() uses a numpy view of the same pages
+        if numpy is not None:
+            self.costs = numpy.frombuffer(self.mm, dtype=numpy.uint8, offset=self.data_offset)
+        else:
+            self.costs = None
+
+    def steps_cost(self, state_to_find=None):
+
+        if state_to_find is None:
+            state_to_find = self.canonical_state()
+
+        # A .cost-only.bin table has one byte per state, if the table is ranked
+        # the byte for a state is at its rank instead of at state_to_find
+        if self.binary is not None:
+            if self.ranker is not None:
+                index = self.ranker.rank(state_to_find)
+
+                if index is None:
+                    raise SolveError("%s: state %s is not a valid pattern for this table" % (self, state_to_find))
+            else:
+                index = state_to_find
+
+            if self.nibble:
+                if index & 1:
+                    return self.mm[self.data_offset + (index >> 1)] & 0x0f
+                return self.mm[self.data_offset + (index >> 1)] >> 4
+
+            return self.mm[self.data_offset + index]
+
+        # state_to_find is an integer, there is a one byte hex character in the file for each possible state.
+        # This hex character is the number of steps required to solve the corresponding state.
+        if self.mm is not None:
+            return hex_byte_value[self.mm[state_to_find]]
+
+        elif self.content is None:
+            self.fh_txt.seek(state_to_find)
+            result = int(self.fh_txt.read(1).decode('utf-8'), 16)
+
+            #if result == 0:
+            #    raise Exception("%s: table is hosed...result for %d is 0" % (self, state_to_find))
+
+            self.fh_txt_seek_calls += 1
+            return result
+
+        else:
+            return int(self.content[state_to_find], 16)
+
+    def steps_cost_many(self, states):
+        """
+        Return the cost for each of the states. For a .cost-only.bin table with
+        numpy available this is a single vectorized gather and returns a numpy
+        array, otherwise it returns a list.
+        """
+        if self.binary is None or self.costs is None:
+            return [self.steps_cost(state) for state in states]
+
+        if self.ranker is not None:
+            rank = self.ranker.rank
+            indexes = [rank(state) for state in states]
+
+            if None in indexes:
+                raise SolveError("%s: not all states are valid patterns for this table" % self)
+        else:
+            indexes = states
+
+        indexes = numpy.asarray(indexes, dtype=numpy.int64)
+
+        if self.nibble:
+            values = self.costs[indexes >> 1]
+            return numpy.where(indexes & 1, values & 0x0f, values >> 4)
+
+        return self.costs[indexes]
+
+
+# The LookupTableIDA that a parallel IDA worker is searching and the lowest
+# subtree index that a worker has found a solution in. These are only set in
+# the workers, see parallel_ida_init().
+parallel_ida_table = None
+parallel_ida_found_index = None
+
+
+def parallel_ida_init(table, found_index):
+    """
+    Runs once in each parallel IDA worker when it starts. The worker is
+    forked so table and found_index are the parent's objects, inherited
+    instead of pickled.
+
+    The tables that are mmap'd can be shared by the workers but a table that
+    does seek()/read() on a file handle cannot, all of the processes would be
+    moving the same file offset around. Give each worker its own file handle.
+    """
+    global parallel_ida_table
+    global parallel_ida_found_index
+
+    parallel_ida_table = table
+    parallel_ida_found_index = found_index
+
+    for lt in (table,) + tuple(table.prune_tables):
+        if lt.fh_txt is not None and lt.mm is None:
+            lt.fh_txt = open(lt.fh_txt.name, mode='rb')
+
+
+def parallel_ida_search(threshold, subtree_index, start_path):
+    """
+    Runs in a parallel IDA worker, search the subtree at the end of start_path.
+    If we find a solution return the cube state and solution so the parent
+    process can pick them up. The counters from our IDATelemetry are
+    returned either way so the parent can add them to its own.
+    """
+    table = parallel_ida_table
+    found_index = parallel_ida_found_index
+
+    def stop():
+        # Someone found a solution in a subtree that comes before ours, or
+        # the parent ran out of time and set found_index to -1
+        return bool(found_index.value < subtree_index)
+
+    table.ida_count = 0
+
+    # Most subtrees are too small for ida_search_iterative() to get to
+    # its first stop() and deadline check at 1024 nodes so check them here
+    if stop():
+        return (False, 0, None, None, None)
+
+    if table.ida_deadline is not None:
+        table.ida_check_deadline()
+
+    table.telemetry = IDATelemetry(str(table), table.ida_engine, table.prune_tables, table.telemetry_timing)
+
+    # Each worker gets its share of transposition_table_bytes. The table
+    # is cleared for each subtree so the solution we find in a subtree does
+    # not depend on which subtrees this worker happened to search before.
+    table.transposition_table = TranspositionTable(int(table.transposition_table_bytes / table.parallel_ida_workers))
+    (f_cost, found_solution) = table.ida_search_iterative(threshold, start_path, stop)
+    table.telemetry.finish(None)
+    counters = table.telemetry.counters()
+
+    if found_solution:
+        with found_index.get_lock():
+            if subtree_index < found_index.value:
+                found_index.value = subtree_index
+
+        return (True, table.ida_count, table.parent.state[:], table.parent.solution[:], counters)
+
+    return (False, table.ida_count, None, None, counters)
+
+
+class IDASearch(object):
+    """
+    A LookupTableIDA.solve_many() search of one cube state that is searched
+    one threshold at a time, see LookupTableIDA.solve_many_begin()
+    """
+
+    def __init__(self, state, solution, k):
+        self.state = state[:]
+        self.solution = solution[:]
+        self.k = k
+        self.solutions = OrderedDict()
+        self.transposition_table = None
+        self.min_ida_threshold = None
+        self.threshold = None
+        self.total_ida_count = 0
+        self.out_of_time = False
+
+    def done(self):
+        """
+        Return True if we have k solutions or ran out of time
+        """
+        return self.out_of_time or len(self.solutions) >= self.k
+
+
+class LookupTableIDA(LookupTable):
+
+    # 'recursive' uses ida_search(), 'iterative' uses ida_search_iterative().
+    # Both find the same solution, the iterative one is easier on the CPU.
+    # 'coordinates' uses ida_search_coordinates() which also finds the same
+    # solution but needs state_positions/state_pattern on us and on all of
+    # our prune tables, if they are not there we use 'iterative'.
+    # 'bidirectional' uses bidirectional_search() which does not need the
+    # prune tables, it needs state_positions/state_pattern on us.
+    ida_engine = 'recursive'
+
+    # The coordinates for ida_search_coordinates(), see ida_coordinates()
+    coordinates = None
+
+    # The memory cap for the transposition table that remembers which states
+    # IDA has explored, see TranspositionTable
+    transposition_table_bytes = 16 * 1024 * 1024
+
+    # Set parallel_ida_workers to search with that many processes, this is
+    # for the deep searches where the cost of starting the workers is worth
+    # it. The tree is expanded parallel_ida_depth moves deep and each subtree
+    # at that depth is searched by one of the workers. This is off unless you
+    # ask for it (see --parallel-ida-workers), a box that already runs a
+    # solver per CPU has no CPUs to spare for the workers.
+    parallel_ida_workers = None
+    parallel_ida_depth = 2
+
+    # For ida_engine 'bidirectional', see bidirectional_search(). The frontier
+    # layers use up to bidirectional_bytes of memory before the older ones
+    # are spilled to disk, if the two sides have not met after
+    # bidirectional_max_depth moves we fall back to 'iterative'.
+    bidirectional_bytes = 256 * 1024 * 1024
+    bidirectional_max_depth = 12
+
+    # When the cube has a deadline (see RubiksCube.solve()) the time that is
+    # left is split between us and the IDA phases after us, see
+    # ida_phase_budget(). Past ida_deadline we give up on the search and fall
+    # back to solve_degraded(). ida_budget_seconds is the budget we were given.
+    ida_deadline = None
+    ida_budget_seconds = None
+
+    # The IDATelemetry for the solve() in progress, see Telemetry.py. Set
+    # telemetry_timing to also time the heuristic, rotate and lookup calls.
+    telemetry = None
+    telemetry_timing = False
+
+    # solve_many() collects the solutions here instead of stopping at the first one
+    ida_solutions = None
+    ida_solutions_max = None
+    ida_node_budget = None
+
+    # If adaptive_prune_tables ida_heuristic() evaluates the prune tables
+    # cheapest and most useful first, the order is recomputed every
+    # prune_table_reorder_interval calls. The result for the states of the
+    # prune tables is kept in an LRU cache of ida_heuristic_cache_size entries.
+    adaptive_prune_tables = False
+    prune_table_reorder_interval = 4096
+    ida_heuristic_cache_size = 65536
+
+    # Set ida_move_ordering to visit the children of each node lowest
+    # heuristic first, see ida_ordered_successors(). This is for the
+    # 'recursive' and 'iterative' engines.
+    ida_move_ordering = False
+
+    def __init__(self, parent, filename, state_target, moves_all, moves_illegal, prune_tables, linecount, max_depth=None, use_mmap=True, sparse_index_budget=None, bloom_filter_error_rate=None):
+        LookupTable.__init__(self, parent, filename, state_target, linecount, max_depth, use_mmap=use_mmap,
+                             sparse_index_budget=sparse_index_budget, bloom_filter_error_rate=bloom_filter_error_rate)
+        self.prune_tables = prune_tables
+
+        for x in moves_illegal:
+            if x not in moves_all:
+                raise Exception("illegal move %s is not in the list of legal moves" % x)
+
+        self.moves_all = []
+        for x in moves_all:
+            if x not in moves_illegal:
+                self.moves_all.append(x)
+
+        # The steps for a canonical state are conjugated back to the cube, if
+        # a symmetry maps a legal move to an illegal one the solution could
+        # use moves that we are not allowed to use
+        if self.symmetry is not None:
+            not_closed = self.symmetry.moves_not_closed(self.moves_all, self.parent.size, get_rotate_xxx(self.parent.size))
+
+            if not_closed:
+                (step, sequence, conjugate) = not_closed[0]
+                raise SolveError("%s: the legal moves are not closed under the symmetry, %s maps %s to %s (%d such conjugates)" %
+                                 (self, sequence, step, conjugate, len(not_closed)))
+
+        self.build_move_successors()
+        self.prune_table_stats_init()
+
+    def prune_table_stats_init(self):
+        """
+        The stats that prune_table_reorder() uses to order our prune tables
+        - prune_table_calls[index] is how many times we called its heuristic()
+        - prune_table_seconds[index] is the time spent in prune_table_timed_calls[index]
+          of those calls, we only time one call in 16
+        - prune_table_max_count[index] is how many times it was the table
+          that set the heuristic
+        """
+        count = len(self.prune_tables)
+        self.prune_table_order = list(range(count))
+        self.prune_table_calls = [0] * count
+        self.prune_table_seconds = [0.0] * count
+        self.prune_table_timed_calls = [0] * count
+        self.prune_table_max_count = [0] * count
+        self.ida_heuristic_calls = 0
+        self.ida_heuristic_cache = OrderedDict()
+        self.ida_heuristic_cache_hits = 0
+        self.ida_heuristic_cache_misses = 0
+
+    def prune_table_reorder(self):
+        """
+        Order the prune tables by the seconds we spend per time that they set
+        the heuristic, a cheap table that is often the max goes first. The
+        stats are halved so the order follows where the search is now rather
+        than where it started.
+        """
+        def cost(index):
+            timed_calls = self.prune_table_timed_calls[index]
+            seconds_per_call = self.prune_table_seconds[index] / timed_calls if timed_calls else 0
+            max_rate = float(self.prune_table_max_count[index] + 1) / (self.prune_table_calls[index] + 1)
+            return (seconds_per_call / max_rate, index)
+
+        order = sorted(range(len(self.prune_tables)), key=cost)
+
+        if order != self.prune_table_order:
+            log.debug("%s: prune table order is now %s" % (self, ', '.join([str(self.prune_tables[index]) for index in order])))
+            self.prune_table_order = order
+
+        for stats in (self.prune_table_calls, self.prune_table_timed_calls, self.prune_table_max_count):
+            for index in range(len(stats)):
+                stats[index] = int(stats[index] / 2)
+
+        for index in range(len(self.prune_table_seconds)):
+            self.prune_table_seconds[index] /= 2
+
+    def build_move_successors(self):
+        """
+        Number the moves by their index in moves_all and for each move build
+        a tuple of the move ids that are worth trying after it. This way
+        ida_search() does not have to parse move strings at every node.
+
+        A move is not worth trying if:
+        - it is on the same face and layer as the previous move, U U' is a
+          waste of two moves and U U is just U2
+        - it turns around the same axis as the previous move but comes before
+          it in moves_all. Moves around the same axis commute so U D and D U
+          lead to the same state, we only explore U D.
+
+        move_successors[-1] is for the root of the search where there is no
+        previous move, there every move is worth trying.
+
+        move_layer[move_id] is a number for the face and layer of the move,
+        two moves are on the same face and layer if their move_layer match.
+        """
+        layers = []
+        self.move_layer = []
+        move_axis = []
+
+        for step in self.moves_all:
+            (face, rows) = step_face_and_rows(step)
+
+            if (face, rows) not in layers:
+                layers.append((face, rows))
+
+            self.move_layer.append(layers.index((face, rows)))
+            move_axis.append(face_axis.get(face))
+
+        move_count = len(self.moves_all)
+        self.move_successors = []
+
+        for prev_step_id in range(move_count):
+            prev_layer = self.move_layer[prev_step_id]
+            prev_axis = move_axis[prev_step_id]
+            successors = []
+
+            for step_id in range(move_count):
+                layer = self.move_layer[step_id]
+
+                if layer == prev_layer:
+                    continue
+
+                if prev_axis is not None and move_axis[step_id] == prev_axis and layer < prev_layer:
+                    continue
+
+                successors.append(step_id)
+
+            self.move_successors.append(tuple(successors))
+
+        self.move_successors.append(tuple(range(move_count)))
+
+    def ida_heuristic_total(self):
+        total = 0
+
+        for pt in self.prune_tables:
+            total += pt.heuristic()
+
+        return total
+
+    def ida_heuristic(self, bound=None):
+        """
+        Return the max of the costs from our prune tables (and from our own
+        table if use_lt_as_prune).
+
+        If bound is given we stop looking up prune tables as soon as the cost
+        is more than bound and return that partial cost. The searches only
+        need to know that a node is over the threshold (and that it is too far
+        away to be in our table) so the rest of the lookups are wasted, see
+        ida_heuristic_bound().
+        """
+        if self.adaptive_prune_tables:
+            return self.ida_heuristic_adaptive(bound)
+
+        cost_to_goal = 0
+
+        if self.use_lt_as_prune:
+            state = self.canonical_state()
+
+            # If we are at our target then our cost_to_goal is 0
+            if state in self.state_target:
+                return cost_to_goal
+
+            steps = self.steps(state)
+
+            if steps is None:
+                assert self.max_depth is not None, "%s: use_lt_as_prune is True but max_depth is not set" % self
+                cost_to_goal = self.max_depth + 1
+            else:
+                cost_to_goal = len(steps)
+
+        for pt in self.prune_tables:
+
+            if bound is not None and cost_to_goal > bound:
+                break
+
+            # If there is no way this pt will have a higher cost than the prune
+            # tables we have already examined do not bother looking up the cost
+            # for this pt
+            if cost_to_goal >= pt.max_depth:
+                continue
+
+            pt_cost_to_goal = pt.heuristic()
+
+            if pt_cost_to_goal > cost_to_goal:
+                cost_to_goal = pt_cost_to_goal
+
+        return cost_to_goal
+
+    def ida_heuristic_bound(self, threshold, cost_to_here):
+        """
+        The bound to pass to ida_heuristic() for a node cost_to_here steps
+        into a search at threshold.
+
+        Once cost_to_here + cost_to_goal is more than threshold the node is
+        pruned and the cs0x7f rule in ida_search() skips the other turns of
+        that face, knowing the exact cost would not change either. A cost
+        equal to threshold - cost_to_here still prunes the node but does not
+        trigger the skip so we must keep looking. We also need the exact cost
+        while it is max_depth or less, that decides if we look for the state
+        in our own table.
+        """
+        return max(threshold - cost_to_here, self.max_depth)
+
+    def ida_heuristic_adaptive(self, bound=None):
+        """
+        ida_heuristic() but the result is cached and the prune tables are
+        evaluated in prune_table_order. A table is skipped once the cost is
+        at least its max_depth, the same as ida_heuristic(). A partial table
+        can return max_depth + 1 so the cost can depend on the order. Either
+        cost is a lower bound, only the nodes we explore can differ.
+
+        The cost only depends on the states of the prune tables (and of our
+        own table if use_lt_as_prune) so those are the cache key. Cube states
+        that differ only in squares none of the tables look at share an entry.
+        The cache holds (cost_to_goal, exact), a cost that we stopped at
+        because it was over bound is not exact. It is still a lower bound for
+        the state so it is good enough for any bound it is over, and it is
+        where we start from if we have to look again.
+        """
+        prune_tables = self.prune_tables
+        pt_states = tuple([pt.canonical_state() for pt in prune_tables])
+
+        if self.use_lt_as_prune:
+            state = self.canonical_state()
+            key = pt_states + (state,)
+        else:
+            key = pt_states
+
+        cache = self.ida_heuristic_cache
+        cached = cache.get(key)
+        cost_to_goal = 0
+
+        if cached is not None:
+            (cached_cost_to_goal, exact) = cached
+
+            if exact or (bound is not None and cached_cost_to_goal > bound):
+                cache.move_to_end(key)
+                self.ida_heuristic_cache_hits += 1
+                return cached_cost_to_goal
+
+            cost_to_goal = cached_cost_to_goal
+
+        self.ida_heuristic_cache_misses += 1
+
+        if self.use_lt_as_prune:
+
+            # If we are at our target then our cost_to_goal is 0
+            if state in self.state_target:
+                return cost_to_goal
+
+            steps = self.steps(state)
+
+            if steps is None:
+                assert self.max_depth is not None, "%s: use_lt_as_prune is True but max_depth is not set" % self
+                cost_to_goal = max(cost_to_goal, self.max_depth + 1)
+            else:
+                cost_to_goal = max(cost_to_goal, len(steps))
+
+        self.ida_heuristic_calls += 1
+        timed = not (self.ida_heuristic_calls & 15)
+        max_index = None
+        exact = True
+
+        for index in self.prune_table_order:
+            pt = prune_tables[index]
+
+            if bound is not None and cost_to_goal > bound:
+                exact = False
+                break
+
+            if cost_to_goal >= pt.max_depth:
+                continue
+
+            if timed:
+                start = time.perf_counter()
+                pt_cost_to_goal = pt.state_heuristic(pt_states[index])
+                self.prune_table_seconds[index] += time.perf_counter() - start
+                self.prune_table_timed_calls[index] += 1
+            else:
+                pt_cost_to_goal = pt.state_heuristic(pt_states[index])
+
+            self.prune_table_calls[index] += 1
+
+            if pt_cost_to_goal > cost_to_goal:
+                cost_to_goal = pt_cost_to_goal
+                max_index = index
+
+        if max_index is not None:
+            self.prune_table_max_count[max_index] += 1
+
+        if not self.ida_heuristic_calls % self.prune_table_reorder_interval:
+            self.prune_table_reorder()
+
+        cache[key] = (cost_to_goal, exact)
+        cache.move_to_end(key)
+
+        if len(cache) > self.ida_heuristic_cache_size:
+            cache.popitem(last=False)
+
+        return cost_to_goal
+
+    def search_complete(self, state, steps_to_here):
+
+        #log.info("%s: FOO %s" % (self, state))
+        if self.ida_all_the_way:
+            if state not in self.state_target:
+                return False
+            steps = []
+
+        else:
+            if self.symmetry is not None:
+                state = self.canonical_state()
+
+            steps = self.steps(state)
+
+            if self.telemetry is not None:
+                self.telemetry.table_probe(bool(steps))
+
+            if not steps:
+                return False
+
+        # =============================================
+        # If there are steps for a state that means our
+        # search is done...woohoo!!
+        # =============================================
+        # rotate_xxx() is very fast but it does not append the
+        # steps to the solution so put the cube back in original state
+        # and execute the steps via a normal rotate() call
+        self.parent.state = self.original_state[:]
+        self.parent.solution = self.original_solution[:]
+
+        for step in steps_to_here:
+            self.parent.rotate(step)
+
+        # With symmetry the steps are for the canonical copy of the cube,
+        # LookupTable.solve() will conjugate them for us
+        if self.symmetry is None:
+            for step in steps:
+                self.parent.rotate(step)
+
+        # The cube is now in a state where it is in the lookup table, we may need
+        # to do several lookups to get to our target state though. Use
+        # LookupTabele's solve() to take us the rest of the way to the target state.
+        LookupTable.solve(self)
+
+        if self.leads_to_parity():
+            self.parent.state = self.original_state[:]
+            self.parent.solution = self.original_solution[:]
+            return False
+
+        # solve_many() wants more than one solution, remember this one and
+        # keep searching until we have enough of them
+        if self.ida_solutions is not None:
+            self.ida_solutions.setdefault(tuple(self.parent.state), self.parent.solution[:])
+            self.parent.state = self.original_state[:]
+            self.parent.solution = self.original_solution[:]
+
+            if len(self.ida_solutions) >= self.ida_solutions_max:
+                return True
+
+            return bool(self.ida_node_budget is not None and self.total_ida_count + self.ida_count >= self.ida_node_budget)
+
+        return True
+
+    def leads_to_parity(self):
+        """
+        Return True if the cube is now in a state that leads to a parity we
+        were told to avoid
+        """
+        if self.avoid_oll and self.parent.center_solution_leads_to_oll_parity():
+            log.debug("%s: IDA found match but it leads to OLL" % self)
+            return True
+
+        if self.avoid_pll and self.parent.edge_solution_leads_to_pll_parity():
+            log.debug("%s: IDA found match but it leads to PLL" % self)
+            return True
+
+        return False
+
+    def ida_timing_seconds(self):
+        """
+        The telemetry seconds to add the time spent in the heuristic, rotate
+        and lookup calls to, None if we are not timing them
+        """
+        if self.telemetry_timing and self.telemetry is not None:
+            return self.telemetry.seconds
+
+        return None
+
+    def ida_successors(self, state, prev_step_id, threshold, cost_to_here):
+        """
+        Return a (cost_to_goal, index, step_id, child_state) for each of the
+        children of state that ida_search() would visit, in moves_all order.
+        The cs0x7f rule in ida_search() needs the f_cost of each child, here
+        we look up the heuristic of each child to apply it up front.
+        """
+        rotate_xxx = self.rotate_xxx
+        moves_all = self.moves_all
+        move_layer = self.move_layer
+        parent = self.parent
+        child_cost_to_here = cost_to_here + 1
+        bound = self.ida_heuristic_bound(threshold, child_cost_to_here)
+        skip_other_steps_this_face = None
+        children = []
+        seconds = self.ida_timing_seconds()
+
+        for (index, step_id) in enumerate(self.move_successors[prev_step_id]):
+
+            if skip_other_steps_this_face is not None:
+                if move_layer[step_id] == skip_other_steps_this_face:
+                    continue
+                else:
+                    skip_other_steps_this_face = None
 
-            if signature != signature_to_find:
+            if seconds is None:
+                child_state = rotate_xxx(state, moves_all[step_id])
+                parent.state = child_state
+                cost_to_goal = self.ida_heuristic(bound)
+            else:
+                start = time.perf_counter()
+                child_state = rotate_xxx(state, moves_all[step_id])
+                seconds['rotate'] += time.perf_counter() - start
+                parent.state = child_state
+                start = time.perf_counter()
+                cost_to_goal = self.ida_heuristic(bound)
+                seconds['heuristic'] += time.perf_counter() - start
+
+            if child_cost_to_here + cost_to_goal > threshold:
+                skip_other_steps_this_face = move_layer[step_id]
+
+            children.append((cost_to_goal, index, step_id, child_state))
+
+        parent.state = state
+        return children
+
+    def ida_ordered_successors(self, state, prev_step_id, threshold, cost_to_here):
+        """
+        Return a (step_id, child_state, cost_to_goal) for each of the children
+        of state that ida_search() would visit, the ones with the lowest
+        heuristic first. On a tie the step that comes first in moves_all goes
+        first.
+
+        ida_successors() applies the cs0x7f rule in moves_all order so we
+        visit the same children as we would without the ordering, only the
+        order changes. That does not help the thresholds that do not have a
+        solution, every child is searched either way, but in the last one we
+        get to the solution sooner.
+
+        The cost_to_goal is passed on to the search of the child so it does
+        not look up the prune tables a second time.
+        """
+        children = self.ida_successors(state, prev_step_id, threshold, cost_to_here)
+        children.sort(key=itemgetter(0, 1))
+        return [(step_id, child_state, cost_to_goal) for (cost_to_goal, index, step_id, child_state) in children]
+
+    def ida_search(self, steps_to_here, threshold, prev_step_id, prev_state, cost_to_goal=None):
+        """
+        https://algorithmsinsight.wordpress.com/graph-theory-2/ida-star-algorithm-in-general/
+
+        prev_step_id is the index in moves_all of the step that got us here, -1 if there isn't one
+
+        cost_to_goal is our heuristic if the caller has already looked it up, see ida_ordered_successors()
+        """
+        self.ida_count += 1
+
+        if self.ida_deadline is not None and not self.ida_count & 1023:
+            self.ida_check_deadline()
+
+        seconds = self.ida_timing_seconds()
+
+        # calculate f_cost which is the cost to where we are plus the estimated cost to reach our goal
+        cost_to_here = len(steps_to_here)
+
+        if cost_to_goal is not None:
+            pass
+        elif seconds is None:
+            cost_to_goal = self.ida_heuristic(self.ida_heuristic_bound(threshold, cost_to_here))
+        else:
+            start = time.perf_counter()
+            cost_to_goal = self.ida_heuristic(self.ida_heuristic_bound(threshold, cost_to_here))
+            seconds['heuristic'] += time.perf_counter() - start
+
+        f_cost = cost_to_here + cost_to_goal
+
+        lt_state = self.state()
+
+        # If our cost_to_goal is greater than the max_depth of our main lookup table then there is no
+        # need to do a binary search through the main lookup table to look for our current state...this
+        # saves us some disk IO
+        if cost_to_goal > self.max_depth:
+            found_solution = False
+        elif seconds is None:
+            found_solution = self.search_complete(lt_state, steps_to_here)
+        else:
+            start = time.perf_counter()
+            found_solution = self.search_complete(lt_state, steps_to_here)
+            seconds['lookup'] += time.perf_counter() - start
+
+        if found_solution:
+            #log.info("%s: IDA found match %d steps in, %s, lt_state %s, f_cost %d (cost_to_here %d, cost_to_goal %d)" %
+            #         (self, len(steps_to_here), ' '.join(steps_to_here), lt_state, f_cost, cost_to_here, cost_to_goal))
+            self.log_seek_calls()
+
+            for pt in self.prune_tables:
+                pt.log_seek_calls()
+
+            log.info("%s: IDA found match %d steps in %s, lt_state %s, f_cost %d (%d + %d)" %
+                     (self, len(steps_to_here), ' '.join(steps_to_here), lt_state, f_cost, cost_to_here, cost_to_goal))
+            return (f_cost, True)
+
+        # ================
+        # Abort Searching?
+        # ================
+        if f_cost >= threshold:
+            return (f_cost, False)
+
+        # If we have already explored the exact same scenario down another branch
+        # (or at a lower threshold) with at least as many moves left to spend
+        # then we can stop looking down this branch
+        budget = threshold - cost_to_here
+        explored_budget = self.transposition_table.get(lt_state)
+
+        if explored_budget is not None and explored_budget >= budget:
+            return (f_cost, False)
+        self.transposition_table.store(lt_state, cost_to_here, budget)
+        skip_other_steps_this_face = None
+        moves_all = self.moves_all
+        move_layer = self.move_layer
+
+        if self.ida_move_ordering:
+            for (step_id, child_state, child_cost_to_goal) in self.ida_ordered_successors(prev_state, prev_step_id, threshold, cost_to_here):
+                self.parent.state = child_state
+                (f_cost_tmp, found_solution) = self.ida_search(steps_to_here + [moves_all[step_id],], threshold, step_id, child_state[:], child_cost_to_goal)
+
+                if found_solution:
+                    return (f_cost_tmp, True)
+
+            self.parent.state = prev_state[:]
+            return (f_cost, False)
+
+        # move_successors has already filtered out the steps on the same face
+        # and layer as prev_step, see build_move_successors()
+        for step_id in self.move_successors[prev_step_id]:
+
+            # https://github.com/cs0x7f/TPR-4x4x4-Solver/issues/7
+            '''
+            Well, it's a simple technique to reduce the number of nodes accessed.
+            For example, we start at a position S whose pruning value is no more
+            than maxl, otherwise, S will be pruned in previous searching.  After
+            a move X, we obtain position S', whose pruning value is larger than
+            maxl, which means that X makes S farther from the solved state.  In
+            this case, we won't try X2 and X'.
+            --cs0x7f
+            '''
+            if skip_other_steps_this_face is not None:
+                if move_layer[step_id] == skip_other_steps_this_face:
+                    continue
+                else:
+                    skip_other_steps_this_face = None
+
+            step = moves_all[step_id]
+
+            if seconds is None:
+                self.parent.state = self.rotate_xxx(prev_state[:], step)
+            else:
+                start = time.perf_counter()
+                self.parent.state = self.rotate_xxx(prev_state[:], step)
+                seconds['rotate'] += time.perf_counter() - start
+
+            (f_cost_tmp, found_solution) = self.ida_search(steps_to_here + [step,], threshold, step_id, self.parent.state[:])
+            if found_solution:
+                return (f_cost_tmp, True)
+            else:
+                if f_cost_tmp > threshold:
+                    skip_other_steps_this_face = move_layer[step_id]
+                else:
+                    skip_other_steps_this_face = None
+
+        self.parent.state = prev_state[:]
+        return (f_cost, False)
+
+    def ida_search_iterative(self, threshold, start_path=(), stop=None):
+        """
+        The same search as ida_search() but with an explicit stack instead of
+        recursion. It visits the same nodes in the same order so it finds the
+        same solution.
+
+        start_path is a list of move ids, the search only explores the subtree
+        at the end of that path. This is how the parallel IDA workers search
+        their part of the tree.
+
+        stop is called every 1024 nodes, if it returns True we give up on the
+        search and return (None, False)
+
+        The stack is a handful of lists indexed by depth:
+        - path[depth] is the id of the step we took from depth to depth + 1
+        - states[depth] is the cube state at depth
+        - move_index[depth] is where we are in the move_successors at depth
+        - skip[depth] is skip_other_steps_this_face at depth
+        - f_costs[depth] is the f_cost of the node at depth
+        - ordered[depth] is the ida_ordered_successors() at depth, only if ida_move_ordering,
+          the cost_to_goal of the child we take from it is kept in ordered_cost_to_goal
+
+        rotate_xxx() never modifies the list it is given, it returns a new one,
+        so the list it returns is used as is for states[depth + 1]. There is
+        no need to make a copy of it for the child or to copy it back when we
+        return to the parent.
+        """
+        rotate_xxx = self.rotate_xxx
+        moves_all = self.moves_all
+        move_layer = self.move_layer
+        move_successors = self.move_successors
+        transposition_table = self.transposition_table
+        max_depth = self.max_depth
+        parent = self.parent
+        seconds = self.ida_timing_seconds()
+        perf_counter = time.perf_counter
+
+        # We never go deeper than threshold, f_cost is at least the depth and
+        # we stop expanding once f_cost reaches the threshold
+        path = self.ida_path
+        states = [None] * (threshold + 1)
+        move_index = [0] * (threshold + 1)
+        skip = [None] * (threshold + 1)
+        f_costs = [0] * (threshold + 1)
+
+        if self.ida_move_ordering:
+            ordered = [None] * (threshold + 1)
+        else:
+            ordered = None
+
+        ordered_cost_to_goal = None
+
+        start_depth = len(start_path)
+        state = self.original_state[:]
+
+        for (depth, step_id) in enumerate(start_path):
+            path[depth] = step_id
+            state = rotate_xxx(state, moves_all[step_id])
+
+        states[start_depth] = state
+        depth = start_depth
+
+        # The f_cost of the node we just returned from, None when we just moved
+        # down a level and have not visited the node at depth yet
+        child_f_cost = None
+
+        while True:
+
+            if child_f_cost is None:
+                parent.state = states[depth]
+                self.ida_count += 1
+
+                if self.ida_deadline is not None and not self.ida_count & 1023:
+                    self.ida_check_deadline()
+
+                if stop is not None and not self.ida_count & 1023 and stop():
+                    return (None, False)
+
+                # calculate f_cost which is the cost to where we are plus the estimated cost to reach our goal
+                if ordered_cost_to_goal is not None:
+                    cost_to_goal = ordered_cost_to_goal
+                    ordered_cost_to_goal = None
+                elif seconds is None:
+                    cost_to_goal = self.ida_heuristic(max(threshold - depth, max_depth))
+                else:
+                    start = perf_counter()
+                    cost_to_goal = self.ida_heuristic(max(threshold - depth, max_depth))
+                    seconds['heuristic'] += perf_counter() - start
+
+                f_cost = depth + cost_to_goal
+                lt_state = self.state()
+
+                if cost_to_goal > max_depth:
+                    found_solution = False
+                else:
+                    steps_to_here = [moves_all[step_id] for step_id in path[:depth]]
+
+                    if seconds is None:
+                        found_solution = self.search_complete(lt_state, steps_to_here)
+                    else:
+                        start = perf_counter()
+                        found_solution = self.search_complete(lt_state, steps_to_here)
+                        seconds['lookup'] += perf_counter() - start
+
+                if found_solution:
+                    self.log_seek_calls()
+
+                    for pt in self.prune_tables:
+                        pt.log_seek_calls()
+
+                    log.info("%s: IDA found match %d steps in %s, lt_state %s, f_cost %d (%d + %d)" %
+                             (self, depth, ' '.join(steps_to_here), lt_state, f_cost, depth, cost_to_goal))
+                    return (f_cost, True)
+
+                # Abort searching this node?
+                budget = threshold - depth
+
+                if f_cost >= threshold:
+                    prune = True
+                else:
+                    explored_budget = transposition_table.get(lt_state)
+                    prune = bool(explored_budget is not None and explored_budget >= budget)
+
+                if prune:
+
+                    if depth == start_depth:
+                        return (f_cost, False)
+
+                    child_f_cost = f_cost
+                    depth -= 1
+                    continue
+
+                transposition_table.store(lt_state, depth, budget)
+                f_costs[depth] = f_cost
+                move_index[depth] = 0
+                skip[depth] = None
+
+                if ordered is not None:
+                    ordered[depth] = self.ida_ordered_successors(states[depth], path[depth - 1] if depth else -1, threshold, depth)
+
+            else:
+                # We are back from the child we took via path[depth], see the
+                # comment from cs0x7f in ida_search()
+                if child_f_cost > threshold:
+                    skip[depth] = move_layer[path[depth]]
+                else:
+                    skip[depth] = None
+
+            # Find the next step to take from this node
+            index = move_index[depth]
+            next_step_id = None
+
+            if ordered is not None:
+                # ida_ordered_successors() has already applied the cs0x7f rule
+                skip_other_steps_this_face = None
+
+                if index < len(ordered[depth]):
+                    (next_step_id, next_state, next_cost_to_goal) = ordered[depth][index]
+                    index += 1
+            else:
+                if depth:
+                    successors = move_successors[path[depth - 1]]
+                else:
+                    successors = move_successors[-1]
+
+                skip_other_steps_this_face = skip[depth]
+                successors_count = len(successors)
+
+                while index < successors_count:
+                    step_id = successors[index]
+                    index += 1
+
+                    if skip_other_steps_this_face is not None:
+                        if move_layer[step_id] == skip_other_steps_this_face:
+                            continue
+                        else:
+                            skip_other_steps_this_face = None
+
+                    next_step_id = step_id
+                    break
+
+            if next_step_id is None:
+                # We have tried every step from this node, go back up a level
+                parent.state = states[depth]
+
+                if depth == start_depth:
+                    return (f_costs[depth], False)
+
+                child_f_cost = f_costs[depth]
+                depth -= 1
+                continue
+
+            move_index[depth] = index
+            skip[depth] = skip_other_steps_this_face
+            path[depth] = next_step_id
+
+            if ordered is not None:
+                states[depth + 1] = next_state
+                ordered_cost_to_goal = next_cost_to_goal
+            elif seconds is None:
+                states[depth + 1] = rotate_xxx(states[depth], moves_all[next_step_id])
+            else:
+                start = perf_counter()
+                states[depth + 1] = rotate_xxx(states[depth], moves_all[next_step_id])
+                seconds['rotate'] += perf_counter() - start
+
+            depth += 1
+            child_f_cost = None
+
+    def ida_coordinates(self):
+        """
+        Return the coordinates for ida_search_coordinates(), ours first and
+        then one per prune table. A prune table with a move table (see
+        LookupTable.load_move_table()) gets a RankCoordinate, everything else
+        gets a ProjectionCoordinate. Return None if we or one of our prune
+        tables cannot be searched via coordinates.
+        """
+        tables = [self] + list(self.prune_tables)
+
+        for table in tables:
+            if table.state_positions is None or table.state_pattern is None:
+                log.info("%s: %s does not have state_positions, searching without coordinates" % (self, table))
+                return None
+
+        permutations = move_permutations(self.rotate_xxx, len(self.parent.state), self.moves_all)
+        coordinates = []
+
+        for table in tables:
+            coordinate = None
+
+            # We need our pattern to build the lt_state so we are always a ProjectionCoordinate
+            if table is not self:
+                coordinate = table.load_move_table(self.moves_all)
+
+            if coordinate is None:
+                try:
+                    coordinate = ProjectionCoordinate(table, permutations)
+                except ValueError as e:
+                    log.warning("%s: %s %s, searching without coordinates" % (self, table, e))
+                    return None
+
+            # The coordinate must agree with state() or we would be searching for the wrong thing
+            if coordinate.state(coordinate.from_cube(self.parent.state)) != table.state():
+                log.warning("%s: %s state_positions/state_pattern do not match state(), searching without coordinates" % (self, table))
+                return None
+
+            # The heuristics are looked up via pattern_state()
+            try:
+                table.pattern_state(table.cube_pattern())
+            except ValueError as e:
+                log.warning("%s: %s, searching without coordinates" % (self, e))
+                return None
+
+            coordinates.append(coordinate)
+
+        return coordinates
+
+    def ida_heuristic_coordinates(self, coords, lt_state, bound=None):
+        """
+        ida_heuristic() but from coordinates instead of from the cube
+        """
+        cost_to_goal = 0
+
+        if self.use_lt_as_prune:
+
+            # If we are at our target then our cost_to_goal is 0
+            if lt_state in self.state_target:
+                return cost_to_goal
+
+            if self.symmetry is not None:
+                lt_state = self.pattern_state(''.join(coords[0]))
+
+            steps = self.steps(lt_state)
+
+            if steps is None:
+                assert self.max_depth is not None, "%s: use_lt_as_prune is True but max_depth is not set" % self
+                cost_to_goal = self.max_depth + 1
+            else:
+                cost_to_goal = len(steps)
+
+        for (pt, coordinate, coord) in zip(self.prune_tables, self.coordinates[1:], coords[1:]):
+
+            if bound is not None and cost_to_goal > bound:
                 break
 
-            result.append(line)
-            midpoint -= 1
+            if cost_to_goal >= pt.max_depth:
+                continue
 
-            if midpoint < 0:
+            pt_cost_to_goal = coordinate.heuristic(coord)
+
+            if pt_cost_to_goal > cost_to_goal:
+                cost_to_goal = pt_cost_to_goal
+
+        return cost_to_goal
+
+    def coordinates_table_hit(self, lt_state, lt_coord):
+        """
+        Return True if search_complete() would find lt_state in our table,
+        ida_search_coordinates() uses this to check before it rebuilds the
+        cube that search_complete() needs
+        """
+        if self.ida_all_the_way:
+            return lt_state in self.state_target
+
+        if self.symmetry is not None:
+            lt_state = self.pattern_state(''.join(lt_coord))
+
+        if self.steps(lt_state):
+            return True
+
+        if self.telemetry is not None:
+            self.telemetry.table_probe(False)
+
+        return False
+
+    def ida_search_coordinates(self, threshold):
+        """
+        The same search as ida_search_iterative() but instead of a cube each
+        node has a tuple of coordinates, one for us and one per prune table.
+        A move shuffles a few characters (ProjectionCoordinate) or is a single
+        index into a move table (RankCoordinate) instead of a rotate_xxx() of
+        the entire cube, and there is no state() to build for each prune table.
+
+        The cube is only rebuilt when we need to check if we have found a
+        solution.
+        """
+        rotate_xxx = self.rotate_xxx
+        moves_all = self.moves_all
+        move_layer = self.move_layer
+        move_successors = self.move_successors
+        transposition_table = self.transposition_table
+        max_depth = self.max_depth
+        parent = self.parent
+        coordinates = self.coordinates
+        lt_coordinate = coordinates[0]
+        seconds = self.ida_timing_seconds()
+        perf_counter = time.perf_counter
+
+        path = self.ida_path
+        states = [None] * (threshold + 1)
+        move_index = [0] * (threshold + 1)
+        skip = [None] * (threshold + 1)
+        f_costs = [0] * (threshold + 1)
+
+        states[0] = tuple([coordinate.from_cube(self.original_state) for coordinate in coordinates])
+        depth = 0
+        child_f_cost = None
+
+        while True:
+
+            if child_f_cost is None:
+                coords = states[depth]
+                self.ida_count += 1
+
+                if self.ida_deadline is not None and not self.ida_count & 1023:
+                    self.ida_check_deadline()
+
+                lt_state = lt_coordinate.state(coords[0])
+
+                if seconds is None:
+                    cost_to_goal = self.ida_heuristic_coordinates(coords, lt_state, max(threshold - depth, max_depth))
+                else:
+                    start = perf_counter()
+                    cost_to_goal = self.ida_heuristic_coordinates(coords, lt_state, max(threshold - depth, max_depth))
+                    seconds['heuristic'] += perf_counter() - start
+
+                f_cost = depth + cost_to_goal
+
+                # Rebuilding the cube costs a rotate_xxx() per step so only do
+                # it if lt_state is in our table
+                if cost_to_goal <= max_depth and self.coordinates_table_hit(lt_state, coords[0]):
+                    steps_to_here = [moves_all[step_id] for step_id in path[:depth]]
+                    state = self.original_state[:]
+
+                    for step in steps_to_here:
+                        state = rotate_xxx(state, step)
+
+                    parent.state = state
+
+                    if seconds is None:
+                        found_solution = self.search_complete(lt_state, steps_to_here)
+                    else:
+                        start = perf_counter()
+                        found_solution = self.search_complete(lt_state, steps_to_here)
+                        seconds['lookup'] += perf_counter() - start
+
+                    if found_solution:
+                        self.log_seek_calls()
+
+                        for pt in self.prune_tables:
+                            pt.log_seek_calls()
+
+                        log.info("%s: IDA found match %d steps in %s, lt_state %s, f_cost %d (%d + %d)" %
+                                 (self, depth, ' '.join(steps_to_here), lt_state, f_cost, depth, cost_to_goal))
+                        return (f_cost, True)
+
+                # Abort searching this node?
+                budget = threshold - depth
+
+                if f_cost >= threshold:
+                    prune = True
+                else:
+                    explored_budget = transposition_table.get(lt_state)
+                    prune = bool(explored_budget is not None and explored_budget >= budget)
+
+                if prune:
+
+                    if depth == 0:
+                        parent.state = self.original_state[:]
+                        return (f_cost, False)
+
+                    child_f_cost = f_cost
+                    depth -= 1
+                    continue
+
+                transposition_table.store(lt_state, depth, budget)
+                f_costs[depth] = f_cost
+                move_index[depth] = 0
+                skip[depth] = None
+
+            else:
+                # We are back from the child we took via path[depth], see the
+                # comment from cs0x7f in ida_search()
+                if child_f_cost > threshold:
+                    skip[depth] = move_layer[path[depth]]
+                else:
+                    skip[depth] = None
+
+            # Find the next step to take from this node
+            if depth:
+                successors = move_successors[path[depth - 1]]
+            else:
+                successors = move_successors[-1]
+
+            skip_other_steps_this_face = skip[depth]
+            index = move_index[depth]
+            successors_count = len(successors)
+            next_step_id = None
+
+            while index < successors_count:
+                step_id = successors[index]
+                index += 1
+
+                if skip_other_steps_this_face is not None:
+                    if move_layer[step_id] == skip_other_steps_this_face:
+                        continue
+                    else:
+                        skip_other_steps_this_face = None
+
+                next_step_id = step_id
                 break
 
+            if next_step_id is None:
+                # We have tried every step from this node, go back up a level
+                if depth == 0:
+                    parent.state = self.original_state[:]
+                    return (f_costs[0], False)
+
+                child_f_cost = f_costs[depth]
+                depth -= 1
+                continue
+
+            move_index[depth] = index
+            skip[depth] = skip_other_steps_this_face
+            path[depth] = next_step_id
+            states[depth + 1] = tuple([coordinate.move(coord, next_step_id) for (coordinate, coord) in zip(coordinates, states[depth])])
+            depth += 1
+            child_f_cost = None
+
+    def ida_frontier(self, threshold, frontier_depth, path, state, frontier):
+        """
+        Expand the IDA tree frontier_depth moves deep, the path to each node at
+        that depth is appended to frontier. The nodes before that depth are
+        searched here just like ida_search() would search them, including the
+        cs0x7f rule via ida_successors(), so the workers search the same tree
+        that one process would. Return True if one of them is a solution.
+        """
+        depth = len(path)
+
+        if depth == frontier_depth:
+            frontier.append(path)
+            return False
+
+        # There are only a few nodes up here so check the deadline at each one
+        if self.ida_deadline is not None:
+            self.ida_check_deadline()
+
+        self.parent.state = state
+        self.ida_count += 1
+        cost_to_goal = self.ida_heuristic(self.ida_heuristic_bound(threshold, depth))
+        f_cost = depth + cost_to_goal
+        lt_state = self.state()
+
+        if cost_to_goal <= self.max_depth:
+            steps_to_here = [self.moves_all[step_id] for step_id in path]
+
+            if self.search_complete(lt_state, steps_to_here):
+                log.info("%s: IDA found match %d steps in %s, lt_state %s, f_cost %d (%d + %d)" %
+                         (self, depth, ' '.join(steps_to_here), lt_state, f_cost, depth, cost_to_goal))
+                return True
+
+        if f_cost >= threshold:
+            return False
+
+        budget = threshold - depth
+        explored_budget = self.transposition_table.get(lt_state)
+
+        if explored_budget is not None and explored_budget >= budget:
+            return False
+        self.transposition_table.store(lt_state, depth, budget)
+
+        if path:
+            prev_step_id = path[-1]
+        else:
+            prev_step_id = -1
+
+        for (child_cost_to_goal, index, step_id, child_state) in self.ida_successors(state, prev_step_id, threshold, depth):
+            if self.ida_frontier(threshold, frontier_depth, path + [step_id], child_state, frontier):
+                return True
+
+        return False
+
+    def ida_search_parallel(self, threshold, executor, found_index):
+        """
+        Search the subtrees at parallel_ida_depth in parallel. If more than one
+        subtree has a solution we use the one with the lowest index so the
+        solution we find does not depend on which worker happened to finish
+        first.
+        """
+        frontier = []
+
+        if self.ida_frontier(threshold, self.parallel_ida_depth, [], self.original_state[:], frontier):
+            return (threshold, True)
+
+        found_index.value = len(frontier)
+        futures = [executor.submit(parallel_ida_search, threshold, subtree_index, start_path)
+                   for (subtree_index, start_path) in enumerate(frontier)]
+
+        try:
+            # Wait for the subtrees in order, the first one with a solution is
+            # the lowest index one with a solution. The workers searching the
+            # subtrees after it notice found_index and give up.
+            for future in futures:
+                if self.ida_deadline is None:
+                    timeout = None
+                else:
+                    timeout = max(self.ida_deadline - time.time(), 0)
+
+                try:
+                    (found_solution, ida_count, state, solution, counters) = future.result(timeout)
+                except FuturesTimeoutError:
+                    raise IDADeadline("%s: ran out of time waiting for the parallel IDA workers" % self)
 
-        # Go forward one line at a time until we have read all the lines
-        # with signature_to_find
-        midpoint = line_number_midpoint_signature_to_find + 1
+                self.ida_count += ida_count
 
-        while midpoint <= self.linecount - 1:
-            fh.seek(midpoint * self.width)
-            line = fh.read(self.width)
-            line = line.decode('utf-8').rstrip()
-            (edges_state, steps) = line.split(':')
-            (signature, _) = edges_state.split('_')
+                # A worker that gave up before searching its subtree has no counters
+                if counters is not None:
+                    self.telemetry.add_counters(counters)
 
-            if signature == signature_to_find:
-                result.append(line)
-            else:
-                break
+                if found_solution:
+                    self.parent.state = state
+                    self.parent.solution = solution
+                    return (threshold, True)
+        finally:
+            for future in futures:
+                future.cancel()
 
-            midpoint += 1
+        self.parent.state = self.original_state[:]
+        return (threshold, False)
 
-        return result
+    def parallel_ida_executor(self):
+        """
+        Return a ProcessPoolExecutor for ida_search_parallel() and the shared
+        value the workers use to tell each other that a solution was found.
+        None if we cannot search in parallel on this platform.
+        """
+        # The workers must be forked so they inherit the tables, the cube and
+        # the mmaps from us instead of having to load them all over again.
+        if 'fork' not in multiprocessing.get_all_start_methods():
+            log.warning("%s: parallel IDA needs the fork start method, searching with one process" % self)
+            return (None, None)
+
+        context = multiprocessing.get_context('fork')
+        found_index = context.Value('i', 0)
+        executor = ProcessPoolExecutor(max_workers=self.parallel_ida_workers, mp_context=context,
+                                       initializer=parallel_ida_init, initargs=(self, found_index))
+        return (executor, found_index)
+
+    def bidirectional_encoder(self):
+        """
+        Return a PatternEncoder for our patterns and the patterns of our
+        state_target, (None, None) if we cannot do a bidirectional_search()
+        """
+        if self.state_positions is None or self.state_pattern is None:
+            log.info("%s: does not have state_positions, cannot search bidirectionally" % self)
+            return (None, None)
 
-    def state(self):
-        raise Exception("child class must implement state()")
+        # The backward frontier starts from the state_target patterns so we
+        # need state_from_pattern() to leave a pattern as it is
+        target_patterns = []
 
+        for state in self.state_target:
+            if not isinstance(state, str) or len(state) != len(self.state_positions) or self.state_from_pattern(state) != state:
+                log.info("%s: state_target %s is not a pattern, cannot search bidirectionally" % (self, state))
+                return (None, None)
 
-class LookupTableCostOnly(LookupTable):
+            target_patterns.append(state)
 
-    def __init__(self, parent, filename, state_target, linecount, max_depth=None, load_string=True):
-        self.parent = parent
-        self.sides_all = (self.parent.sideU, self.parent.sideL, self.parent.sideF, self.parent.sideR, self.parent.sideB, self.parent.sideD)
-        self.filename = filename
-        self.filename_gz = filename + '.gz'
-        self.desc = filename.replace('lookup-table-', '').replace('.txt', '')
-        self.filename_exists = False
-        self.linecount = linecount
-        self.max_depth = max_depth
-        self.avoid_oll = False
-        self.avoid_pll = False
-        self.preloaded_state_set = False
-        self.ida_all_the_way = False
-        self.use_lt_as_prune = False
+        pattern = self.cube_pattern()
+        alphabet = ''.join(sorted(set(self.state_pattern.values())))
 
-        assert self.filename.startswith('lookup-table'), "We only support lookup-table*.txt files"
-        assert self.filename.endswith('.txt'), "We only support lookup-table*.txt files"
+        try:
+            encoder = PatternEncoder(alphabet, len(pattern), [pattern.count(char) for char in alphabet])
+        except ValueError as e:
+            log.info("%s: %s, cannot search bidirectionally" % (self, e))
+            return (None, None)
 
-        if 'dummy' not in self.filename:
-            assert self.linecount, "%s linecount is %s" % (self, self.linecount)
+        return (encoder, sorted(target_patterns))
 
-        if not os.path.exists(self.filename):
-            if not os.path.exists(self.filename_gz):
-                url = "https://github.com/dwalton76/rubiks-cube-lookup-tables-%sx%sx%s/raw/master/%s" % (self.parent.size, self.parent.size, self.parent.size, self.filename_gz)
-                log.info("Downloading table via 'wget %s'" % url)
-                call(['wget', url])
+    def bidirectional_expand(self, layers, getters, encoder, inverse_closed):
+        """
+        Return a FrontierLayer of every state that is one move from
+        the last of the layers and is not in any of the layers.
 
-            log.warning("gunzip %s" % self.filename_gz)
-            call(['gunzip', self.filename_gz])
+        If every move can be undone by another move a state that is one move
+        from layer N can only be in layer N-1, N or N+1 so we only need to
+        check the last two layers.
+        """
+        encode = encoder.encode
+        decode = encoder.decode
+        ranks = array('Q')
 
-        self.filename_exists = True
+        for rank in layers[-1].ranks:
+            pattern = tuple(decode(rank))
 
-        if isinstance(state_target, tuple):
-            self.state_target = set(state_target)
-        elif isinstance(state_target, list):
-            self.state_target = set(state_target)
-        else:
-            self.state_target = set((state_target, ))
+            for getter in getters:
+                ranks.append(encode(''.join(getter(pattern))))
 
-        self.fh_txt_seek_calls = 0
-        self.fh_txt = None
+            self.ida_count += 1
 
-        # Some cost-only tables are 2^32 characters, we do not want to read a 4G
-        # string into memory so for those we will seek()/read() through the file.
-        # We do not have to binary_search() though so that cuts way down on the
-        # number of reads.
-        if load_string:
-            with open(self.filename, 'r') as fh:
-                for line in fh:
-                    self.content = line
-            self.fh_txt_seek_calls += 1
-        else:
-            # 'rb' mode is about 3x faster than 'r' mode
-            self.fh_txt = open(self.filename, mode='rb')
-            self.content = None
+            if self.ida_deadline is not None and not self.ida_count & 1023:
+                self.ida_check_deadline()
 
-    def steps_cost(self, state_to_find=None):
+        layer = FrontierLayer(layers[-1].depth + 1, ranks)
 
-        if state_to_find is None:
-            state_to_find = self.state()
+        for prev_layer in (layers[-2:] if inverse_closed else layers):
+            layer.discard(prev_layer)
 
-        # state_to_find is an integer, there is a one byte hex character in the file for each possible state.
-        # This hex character is the number of steps required to solve the corresponding state.
-        if self.content is None:
-            self.fh_txt.seek(state_to_find)
-            result = int(self.fh_txt.read(1).decode('utf-8'), 16)
+        return layer
 
-            #if result == 0:
-            #    raise Exception("%s: table is hosed...result for %d is 0" % (self, state_to_find))
+    def bidirectional_path(self, layers, rank, getters, encoder):
+        """
+        rank is in the last of the layers, return the move ids that take it
+        back to the first layer. getters must be the ones that take a state
+        in layer N to a state in layer N-1.
+        """
+        path = []
 
-            self.fh_txt_seek_calls += 1
-            return result
+        for depth in reversed(range(len(layers) - 1)):
+            pattern = tuple(encoder.decode(rank))
 
-        else:
-            return int(self.content[state_to_find], 16)
+            for (move_id, getter) in enumerate(getters):
+                prev_rank = encoder.encode(''.join(getter(pattern)))
 
+                if prev_rank in layers[depth]:
+                    path.append(move_id)
+                    rank = prev_rank
+                    break
+            else:
+                raise SolveError("%s: rank %d at depth %d has no parent" % (self, rank, depth + 1))
 
-class LookupTableIDA(LookupTable):
+        return path
 
-    def __init__(self, parent, filename, state_target, moves_all, moves_illegal, prune_tables, linecount, max_depth=None):
-        LookupTable.__init__(self, parent, filename, state_target, linecount, max_depth)
-        self.prune_tables = prune_tables
+    def bidirectional_search(self):
+        """
+        Breadth first search forward from the cube and backward from
+        state_target one layer at a time, always expanding the smaller side,
+        until the two sides meet in the middle. This finds the shortest
+        sequence of moves to state_target without the prune tables.
+
+        Each layer is a FrontierLayer, see Frontier.py. Returns True if we
+        found a solution, False if we did not and None if we cannot search
+        bidirectionally.
+        """
+        (encoder, target_patterns) = self.bidirectional_encoder()
 
-        for x in moves_illegal:
-            if x not in moves_all:
-                raise Exception("illegal move %s is not in the list of legal moves" % x)
+        if encoder is None:
+            return None
 
-        self.moves_all = []
-        for x in moves_all:
-            if x not in moves_illegal:
-                self.moves_all.append(x)
+        permutations = projected_permutations(self.state_positions, move_permutations(self.rotate_xxx, len(self.parent.state), self.moves_all))
+        forward_getters = [itemgetter(*permutation) for permutation in permutations]
+        backward_getters = []
+        inverse_permutations = []
 
-    def ida_heuristic_total(self):
-        total = 0
+        # The backward frontier undoes the moves
+        for permutation in permutations:
+            inverse = [None] * len(permutation)
 
-        for pt in self.prune_tables:
-            total += pt.heuristic()
+            for (index, value) in enumerate(permutation):
+                inverse[value] = index
 
-        return total
+            backward_getters.append(itemgetter(*inverse))
+            inverse_permutations.append(tuple(inverse))
 
-    def ida_heuristic(self):
-        cost_to_goal = 0
+        inverse_closed = set(inverse_permutations) <= set(permutations)
 
-        if self.use_lt_as_prune:
-            state = self.state()
+        forward = [FrontierLayer(0, array('Q', [encoder.encode(self.cube_pattern())]))]
+        backward = [FrontierLayer(0, array('Q', [encoder.encode(pattern) for pattern in target_patterns]))]
+        self.ida_count = 0
 
-            # If we are at our target then our cost_to_goal is 0
-            if state in self.state_target:
-                return cost_to_goal
+        try:
+            while forward[-1].depth + backward[-1].depth < self.bidirectional_max_depth:
 
-            steps = self.steps(state)
+                if len(forward[-1]) <= len(backward[-1]):
+                    forward.append(self.bidirectional_expand(forward, forward_getters, encoder, inverse_closed))
+                else:
+                    backward.append(self.bidirectional_expand(backward, backward_getters, encoder, inverse_closed))
 
-            if steps is None:
-                assert self.max_depth is not None, "%s: use_lt_as_prune is True but max_depth is not set" % self
-                cost_to_goal = self.max_depth + 1
-            else:
-                cost_to_goal = len(steps)
+                if not len(forward[-1]) or not len(backward[-1]):
+                    break
 
-        for pt in self.prune_tables:
+                log.info("%s: bidirectional forward depth %d has %d states, backward depth %d has %d states" %
+                    (self, forward[-1].depth, len(forward[-1]), backward[-1].depth, len(backward[-1])))
 
-            # If there is no way this pt will have a higher cost than the prune
-            # tables we have already examined do not bother looking up the cost
-            # for this pt
-            if cost_to_goal >= pt.max_depth:
-                continue
+                for meet_rank in forward[-1].intersection(backward[-1]):
+                    forward_path = list(reversed(self.bidirectional_path(forward, meet_rank, backward_getters, encoder)))
+                    backward_path = self.bidirectional_path(backward, meet_rank, forward_getters, encoder)
 
-            pt_cost_to_goal = pt.heuristic()
+                    self.parent.state = self.original_state[:]
+                    self.parent.solution = self.original_solution[:]
 
-            if pt_cost_to_goal > cost_to_goal:
-                cost_to_goal = pt_cost_to_goal
+                    for move_id in forward_path + backward_path:
+                        self.parent.rotate(self.moves_all[move_id])
 
-        return cost_to_goal
+                    if self.state() in self.state_target and not self.leads_to_parity():
+                        log.info("%s: bidirectional search found a %d move solution" % (self, len(forward_path) + len(backward_path)))
+                        return True
 
-    def search_complete(self, state, steps_to_here):
+                self.parent.state = self.original_state[:]
+                self.parent.solution = self.original_solution[:]
 
-        #log.info("%s: FOO %s" % (self, state))
-        if self.ida_all_the_way:
-            if state not in self.state_target:
-                return False
-            steps = []
+                # Spill the oldest layers once we are over budget, the last
+                # layer of each side is the one we search the most so keep those
+                nbytes = sum([layer.nbytes() for layer in forward + backward])
 
-        else:
-            steps = self.steps(state)
+                for layer in sorted(forward[:-1] + backward[:-1], key=lambda layer: layer.depth):
+                    if nbytes <= self.bidirectional_bytes:
+                        break
 
-            if not steps:
-                return False
+                    nbytes -= layer.nbytes()
+                    layer.spill()
+        finally:
+            for layer in forward + backward:
+                layer.close()
 
-        # =============================================
-        # If there are steps for a state that means our
-        # search is done...woohoo!!
-        # =============================================
-        # rotate_xxx() is very fast but it does not append the
-        # steps to the solution so put the cube back in original state
-        # and execute the steps via a normal rotate() call
-        self.parent.state = self.original_state[:]
-        self.parent.solution = self.original_solution[:]
+        log.info("%s: bidirectional search did not meet within %d moves" % (self, self.bidirectional_max_depth))
+        return False
 
-        for step in steps_to_here:
-            self.parent.rotate(step)
+    def ida_search_threshold(self, threshold, executor=None, found_index=None):
+        """
+        One IDA iteration at threshold with our ida_engine
+        """
+        if executor is not None:
+            return self.ida_search_parallel(threshold, executor, found_index)
+        elif self.ida_engine == 'coordinates' and self.coordinates:
+            return self.ida_search_coordinates(threshold)
+        elif self.ida_engine in ('iterative', 'coordinates', 'bidirectional'):
+            return self.ida_search_iterative(threshold)
+        else:
+            return self.ida_search([], threshold, -1, self.original_state[:])
 
-        for step in steps:
-            self.parent.rotate(step)
+    def solve_many(self, k, score=None, min_ida_threshold=None, max_ida_threshold=99, node_budget=None):
+        """
+        Return up to k solutions as a list of (score, state, solution) tuples,
+        lowest score first, see LookupTable.solve_many(). The cube is left as
+        it was.
+
+        The IDA search does not stop at the first solution, it keeps going
+        until it has k of them. We stop after the threshold where we have
+        explored node_budget nodes even if we have fewer than k. This does not
+        use the parallel or bidirectional searches.
+        """
+        search = self.solve_many_begin(k, min_ida_threshold, max_ida_threshold)
 
-        # The cube is now in a state where it is in the lookup table, we may need
-        # to do several lookups to get to our target state though. Use
-        # LookupTabele's solve() to take us the rest of the way to the target state.
-        LookupTable.solve(self)
+        for threshold in range(search.min_ida_threshold, max_ida_threshold+1):
+            if search.done():
+                break
 
-        if self.avoid_oll and self.parent.center_solution_leads_to_oll_parity():
-            self.parent.state = self.original_state[:]
-            self.parent.solution = self.original_solution[:]
-            log.debug("%s: IDA found match but it leads to OLL" % self)
-            return False
+            if node_budget is not None:
+                self.solve_many_threshold(search, threshold, node_budget - search.total_ida_count)
 
-        if self.avoid_pll and self.parent.edge_solution_leads_to_pll_parity():
-            self.parent.state = self.original_state[:]
-            self.parent.solution = self.original_solution[:]
-            log.debug("%s: IDA found match but it leads to PLL" % self)
-            return False
+                if search.total_ida_count >= node_budget:
+                    break
+            else:
+                self.solve_many_threshold(search, threshold)
 
-        return True
+        return self.solve_many_results(search.solutions, k, score)
 
-    def ida_search(self, steps_to_here, threshold, prev_step, prev_state):
+    def solve_many_begin(self, k, min_ida_threshold=None, max_ida_threshold=99, transposition_table_bytes=None):
         """
-        https://algorithmsinsight.wordpress.com/graph-theory-2/ida-star-algorithm-in-general/
+        Start a solve_many() search from the cube's state and return its
+        IDASearch. Each solve_many_threshold() searches it one threshold
+        deeper, the beam search (see Beam.py) uses that to search many cubes
+        in lockstep.
         """
-        self.ida_count += 1
+        search = IDASearch(self.parent.state, self.parent.solution, k)
+        self.original_state = search.state[:]
+        self.original_solution = search.solution[:]
 
-        # calculate f_cost which is the cost to where we are plus the estimated cost to reach our goal
-        cost_to_here = len(steps_to_here)
-        cost_to_goal = self.ida_heuristic()
-        f_cost = cost_to_here + cost_to_goal
+        self.ida_heuristic_cache.clear()
 
-        lt_state = self.state()
+        if transposition_table_bytes is None:
+            transposition_table_bytes = self.transposition_table_bytes
 
-        # If our cost_to_goal is greater than the max_depth of our main lookup table then there is no
-        # need to do a binary search through the main lookup table to look for our current state...this
-        # saves us some disk IO
-        if (cost_to_goal <= self.max_depth and
-            self.search_complete(lt_state, steps_to_here)):
-            #log.info("%s: IDA found match %d steps in, %s, lt_state %s, f_cost %d (cost_to_here %d, cost_to_goal %d)" %
-            #         (self, len(steps_to_here), ' '.join(steps_to_here), lt_state, f_cost, cost_to_here, cost_to_goal))
-            log.info("%s: %d seek calls" % (self, self.fh_txt_seek_calls))
-            self.fh_txt_seek_calls = 0
+        # The cube is already in the desired state, that is the only solution we need
+        if self.canonical_state() in self.state_target:
+            search.solutions[tuple(search.state)] = search.solution[:]
+            search.min_ida_threshold = max_ida_threshold + 1
+            return search
 
-            for pt in self.prune_tables:
-                log.info("%s: %d seek calls" % (pt, pt.fh_txt_seek_calls))
-                pt.fh_txt_seek_calls = 0
+        if min_ida_threshold is None:
+            min_ida_threshold = self.ida_heuristic()
 
-            log.info("%s: IDA found match %d steps in %s, lt_state %s, f_cost %d (%d + %d)" %
-                     (self, len(steps_to_here), ' '.join(steps_to_here), lt_state, f_cost, cost_to_here, cost_to_goal))
-            return (f_cost, True)
+        search.min_ida_threshold = min_ida_threshold
+        search.transposition_table = TranspositionTable(transposition_table_bytes)
 
-        # ================
-        # Abort Searching?
-        # ================
-        if f_cost >= threshold:
-            return (f_cost, False)
+        if self.ida_engine == 'coordinates' and self.coordinates is None:
+            self.rotate_xxx = get_rotate_xxx(self.parent.size)
+            self.coordinates = self.ida_coordinates() or False
 
-        # If we have already explored the exact same scenario down another branch
-        # then we can stop looking down this branch
-        explored_cost_to_here = self.explored.get(lt_state)
+        return search
 
-        if explored_cost_to_here is not None and explored_cost_to_here <= cost_to_here:
-            return (f_cost, False)
-        self.explored[lt_state] = cost_to_here
-        skip_other_steps_this_face = None
+    def solve_many_threshold(self, search, threshold, node_budget=None, deadline=None):
+        """
+        Search the IDASearch from solve_many_begin() at threshold. The
+        transposition table and the solutions found so far are kept in
+        search so nothing is lost from one threshold to the next.
+
+        node_budget is the most nodes this call should explore, the search
+        stops at the next solution once it has explored that many. If we are
+        still searching at deadline (a time.time()) we stop and mark search as
+        out_of_time. The cube is left as it was.
+        """
+        if search.done() or threshold < search.min_ida_threshold:
+            return
+
+        original_state = self.parent.state[:]
+        original_solution = self.parent.solution[:]
+        self.parent.state = search.state[:]
+        self.parent.solution = search.solution[:]
+        self.original_state = search.state[:]
+        self.original_solution = search.solution[:]
+        self.rotate_xxx = get_rotate_xxx(self.parent.size)
+        self.total_ida_count = 0
+        self.ida_count = 0
+        self.ida_deadline = deadline
+        self.ida_path = [None] * (threshold + 1)
+        self.transposition_table = search.transposition_table
+        self.ida_solutions = search.solutions
+        self.ida_solutions_max = search.k
+        self.ida_node_budget = node_budget
+
+        try:
+            self.ida_search_threshold(threshold)
+        except IDADeadline:
+            search.out_of_time = True
+        finally:
+            search.total_ida_count += self.ida_count
+            search.threshold = threshold
+            self.ida_deadline = None
+            self.ida_solutions = None
+            self.ida_solutions_max = None
+            self.ida_node_budget = None
+            self.transposition_table = None
+            self.parent.state = original_state
+            self.parent.solution = original_solution
+
+        log.info("%s: solve_many IDA threshold %d, explored %d nodes, %d solutions" %
+            (self, threshold, self.ida_count, len(search.solutions)))
+
+    def ida_check_deadline(self):
+        if time.time() > self.ida_deadline:
+            raise IDADeadline("%s: ran out of time after %d nodes" % (self, self.ida_count))
+
+    def solve_degraded(self, start_time0, max_ida_threshold, fallback=False):
+        """
+        We ran out of time. As the comment at the end of solve() says we can
+        solve one of our prune tables first, that usually leaves us a much
+        shorter search, and then search again with the same budget we had. If
+        none of our prune tables can do that, or if we have already done that
+        and ran out of time again, we give up and raise NoIDASolution.
+        Searching without a deadline could take far longer than the deadline.
+        """
+        self.ida_deadline = None
+        self.parent.state = self.original_state[:]
+        self.parent.solution = self.original_solution[:]
+        solved_first = None
 
-        # log.info("moves_all %s" % ' '.join(self.moves_all))
-        for step in self.moves_all:
+        if not fallback:
+            for pt in self.prune_tables:
 
-            #if steps_cancel_out(prev_step, step):
-            #    continue
+                # cost-only tables do not have the steps to solve with
+                if isinstance(pt, (LookupTableCostOnly, LookupTableIDA)) or not pt.filename_exists:
+                    continue
 
-            if steps_on_same_face_and_layer(prev_step, step):
-                continue
+                state = pt.canonical_state()
 
-            # https://github.com/cs0x7f/TPR-4x4x4-Solver/issues/7
-            '''
-            Well, it's a simple technique to reduce the number of nodes accessed.
-            For example, we start at a position S whose pruning value is no more
-            than maxl, otherwise, S will be pruned in previous searching.  After
-            a move X, we obtain position S', whose pruning value is larger than
-            maxl, which means that X makes S farther from the solved state.  In
-            this case, we won't try X2 and X'.
-            --cs0x7f
-            '''
-            if skip_other_steps_this_face is not None:
-                if steps_on_same_face_and_layer(skip_other_steps_this_face, step):
+                if state in pt.state_target or not pt.steps(state):
                     continue
-                else:
-                    skip_other_steps_this_face = None
 
-            self.parent.state = self.rotate_xxx(prev_state[:], step)
+                pt.solve()
+                solved_first = "solved %s first" % pt
+                break
 
-            (f_cost_tmp, found_solution) = self.ida_search(steps_to_here + [step,], threshold, step, self.parent.state[:])
-            if found_solution:
-                return (f_cost_tmp, True)
+        seconds = (dt.datetime.now() - start_time0).total_seconds()
+        degraded = {
+            'phase': str(self),
+            'fallback': solved_first or 'gave up',
+            'seconds': seconds,
+        }
+        self.parent.degraded_phases.append(degraded)
+        self.telemetry.degraded.append(degraded)
+
+        if solved_first is None:
+            if fallback:
+                reason = 'ran out of time again after solving a prune table first'
             else:
-                if f_cost_tmp > threshold:
-                    skip_other_steps_this_face = step
-                else:
-                    skip_other_steps_this_face = None
+                reason = 'none of our prune tables can be solved first'
 
-        self.parent.state = prev_state[:]
-        return (f_cost, False)
+            log.warning("%s: ran out of time after %.2fs, %s" % (self, seconds, reason))
+            raise NoIDASolution("%s: ran out of time after %.2fs and %s" % (self, seconds, reason))
 
-    def solve(self, min_ida_threshold=None, max_ida_threshold=99):
+        log.warning("%s: ran out of time after %.2fs, %s" % (self, seconds, solved_first))
+        return self.solve_search(None, max_ida_threshold, True, fallback=True)
+
+    def solve(self, min_ida_threshold=None, max_ida_threshold=99, use_deadline=True):
         """
         The goal is to find a sequence of moves that will put the cube in a state that is
         in our lookup table
+
+        If the cube has a deadline (see RubiksCube.solve()) we search for our
+        share of the time that is left (see ida_phase_budget()) and then fall
+        back to solve_degraded()
+
+        The telemetry for the search is appended to the cube's telemetry
+        """
+        self.telemetry = IDATelemetry(str(self), self.ida_engine, self.prune_tables, self.telemetry_timing)
+        solution_len = len(self.parent.solution)
+        found_solution = False
+
+        try:
+            found_solution = self.solve_search(min_ida_threshold, max_ida_threshold, use_deadline)
+            return found_solution
+        finally:
+            self.telemetry.heuristic_cache = {
+                'hits': self.ida_heuristic_cache_hits,
+                'misses': self.ida_heuristic_cache_misses,
+            }
+            self.telemetry.prune_table_order = [str(self.prune_tables[index]) for index in self.prune_table_order]
+            self.telemetry.finish(len(self.parent.solution) - solution_len if found_solution else None)
+            self.parent.telemetry.append(self.telemetry)
+            self.telemetry = None
+
+    def ida_phase_budget(self):
+        """
+        The seconds we can search for. The time that is left before the
+        cube's deadline is split evenly between us and the IDA phases that
+        come after us. The cube's deadline_phases is about how many IDA phases
+        a solve goes through and the cube's telemetry has one entry for each
+        phase that is done, a fake cube shares both with the real cube (see
+        RubiksCube.share_with_fake_cube()).
+        """
+        phases_left = max(1, self.parent.deadline_phases - len(self.parent.telemetry))
+        return max(self.parent.deadline - time.time(), 0) / phases_left
+
+    def solve_search(self, min_ida_threshold, max_ida_threshold, use_deadline, fallback=False):
+        """
+        fallback is True for the search after solve_degraded() has solved one
+        of our prune tables first, it gets the same budget we had the first
+        time and if it runs out of time as well we give up
         """
         start_time0 = dt.datetime.now()
+        self.ida_heuristic_cache.clear()
 
         # save cube state
         self.original_state = self.parent.state[:]
         self.original_solution = self.parent.solution[:]
 
-        if self.parent.size == 2:
-            from rubikscubennnsolver.RubiksCube222 import rotate_222
-            self.rotate_xxx = rotate_222
-        elif self.parent.size == 4:
-            from rubikscubennnsolver.RubiksCube444 import rotate_444
-            self.rotate_xxx = rotate_444
-        elif self.parent.size == 5:
-            from rubikscubennnsolver.RubiksCube555 import rotate_555
-            self.rotate_xxx = rotate_555
-        elif self.parent.size == 6:
-            from rubikscubennnsolver.RubiksCube666 import rotate_666
-            self.rotate_xxx = rotate_666
-        elif self.parent.size == 7:
-            from rubikscubennnsolver.RubiksCube777 import rotate_777
-            self.rotate_xxx = rotate_777
-        else:
-            raise ImplementThis("Need rotate_xxx" % (self.parent.size, self.parent.size, self.parent.size))
-
-        state = self.state()
+        self.rotate_xxx = get_rotate_xxx(self.parent.size)
+
+        state = self.canonical_state()
         #log.info("%s: ida_stage() state %s vs state_target %s" % (self, state, self.state_target))
 
         # The cube is already in the desired state, nothing to do
@@ -817,6 +4487,35 @@ class LookupTableIDA(LookupTable):
         # until we find a sequence of moves that takes us to a state that IS in the
         # lookup table.
 
+        if fallback:
+            self.ida_deadline = time.time() + self.ida_budget_seconds
+        elif use_deadline and getattr(self.parent, 'deadline', None) is not None:
+            self.ida_budget_seconds = self.ida_phase_budget()
+            self.ida_deadline = time.time() + self.ida_budget_seconds
+        else:
+            self.ida_deadline = None
+
+        if self.ida_engine == 'bidirectional':
+            start_time1 = dt.datetime.now()
+
+            try:
+                found_solution = self.bidirectional_search()
+            except IDADeadline:
+                return self.solve_degraded(start_time0, max_ida_threshold, fallback)
+
+            if found_solution is not None:
+                self.total_ida_count = self.ida_count
+                self.telemetry.bidirectional = {
+                    'nodes': self.ida_count,
+                    'seconds': (dt.datetime.now() - start_time1).total_seconds(),
+                    'found': found_solution,
+                }
+                log.info("%s: bidirectional search explored %d nodes, took %s" %
+                    (self, self.ida_count, pretty_time(dt.datetime.now() - start_time1)))
+
+            if found_solution:
+                return True
+
         if min_ida_threshold is None:
             min_ida_threshold = self.ida_heuristic()
 
@@ -825,36 +4524,81 @@ class LookupTableIDA(LookupTable):
             raise NoIDASolution("%s FAILED with range %d->%d" % (self, min_ida_threshold, max_ida_threshold+1))
 
         log.info("%s: IDA threshold range %d->%d" % (self, min_ida_threshold, max_ida_threshold))
-        total_ida_count = 0
+        self.total_ida_count = 0
+        self.ida_path = [None] * (max_ida_threshold + 1)
 
-        for threshold in range(min_ida_threshold, max_ida_threshold+1):
-            steps_to_here = []
-            start_time1 = dt.datetime.now()
-            self.ida_count = 0
-            self.explored = {}
+        # The transposition table is kept from one threshold to the next so
+        # the states we explored at threshold N can prune at threshold N+1
+        self.transposition_table = TranspositionTable(self.transposition_table_bytes)
 
-            (f_cost, found_solution) = self.ida_search(steps_to_here, threshold, None, self.original_state[:])
-            total_ida_count += self.ida_count
+        # ida_coordinates() returns None if we cannot search via coordinates,
+        # remember that as False so we only find out once
+        if self.ida_engine == 'coordinates' and self.coordinates is None:
+            self.coordinates = self.ida_coordinates() or False
 
-            if found_solution:
-                end_time1 = dt.datetime.now()
-                log.info("%s: IDA threshold %d, explored %d nodes, took %s (%s total)" %
-                    (self, threshold, self.ida_count,
-                     pretty_time(end_time1 - start_time1),
-                     pretty_time(end_time1 - start_time0)))
-                delta = end_time1 - start_time0
-                nodes_per_sec = int(total_ida_count / delta.total_seconds())
-                log.info("%s: IDA explored %d nodes in %s, %d nodes-per-sec" % (self, total_ida_count, delta, nodes_per_sec))
-                return True
-            else:
-                end_time1 = dt.datetime.now()
-                log.info("%s: IDA threshold %d, explored %d nodes, took %s" %
-                    (self, threshold, self.ida_count, pretty_time(end_time1 - start_time1)))
+        # One worker would just be a slower way to search with one process
+        if self.parallel_ida_workers and self.parallel_ida_workers > 1:
+            (executor, found_index) = self.parallel_ida_executor()
+        else:
+            (executor, found_index) = (None, None)
+
+        # Set when we run out of time, see solve_degraded()
+        out_of_time = False
+
+        try:
+            for threshold in range(min_ida_threshold, max_ida_threshold+1):
+                start_time1 = dt.datetime.now()
+                self.ida_count = 0
+
+                (f_cost, found_solution) = self.ida_search_threshold(threshold, executor, found_index)
+                self.total_ida_count += self.ida_count
+                self.telemetry.add_threshold(threshold, self.ida_count, (dt.datetime.now() - start_time1).total_seconds())
+
+                if found_solution:
+                    end_time1 = dt.datetime.now()
+                    log.info("%s: IDA threshold %d, explored %d nodes, took %s (%s total)" %
+                        (self, threshold, self.ida_count,
+                         pretty_time(end_time1 - start_time1),
+                         pretty_time(end_time1 - start_time0)))
+                    delta = end_time1 - start_time0
+                    nodes_per_sec = int(self.total_ida_count / delta.total_seconds())
+                    log.info("%s: IDA explored %d nodes in %s, %d nodes-per-sec" % (self, self.total_ida_count, delta, nodes_per_sec))
+                    self.transposition_table.log_stats(self)
+                    self.telemetry.add_transposition_table(self.transposition_table)
+                    self.transposition_table = None
+                    self.ida_deadline = None
+                    return True
+                else:
+                    end_time1 = dt.datetime.now()
+                    log.info("%s: IDA threshold %d, explored %d nodes, took %s" %
+                        (self, threshold, self.ida_count, pretty_time(end_time1 - start_time1)))
+        except IDADeadline:
+            out_of_time = True
+        finally:
+            if executor is not None:
+                if out_of_time:
+                    # Do not wait for the workers to finish their subtrees,
+                    # a found_index of -1 tells them all to give up
+                    found_index.value = -1
+                    executor.shutdown(wait=False, cancel_futures=True)
+                else:
+                    executor.shutdown()
+
+        if out_of_time:
+            self.telemetry.add_threshold(threshold, self.ida_count, (dt.datetime.now() - start_time1).total_seconds())
+            self.telemetry.add_transposition_table(self.transposition_table)
+            self.transposition_table = None
+            return self.solve_degraded(start_time0, max_ida_threshold, fallback)
+
+        self.ida_deadline = None
 
         # The only time we will get here is when max_ida_threshold is a low number.  It will be up to the caller to:
         # - 'solve' one of their prune tables to put the cube in a state that we can find a solution for a little more easily
         # - call ida_solve() again but with a near infinite max_ida_threshold...99 is close enough to infinity for IDA purposes
         log.info("%s: could not find a solution via IDA with max threshold of %d " % (self, max_ida_threshold))
+        self.transposition_table.log_stats(self)
+        self.telemetry.add_transposition_table(self.transposition_table)
+        self.transposition_table = None
 
         self.parent.state = self.original_state[:]
         self.parent.solution = self.original_solution[:]
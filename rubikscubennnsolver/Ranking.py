@@ -0,0 +1,436 @@
+#!/usr/bin/env python3
+
+"""
+Ranking and unranking of the "k-of-n" patterns our lookup tables key on.
+
+A state such as the 24 4x4x4 centers where 8 of them are U or D has
+24!/(8! * 16!) or 735,471 possible values. If we can map each of those to a
+number in range(735471) (its rank) then a lookup table for that pattern can be
+a dense array indexed by rank. There are no keys to store and no binary search,
+a lookup is a single index.
+
+- colex_rank()/colex_unrank() handle binary patterns (k-of-n)
+- multinomial_rank()/multinomial_unrank() handle patterns with more than two
+  colors, this is done by chaining colex ranks one color at a time
+- StateRanker ranks a LookupTable state() where the positions may be split
+  into several orbits that are ranked independently
+"""
+
+import logging
+
+log = logging.getLogger(__name__)
+
+
+class BinomialTable(object):
+    """
+    Pascal's triangle, grown as needed. table[n][k] is n choose k and is
+    0 when k > n so callers do not need to check for that.
+    """
+
+    def __init__(self):
+        self.rows = [[1, 0]]
+
+    def grow(self, n):
+        while len(self.rows) <= n:
+            prev_row = self.rows[-1]
+            row = [1]
+
+            for k in range(1, len(prev_row)):
+                row.append(prev_row[k - 1] + prev_row[k])
+
+            row.append(0)
+            self.rows.append(row)
+
+        return self.rows
+
+
+binomial_table = BinomialTable()
+
+
+def binomial(n, k):
+    """
+    >>> binomial(24, 8)
+    735471
+    >>> binomial(4, 5)
+    0
+    """
+    if k < 0 or k > n:
+        return 0
+    return binomial_table.grow(n)[n][k]
+
+
+def multinomial_count(counts):
+    """
+    The number of distinct arrangements of a pattern with counts[i] of color i
+
+    >>> multinomial_count((16, 8))
+    735471
+    >>> multinomial_count((4, 4, 4, 4))
+    63063000
+    """
+    result = 1
+    n = 0
+
+    for count in counts:
+        n += count
+        result *= binomial(n, count)
+
+    return result
+
+
+def colex_rank(value):
+    """
+    Return the colex rank of the k-subset given by the set bits of value
+
+    >>> colex_rank(int('000111', 2))
+    0
+    >>> colex_rank(int('001011', 2))
+    1
+    >>> colex_rank(int('111000', 2))
+    19
+    """
+    C = binomial_table.grow(value.bit_length())
+    rank = 0
+    i = 0
+
+    while value:
+        low_bit = value & -value
+        i += 1
+        rank += C[low_bit.bit_length() - 1][i]
+        value ^= low_bit
+
+    return rank
+
+
+def colex_unrank_positions(rank, k):
+    """
+    Return the sorted positions of the k-subset whose colex rank is rank
+
+    >>> colex_unrank_positions(19, 3)
+    [3, 4, 5]
+    """
+    positions = []
+
+    for i in range(k, 0, -1):
+        # Find the largest p where p choose i is <= rank
+        p = i - 1
+
+        while binomial(p + 1, i) <= rank:
+            p += 1
+
+        rank -= binomial(p, i)
+        positions.append(p)
+
+    positions.reverse()
+    return positions
+
+
+def colex_unrank(rank, k):
+    """
+    The inverse of colex_rank()
+
+    >>> bin(colex_unrank(19, 3))
+    '0b111000'
+    >>> all(colex_rank(colex_unrank(x, 8)) == x for x in range(0, 735471, 997))
+    True
+    """
+    value = 0
+
+    for position in colex_unrank_positions(rank, k):
+        value |= 1 << position
+
+    return value
+
+
+def multinomial_rank(chars, alphabet, counts):
+    """
+    Rank a multi-color pattern. chars must contain counts[i] of alphabet[i],
+    if it does not we return None.
+
+    The rank is built one color at a time, the colex rank of where the first
+    color is, then the colex rank of where the second color is among the
+    squares that are left, etc.
+
+    >>> multinomial_rank('LLUUFF', 'FLU', (2, 2, 2))
+    14
+    >>> multinomial_rank('LLUUFL', 'FLU', (2, 2, 2)) is None
+    True
+    """
+    C = binomial_table.grow(len(chars))
+    rank = 0
+    multiplier = 1
+
+    for (char, count) in zip(alphabet[:-1], counts[:-1]):
+        char_rank = 0
+        i = 0
+        rest = []
+
+        for (position, square) in enumerate(chars):
+            if square == char:
+                i += 1
+                char_rank += C[position][i]
+            else:
+                rest.append(square)
+
+        if i != count:
+            return None
+
+        rank += char_rank * multiplier
+        multiplier *= C[len(chars)][count]
+        chars = rest
+
+    last_char = alphabet[-1]
+
+    for square in chars:
+        if square != last_char:
+            return None
+
+    return rank
+
+
+def multinomial_unrank(rank, alphabet, counts):
+    """
+    The inverse of multinomial_rank()
+
+    >>> multinomial_unrank(14, 'FLU', (2, 2, 2))
+    'LLUUFF'
+    >>> all(multinomial_rank(multinomial_unrank(x, 'FLU', (3, 3, 2)), 'FLU', (3, 3, 2)) == x for x in range(560))
+    True
+    """
+    slots = list(range(sum(counts)))
+    result = [None] * len(slots)
+
+    for (char, count) in zip(alphabet[:-1], counts[:-1]):
+        size = binomial(len(slots), count)
+        char_rank = rank % size
+        rank = rank // size
+        chosen = set(colex_unrank_positions(char_rank, count))
+        rest = []
+
+        for (position, slot) in enumerate(slots):
+            if position in chosen:
+                result[slot] = char
+            else:
+                rest.append(slot)
+
+        slots = rest
+
+    for slot in slots:
+        result[slot] = alphabet[-1]
+
+    return ''.join(result)
+
+
+class StateRanker(object):
+    """
+    Rank the state() of a LookupTable.
+
+    encoding describes what state() returns
+    - 'int' an integer whose binary representation (width bits) is the pattern
+    - 'hex' the same but as a hex string, ie the tables that use self.hex_format
+    - 'str' a string of colors
+
+    Each position of the pattern (indexed from the left) is either in one of
+    the orbits or is fixed. Each orbit is ranked independently, a 5x5x5 has
+    T-centers and X-centers that never mix so ranking them as one orbit would
+    waste most of the rank space. The orbit ranks are then combined as a
+    mixed radix number.
+
+    For the 'int' and 'hex' encodings the alphabet is '01'.
+
+    >>> ranker = StateRanker('int', 24, [list(range(24))], '01', [(16, 8)])
+    >>> ranker.size
+    735471
+    >>> ranker.rank(int('111111110000000000000000', 2))
+    735470
+    >>> bin(ranker.unrank(730626))
+    '0b111100000000000000001111'
+    >>> ranker.rank(int('1', 2)) is None
+    True
+
+    >>> ranker = StateRanker('str', 4, [[0, 1], [3]], 'LU', [(1, 1), (0, 1)], {2: 'x'})
+    >>> [ranker.rank(x) for x in ('LUxU', 'ULxU', 'ULxL', 'ULUU')]
+    [0, 1, None, None]
+    >>> ranker.unrank(1)
+    'ULxU'
+    """
+
+    def __init__(self, encoding, width, orbits, alphabet, counts, fixed=None):
+        assert encoding in ('int', 'hex', 'str'), "invalid encoding %s" % encoding
+        assert len(orbits) == len(counts), "there must be counts for each orbit"
+
+        self.encoding = encoding
+        self.width = width
+        self.orbits = [list(orbit) for orbit in orbits]
+        self.alphabet = alphabet
+        self.counts = [tuple(count) for count in counts]
+        self.fixed = {}
+        self.size = 1
+        self.orbit_sizes = []
+
+        if fixed:
+            for (position, char) in fixed.items():
+                self.fixed[int(position)] = char
+
+        for count in self.counts:
+            self.orbit_sizes.append(multinomial_count(count))
+            self.size *= self.orbit_sizes[-1]
+
+        binomial_table.grow(width)
+
+        if encoding in ('int', 'hex'):
+            assert alphabet == '01', "%s encoding must use an alphabet of 01" % encoding
+
+            # For each orbit the bit for each position, lowest bit first
+            self.orbit_bits = []
+
+            for orbit in self.orbits:
+                self.orbit_bits.append(sorted([1 << (width - 1 - position) for position in orbit]))
+
+            self.fixed_mask = 0
+            self.fixed_value = 0
+
+            for (position, char) in self.fixed.items():
+                bit = 1 << (width - 1 - position)
+                self.fixed_mask |= bit
+
+                if char == '1':
+                    self.fixed_value |= bit
+
+            # The common case, one orbit that is the entire pattern
+            self.whole_int = bool(len(self.orbits) == 1 and len(self.orbits[0]) == width)
+
+    def to_spec(self):
+        """
+        A json friendly description of this ranker, this is saved in the header of the .bin tables
+        """
+        return {
+            'encoding': self.encoding,
+            'width': self.width,
+            'orbits': self.orbits,
+            'alphabet': self.alphabet,
+            'counts': self.counts,
+            'fixed': self.fixed,
+        }
+
+    @classmethod
+    def from_spec(cls, spec):
+        return cls(spec['encoding'], spec['width'], spec['orbits'], spec['alphabet'], spec['counts'], spec.get('fixed'))
+
+    def rank_int(self, value):
+        C = binomial_table.rows
+
+        if self.whole_int:
+            k = self.counts[0][1]
+            rank = 0
+            i = 0
+
+            while value:
+                low_bit = value & -value
+                i += 1
+                rank += C[low_bit.bit_length() - 1][i]
+                value ^= low_bit
+
+            if i != k:
+                return None
+
+            return rank
+
+        if (value & self.fixed_mask) != self.fixed_value:
+            return None
+
+        rank = 0
+        multiplier = 1
+
+        for (orbit_bits, count, orbit_size) in zip(self.orbit_bits, self.counts, self.orbit_sizes):
+            orbit_rank = 0
+            i = 0
+
+            for (j, bit) in enumerate(orbit_bits):
+                if value & bit:
+                    i += 1
+                    orbit_rank += C[j][i]
+
+            if i != count[1]:
+                return None
+
+            rank += orbit_rank * multiplier
+            multiplier *= orbit_size
+
+        return rank
+
+    def rank(self, state):
+        """
+        Return the rank of state, None if state is not one of our patterns
+        """
+        if self.encoding == 'int':
+            return self.rank_int(state)
+
+        elif self.encoding == 'hex':
+            try:
+                return self.rank_int(int(state, 16))
+            except ValueError:
+                return None
+
+        if len(state) != self.width:
+            return None
+
+        for (position, char) in self.fixed.items():
+            if state[position] != char:
+                return None
+
+        rank = 0
+        multiplier = 1
+
+        for (orbit, count, orbit_size) in zip(self.orbits, self.counts, self.orbit_sizes):
+            orbit_rank = multinomial_rank([state[position] for position in orbit], self.alphabet, count)
+
+            if orbit_rank is None:
+                return None
+
+            rank += orbit_rank * multiplier
+            multiplier *= orbit_size
+
+        return rank
+
+    def unrank(self, rank):
+        """
+        The inverse of rank()
+        """
+        pattern = [None] * self.width
+
+        for (position, char) in self.fixed.items():
+            pattern[position] = char
+
+        for (orbit, count, orbit_size) in zip(self.orbits, self.counts, self.orbit_sizes):
+            orbit_rank = rank % orbit_size
+            rank = rank // orbit_size
+
+            if self.encoding == 'str':
+                chars = multinomial_unrank(orbit_rank, self.alphabet, count)
+            else:
+                # rank_int() walks the orbit lowest bit first, which is highest position first
+                chars = multinomial_unrank(orbit_rank, '10', (count[1], count[0]))
+                orbit = sorted(orbit, reverse=True)
+
+            for (position, char) in zip(orbit, chars):
+                pattern[position] = char
+
+        pattern = ''.join(pattern)
+
+        if self.encoding == 'int':
+            return int(pattern, 2)
+        elif self.encoding == 'hex':
+            return ('%0' + '%dx' % int(self.width / 4)) % int(pattern, 2)
+        else:
+            return pattern
+
+
+if __name__ == '__main__':
+    import doctest
+
+    logging.basicConfig(level=logging.INFO,
+                        format='%(asctime)s %(filename)16s %(levelname)8s: %(message)s')
+    log = logging.getLogger(__name__)
+
+    doctest.testmod()
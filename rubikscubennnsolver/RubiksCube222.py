@@ -124,7 +124,8 @@ class RubiksCube222(RubiksCube):
 
         raise SolveError("Could not find a solution")
 
-    def solve(self):
+    def solve(self, deadline=None):
+        # There is no IDA to run out of time in
         self.solve_non_table()
         self.compress_solution()
 
@@ -4,6 +4,7 @@ from rubikscubennnsolver import RubiksCube
 from rubikscubennnsolver.LookupTable import (
     get_characters_common_count,
     steps_on_same_face_and_layer,
+    LazyLookupTable,
     LookupTable,
     LookupTableCostOnly,
     LookupTableIDA,
@@ -262,6 +263,9 @@ Total: 735,471 entries
 '''
 class LookupTable444UDCentersStageCostOnly(LookupTableCostOnly):
 
+    state_positions = centers_444
+    state_pattern = {'U': '1', 'L': '0', 'F': '0', 'R': '0', 'B': '0', 'D': '1', 'x': '0'}
+
     def __init__(self, parent):
 
         LookupTableCostOnly.__init__(
@@ -277,9 +281,15 @@ class LookupTable444UDCentersStageCostOnly(LookupTableCostOnly):
         result = ''.join(['1' if parent_state[x] in ('U', 'D') else '0' for x in centers_444])
         return int(result, 2)
 
+    def state_from_pattern(self, pattern):
+        return int(pattern, 2)
+
 
 class LookupTable444LRCentersStageCostOnly(LookupTableCostOnly):
 
+    state_positions = centers_444
+    state_pattern = {'U': '0', 'L': '1', 'F': '0', 'R': '1', 'B': '0', 'D': '0', 'x': '0'}
+
     def __init__(self, parent):
         LookupTableCostOnly.__init__(
             self,
@@ -294,9 +304,15 @@ class LookupTable444LRCentersStageCostOnly(LookupTableCostOnly):
         result = ''.join(['1' if parent_state[x] in ('L', 'R') else '0' for x in centers_444])
         return int(result, 2)
 
+    def state_from_pattern(self, pattern):
+        return int(pattern, 2)
+
 
 class LookupTable444FBCentersStageCostOnly(LookupTableCostOnly):
 
+    state_positions = centers_444
+    state_pattern = {'U': '0', 'L': '0', 'F': '1', 'R': '0', 'B': '1', 'D': '0', 'x': '0'}
+
     def __init__(self, parent):
         LookupTableCostOnly.__init__(
             self,
@@ -311,6 +327,9 @@ class LookupTable444FBCentersStageCostOnly(LookupTableCostOnly):
         result = ''.join(['1' if parent_state[x] in ('F', 'B') else '0' for x in centers_444])
         return int(result, 2)
 
+    def state_from_pattern(self, pattern):
+        return int(pattern, 2)
+
 
 class LookupTableIDA444ULFRBDCentersStage(LookupTableIDA):
     """
@@ -326,6 +345,14 @@ class LookupTableIDA444ULFRBDCentersStage(LookupTableIDA):
     Total: 1,718,045 entries
     """
 
+    # These let ida_engine = 'coordinates' search on the centers instead of
+    # the entire cube (see Coordinates.py). We still use the default engine,
+    # compare them with utils/benchmark-ida.py before switching.
+    #
+    # The 'x' squares of a fake 444 (see RubiksCube666) are 'U' to state()
+    state_positions = centers_444
+    state_pattern = {'U': 'U', 'L': 'L', 'F': 'F', 'R': 'L', 'B': 'F', 'D': 'U', 'x': 'U'}
+
     def __init__(self, parent):
         LookupTableIDA.__init__(
             self,
@@ -637,6 +664,9 @@ class LookupTable444Edges(LookupTable):
 
 class RubiksCube444(RubiksCube):
 
+    # The centers stage and the centers solve, see RubiksCube.deadline_phases
+    deadline_phases = 2
+
     def __init__(self, state, order, colormap=None, avoid_pll=True, debug=False):
         RubiksCube.__init__(self, state, order, colormap, debug)
         self.avoid_pll = avoid_pll
@@ -694,37 +724,31 @@ class RubiksCube444(RubiksCube):
         self._sanity_check('centers', centers, 4)
         self._sanity_check('edge-orbit-0', edge_orbit_0, 8)
 
-    def lt_init(self):
-        if self.lt_init_called:
-            return
-        self.lt_init_called = True
-
-        # ==============
-        # Phase 1 tables
-        # ==============
-        # prune tables
-
-        # Solving 50 cubes where you binary search through the prune table files takes 57s
-        # Solving 50 cubes using the cost-only tables takes 30s!!
-        self.lt_UD_centers_stage = LookupTable444UDCentersStageCostOnly(self)
-        self.lt_LR_centers_stage = LookupTable444LRCentersStageCostOnly(self)
-        self.lt_FB_centers_stage = LookupTable444FBCentersStageCostOnly(self)
-
-        # Stage all centers via IDA
-        self.lt_ULFRBD_centers_stage = LookupTableIDA444ULFRBDCentersStage(self)
-        self.lt_ULFRBD_centers_stage.avoid_oll = True
-        self.lt_ULFRBD_centers_stage.preload_cache()
-
-        # =============
-        # Phase2 tables
-        # =============
-        self.lt_ULFRBD_centers_solve = LookupTable444ULFRBDCentersSolve(self)
-        self.lt_ULFRBD_centers_solve.preload_cache()
-        self.lt_ULFRBD_centers_solve_pair_two_edges = LookupTable444ULFRBDCentersSolvePairTwoEdges(self)
-        #self.lt_ULFRBD_centers_solve_edges_stage = LookupTable444ULFRBDCentersSolveEdgesStage(self)
-
-        # Edges table
-        self.lt_edges = LookupTable444Edges(self)
+    # The tables are only opened the first time they are used, see LazyLookupTable
+
+    # ==============
+    # Phase 1 tables
+    # ==============
+    # prune tables
+
+    # Solving 50 cubes where you binary search through the prune table files takes 57s
+    # Solving 50 cubes using the cost-only tables takes 30s!!
+    lt_UD_centers_stage = LazyLookupTable(LookupTable444UDCentersStageCostOnly)
+    lt_LR_centers_stage = LazyLookupTable(LookupTable444LRCentersStageCostOnly)
+    lt_FB_centers_stage = LazyLookupTable(LookupTable444FBCentersStageCostOnly)
+
+    # Stage all centers via IDA
+    lt_ULFRBD_centers_stage = LazyLookupTable(LookupTableIDA444ULFRBDCentersStage, preload=True, avoid_oll=True)
+
+    # =============
+    # Phase2 tables
+    # =============
+    lt_ULFRBD_centers_solve = LazyLookupTable(LookupTable444ULFRBDCentersSolve, preload=True)
+    lt_ULFRBD_centers_solve_pair_two_edges = LazyLookupTable(LookupTable444ULFRBDCentersSolvePairTwoEdges)
+    #lt_ULFRBD_centers_solve_edges_stage = LazyLookupTable(LookupTable444ULFRBDCentersSolveEdgesStage)
+
+    # Edges table
+    lt_edges = LazyLookupTable(LookupTable444Edges)
 
     def group_centers_guts(self):
         self.lt_init()
@@ -5,6 +5,7 @@ from rubikscubennnsolver.RubiksSide import SolveError
 from rubikscubennnsolver.RubiksCube444 import moves_444
 from rubikscubennnsolver.LookupTable import (
     steps_on_same_face_and_layer,
+    LazyLookupTable,
     LookupTable,
     LookupTableCostOnly,
     LookupTableIDA,
@@ -236,6 +237,9 @@ class LookupTable555UDTCenterStageCostOnly(LookupTableCostOnly):
     Total: 735,471 entries
     """
 
+    state_positions = t_centers_555
+    state_pattern = {'U': '1', 'L': '0', 'F': '0', 'R': '0', 'B': '0', 'D': '1'}
+
     def __init__(self, parent):
         LookupTableCostOnly.__init__(
             self,
@@ -250,6 +254,9 @@ class LookupTable555UDTCenterStageCostOnly(LookupTableCostOnly):
         result = ''.join(['1' if parent_state[x] in ('U', 'D') else '0' for x in t_centers_555])
         return int(result, 2)
 
+    def state_from_pattern(self, pattern):
+        return int(pattern, 2)
+
 
 class LookupTable555UDXCenterStageCostOnly(LookupTableCostOnly):
     """
@@ -267,6 +274,9 @@ class LookupTable555UDXCenterStageCostOnly(LookupTableCostOnly):
     Total: 735,471 entries
     """
 
+    state_positions = x_centers_555
+    state_pattern = {'U': '1', 'L': '0', 'F': '0', 'R': '0', 'B': '0', 'D': '1'}
+
     def __init__(self, parent):
         LookupTableCostOnly.__init__(
             self,
@@ -282,6 +292,9 @@ class LookupTable555UDXCenterStageCostOnly(LookupTableCostOnly):
 
         return int(result, 2)
 
+    def state_from_pattern(self, pattern):
+        return int(pattern, 2)
+
 
 class LookupTableIDA555UDCentersStage(LookupTableIDA):
     """
@@ -299,6 +312,12 @@ class LookupTableIDA555UDCentersStage(LookupTableIDA):
     Average: 6.945019 moves
     """
 
+    # These let ida_engine = 'coordinates' search on the centers instead of
+    # the entire cube (see Coordinates.py). We still use the default engine,
+    # compare them with utils/benchmark-ida.py before switching.
+    state_positions = centers_555
+    state_pattern = {'U': '1', 'L': '0', 'F': '0', 'R': '0', 'B': '0', 'D': '1'}
+
     def __init__(self, parent):
         LookupTableIDA.__init__(
             self,
@@ -324,6 +343,9 @@ class LookupTableIDA555UDCentersStage(LookupTableIDA):
         # Convert to hex
         return self.hex_format % int(result, 2)
 
+    def state_from_pattern(self, pattern):
+        return self.hex_format % int(pattern, 2)
+
 
 class LookupTable555LRCentersStage(LookupTable):
     """
@@ -464,6 +486,13 @@ class LookupTableIDA555ULFRBDCentersSolve(LookupTableIDA):
     Total: 13,684,136 entries
     """
 
+    # Any rotation/reflection of a cube with solved centers has solved centers
+    # once the squares are recolored so this table could be reduced with
+    # "utils/reduce-symmetry.py --symmetry all". The table we ship is not so
+    # we do not set symmetry.
+    state_positions = centers_555
+    state_pattern = {'U': 'U', 'L': 'L', 'F': 'F', 'R': 'R', 'B': 'B', 'D': 'D'}
+
     def __init__(self, parent):
         LookupTableIDA.__init__(
             self,
@@ -857,6 +886,9 @@ class RubiksCube555(RubiksCube):
     - solve as 3x3x3
     """
 
+    # The UD centers stage and the centers solve, see RubiksCube.deadline_phases
+    deadline_phases = 2
+
     def __init__(self, state, order, colormap=None, debug=False):
         RubiksCube.__init__(self, state, order, colormap)
 
@@ -910,31 +942,31 @@ class RubiksCube555(RubiksCube):
         self.state = rotate_555(self.state[:], step)
         self.solution.append(step)
 
-    def lt_init(self):
-        if self.lt_init_called:
-            return
-        self.lt_init_called = True
+    # The tables are only opened the first time they are used, see LazyLookupTable
 
-        # 50 cubes took 2m 10s without CostOnly
-        # 50 cubes took 1m 33s with CostOnly
-        self.lt_UD_T_centers_stage = LookupTable555UDTCenterStageCostOnly(self)
-        self.lt_UD_X_centers_stage = LookupTable555UDXCenterStageCostOnly(self)
-        self.lt_UD_centers_stage = LookupTableIDA555UDCentersStage(self)
-        #self.lt_UD_centers_stage.preload_cache()
+    # 50 cubes took 2m 10s without CostOnly
+    # 50 cubes took 1m 33s with CostOnly
+    lt_UD_T_centers_stage = LazyLookupTable(LookupTable555UDTCenterStageCostOnly)
+    lt_UD_X_centers_stage = LazyLookupTable(LookupTable555UDXCenterStageCostOnly)
+    lt_UD_centers_stage = LazyLookupTable(LookupTableIDA555UDCentersStage)
+    #lt_UD_centers_stage = LazyLookupTable(LookupTableIDA555UDCentersStage, preload=True)
 
-        self.lt_LR_centers_stage = LookupTable555LRCentersStage(self)
+    lt_LR_centers_stage = LazyLookupTable(LookupTable555LRCentersStage)
 
-        self.lt_UL_centers_solve = LookupTableULCentersSolve(self)
-        self.lt_UF_centers_solve = LookupTableUFCentersSolve(self)
-        self.lt_ULFRB_centers_solve = LookupTableIDA555ULFRBDCentersSolve(self)
+    lt_UL_centers_solve = LazyLookupTable(LookupTableULCentersSolve)
+    lt_UF_centers_solve = LazyLookupTable(LookupTableUFCentersSolve)
+    lt_ULFRB_centers_solve = LazyLookupTable(LookupTableIDA555ULFRBDCentersSolve)
 
-        self.lt_edges_stage_first_four = LookupTable555StageFirstFourEdges(self)
-        self.lt_edges_stage_second_four = LookupTable555StageSecondFourEdges(self)
-        self.lt_edges_pair_last_four = LookupTable555PairLastFourEdges(self)
+    lt_edges_stage_first_four = LazyLookupTable(LookupTable555StageFirstFourEdges)
 
-        self.lt_ULFRBD_t_centers_solve = LookupTable555TCenterSolve(self)
+    # These two are looked up over and over for the same states by
+    # stage_second_four_edges_555() and solve_staged_edges_555()
+    lt_edges_stage_second_four = LazyLookupTable(LookupTable555StageSecondFourEdges, lru_cache_size=100000)
+    lt_edges_pair_last_four = LazyLookupTable(LookupTable555PairLastFourEdges, lru_cache_size=100000)
 
-        self.lt_LR_t_centers_solve = LookupTable555LRTCenterSolve(self)
+    lt_ULFRBD_t_centers_solve = LazyLookupTable(LookupTable555TCenterSolve)
+
+    lt_LR_t_centers_solve = LazyLookupTable(LookupTable555LRTCenterSolve)
 
     def high_low_state(self, x, y, state_x, state_y, wing_str):
         """
@@ -1217,10 +1249,13 @@ class RubiksCube555(RubiksCube):
             for step in pre_steps:
                 self.rotate(step)
 
+            # Look up all 495 states in one pass through the table
+            states = [self.lt_edges_stage_first_four.state(wing_strs) for wing_strs in stage_first_four_edges_wing_str_combos]
+            steps_for_state = self.lt_edges_stage_first_four.steps_many(states)
+
             # do those steps
-            for wing_strs in stage_first_four_edges_wing_str_combos:
-                state = self.lt_edges_stage_first_four.state(wing_strs)
-                steps = self.lt_edges_stage_first_four.steps(state)
+            for (wing_strs, state) in zip(stage_first_four_edges_wing_str_combos, states):
+                steps = steps_for_state[state]
 
                 if steps:
                     log.info("%s: first four %s can be staged in %d steps" % (self, wing_strs, len(steps)))
@@ -1272,9 +1307,12 @@ class RubiksCube555(RubiksCube):
         min_solution_len = None
         min_solution_steps = None
 
-        for wing_strs in itertools.combinations(wing_strs_for_second_four, 4):
-            state = self.lt_edges_stage_second_four.state(wing_strs)
-            steps = self.lt_edges_stage_second_four.steps(state)
+        wing_strs_combos = list(itertools.combinations(wing_strs_for_second_four, 4))
+        states = [self.lt_edges_stage_second_four.state(wing_strs) for wing_strs in wing_strs_combos]
+        steps_for_state = self.lt_edges_stage_second_four.steps_many(states)
+
+        for (wing_strs, state) in zip(wing_strs_combos, states):
+            steps = steps_for_state[state]
 
             if steps:
 
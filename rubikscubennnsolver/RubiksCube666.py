@@ -4,6 +4,7 @@ from rubikscubennnsolver.RubiksCubeNNNEvenEdges import RubiksCubeNNNEvenEdges
 from rubikscubennnsolver.RubiksCube444 import RubiksCube444, solved_444
 from rubikscubennnsolver.RubiksCube555 import RubiksCube555, solved_555
 from rubikscubennnsolver.LookupTable import (
+    LazyLookupTable,
     LookupTable,
     LookupTableCostOnly,
     LookupTableIDA
@@ -903,6 +904,10 @@ class RubiksCube666(RubiksCubeNNNEvenEdges):
     RubiksCubeNNNEven RubiksCube666
     """
 
+    # The UD and LR oblique edges stages, the centers phases of the fake
+    # 555 and 444 and the LFRB inner x-centers, see RubiksCube.deadline_phases
+    deadline_phases = 6
+
     def sanity_check(self):
         edge_orbit_0 = (2, 5, 12, 30, 35, 32, 25, 7,
                         38, 41, 48, 66, 71, 68, 61, 43,
@@ -961,24 +966,20 @@ class RubiksCube666(RubiksCubeNNNEvenEdges):
         self._sanity_check('outside x-center', outside_x_centers, 4)
         self._sanity_check('inside x-center', inside_x_centers, 4)
 
-    def lt_init(self):
-        if self.lt_init_called:
-            return
-        self.lt_init_called = True
-
-        self.lt_UD_oblique_edge_stage_left_only = LookupTable666UDObliqueEdgesStageLeftOnly(self)
-        self.lt_UD_oblique_edge_stage_right_only = LookupTable666UDObliqueEdgesStageRightOnly(self)
-        self.lt_UD_oblique_edge_stage = LookupTable666UDObliqueEdgesStage(self)
+    # The tables are only opened the first time they are used, see LazyLookupTable
+    lt_UD_oblique_edge_stage_left_only = LazyLookupTable(LookupTable666UDObliqueEdgesStageLeftOnly)
+    lt_UD_oblique_edge_stage_right_only = LazyLookupTable(LookupTable666UDObliqueEdgesStageRightOnly)
+    lt_UD_oblique_edge_stage = LazyLookupTable(LookupTable666UDObliqueEdgesStage)
 
-        self.lt_LR_oblique_edge_stage_left_only = LookupTable666LRObliqueEdgesStageLeftOnly(self)
-        self.lt_LR_oblique_edge_stage_right_only = LookupTable666LRObliqueEdgesStageRightOnly(self)
-        self.lt_LR_oblique_edge_stage = LookupTable666LRObliqueEdgesStage(self)
+    lt_LR_oblique_edge_stage_left_only = LazyLookupTable(LookupTable666LRObliqueEdgesStageLeftOnly)
+    lt_LR_oblique_edge_stage_right_only = LazyLookupTable(LookupTable666LRObliqueEdgesStageRightOnly)
+    lt_LR_oblique_edge_stage = LazyLookupTable(LookupTable666LRObliqueEdgesStage)
 
-        self.lt_UD_solve_inner_x_centers_and_oblique_edges = LookupTable666UDInnerXCenterAndObliqueEdges(self)
+    lt_UD_solve_inner_x_centers_and_oblique_edges = LazyLookupTable(LookupTable666UDInnerXCenterAndObliqueEdges)
 
-        self.lt_LR_solve_inner_x_centers_and_oblique_edges = LookupTable666LRInnerXCenterAndObliqueEdges(self)
-        self.lt_FB_solve_inner_x_centers_and_oblique_edges = LookupTable666FBInnerXCenterAndObliqueEdges(self)
-        self.lt_LFRB_solve_inner_x_centers_and_oblique_edges = LookupTableIDA666LFRBInnerXCenterAndObliqueEdges(self)
+    lt_LR_solve_inner_x_centers_and_oblique_edges = LazyLookupTable(LookupTable666LRInnerXCenterAndObliqueEdges)
+    lt_FB_solve_inner_x_centers_and_oblique_edges = LazyLookupTable(LookupTable666FBInnerXCenterAndObliqueEdges)
+    lt_LFRB_solve_inner_x_centers_and_oblique_edges = LazyLookupTable(LookupTableIDA666LFRBInnerXCenterAndObliqueEdges)
 
     def populate_fake_444_for_ULFRBD_stage(self, fake_444):
         fake_444.nuke_corners()
@@ -1345,6 +1346,7 @@ class RubiksCube666(RubiksCubeNNNEvenEdges):
         with 12870^2 prune tables so the IDA search would be doable but on the slow side.
         """
         fake_555 = RubiksCube555(solved_555, 'URFDLB')
+        self.share_with_fake_cube(fake_555)
         fake_555.lt_init()
         self.populate_fake_555_for_UD_stage(fake_555)
         fake_555.print_cube()
@@ -1378,6 +1380,7 @@ class RubiksCube666(RubiksCubeNNNEvenEdges):
 
     def solve_reduced_555_centers(self):
         fake_555 = RubiksCube555(solved_555, 'URFDLB')
+        self.share_with_fake_cube(fake_555)
         fake_555.lt_init()
         self.populate_fake_555_for_ULFRBD_solve(fake_555)
         fake_555.group_centers_guts()
@@ -1387,6 +1390,7 @@ class RubiksCube666(RubiksCubeNNNEvenEdges):
 
     def solve_reduced_555_t_centers(self):
         fake_555 = RubiksCube555(solved_555, 'URFDLB')
+        self.share_with_fake_cube(fake_555)
         fake_555.lt_init()
         self.populate_fake_555_for_ULFRBD_solve(fake_555)
         fake_555.lt_ULFRBD_t_centers_solve.solve()
@@ -1400,6 +1404,7 @@ class RubiksCube666(RubiksCubeNNNEvenEdges):
         """
 
         fake_444 = RubiksCube444(solved_444, 'URFDLB')
+        self.share_with_fake_cube(fake_444)
         fake_444.lt_init()
         self.populate_fake_444_for_ULFRBD_stage(fake_444)
         fake_444.lt_ULFRBD_centers_stage.avoid_oll = False
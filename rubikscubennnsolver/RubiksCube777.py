@@ -2,7 +2,7 @@
 from rubikscubennnsolver.RubiksCubeNNNOddEdges import RubiksCubeNNNOddEdges
 from rubikscubennnsolver.RubiksCube555 import RubiksCube555, solved_555
 from rubikscubennnsolver.RubiksCube666 import RubiksCube666, solved_666, moves_666
-from rubikscubennnsolver.LookupTable import LookupTable, LookupTableIDA
+from rubikscubennnsolver.LookupTable import LazyLookupTable, LookupTable, LookupTableIDA
 import logging
 import sys
 
@@ -1746,6 +1746,18 @@ class LookupTableIDA777LFRBSolveInnerCenters(LookupTable):
     Average: 11.805268 moves
     """
 
+    # UD are solved so any rotation/reflection that keeps UD on the U/D axis
+    # gives us a cube with the same number of moves to go, this table could
+    # be reduced with "utils/reduce-symmetry.py --symmetry UD-axis". The table
+    # we ship is not so we do not set symmetry.
+    state_positions = (
+        66, 67, 68, 73, 74, 75, 80, 81, 82,         # Left
+        115, 116, 117, 122, 123, 124, 129, 130, 131, # Front
+        164, 165, 166, 171, 172, 173, 178, 179, 180, # Right
+        213, 214, 215, 220, 221, 222, 227, 228, 229, # Back
+    )
+    state_pattern = {'U': 'U', 'L': 'L', 'F': 'F', 'R': 'R', 'B': 'B', 'D': 'D'}
+
     def __init__(self, parent):
         LookupTable.__init__(
             self,
@@ -1753,7 +1765,11 @@ class LookupTableIDA777LFRBSolveInnerCenters(LookupTable):
             'lookup-table-7x7x7-step81-LFRB-solve-inner-centers.txt',
             'LLLLLLLLLFFFFFFFFFRRRRRRRRRBBBBBBBBB',
             linecount=24010005,
-            max_depth=17)
+            max_depth=17,
+
+            # 24 million rows, a 16M sparse index narrows a lookup to ~50 rows.
+            # The .idx is built by utils/build-sparse-index.py or lt_warm_all()
+            sparse_index_budget=16 * 1024 * 1024)
 
     def state(self):
         parent_state = self.parent.state
@@ -1871,6 +1887,10 @@ class RubiksCube777(RubiksCubeNNNOddEdges):
 
     """
 
+    # The oblique edge and inner centers phases plus the centers phases of
+    # the fake 555 and 666, see RubiksCube.deadline_phases
+    deadline_phases = 10
+
     def phase(self):
         if self._phase is None:
             self._phase = 'Stage UD centers'
@@ -1980,40 +2000,37 @@ class RubiksCube777(RubiksCubeNNNOddEdges):
         self._sanity_check('inside t-centers', inside_t_centers, 4)
         self._sanity_check('centers', centers, 1)
 
-    def lt_init(self):
-        if self.lt_init_called:
-            return
-        self.lt_init_called = True
-
-        self.lt_UD_oblique_edge_pairing_middle_only = LookupTable777UDObliqueEdgePairingMiddleOnly(self)
-        self.lt_UD_oblique_edge_pairing_left_only = LookupTable777UDObliqueEdgePairingLeftOnly(self)
-        self.lt_UD_oblique_edge_pairing_right_only = LookupTable777UDObliqueEdgePairingRightOnly(self)
-        self.lt_UD_oblique_edge_pairing = LookupTableIDA777UDObliqueEdgePairing(self)
+    # The tables are only opened the first time they are used, see LazyLookupTable
+    lt_UD_oblique_edge_pairing_middle_only = LazyLookupTable(LookupTable777UDObliqueEdgePairingMiddleOnly)
+    lt_UD_oblique_edge_pairing_left_only = LazyLookupTable(LookupTable777UDObliqueEdgePairingLeftOnly)
+    lt_UD_oblique_edge_pairing_right_only = LazyLookupTable(LookupTable777UDObliqueEdgePairingRightOnly)
+    lt_UD_oblique_edge_pairing = LazyLookupTable(LookupTableIDA777UDObliqueEdgePairing)
 
-        self.lt_LR_oblique_edge_pairing_middle_only = LookupTable777LRObliqueEdgePairingMiddleOnly(self)
-        self.lt_LR_oblique_edge_pairing_left_only = LookupTable777LRObliqueEdgePairingLeftOnly(self)
-        self.lt_LR_oblique_edge_pairing_right_only = LookupTable777LRObliqueEdgePairingRightOnly(self)
-        self.lt_LR_oblique_edge_pairing = LookupTableIDA777LRObliqueEdgePairing(self)
+    lt_LR_oblique_edge_pairing_middle_only = LazyLookupTable(LookupTable777LRObliqueEdgePairingMiddleOnly)
+    lt_LR_oblique_edge_pairing_left_only = LazyLookupTable(LookupTable777LRObliqueEdgePairingLeftOnly)
+    lt_LR_oblique_edge_pairing_right_only = LazyLookupTable(LookupTable777LRObliqueEdgePairingRightOnly)
+    lt_LR_oblique_edge_pairing = LazyLookupTable(LookupTableIDA777LRObliqueEdgePairing)
 
-        self.lt_UD_solve_inner_centers_and_oblique_edges_center_only = LookupTable777UDSolveInnerCentersAndObliqueEdgesCenterOnly(self)
-        self.lt_UD_solve_inner_centers_and_oblique_edges_edges_only = LookupTable777UDSolveInnerCentersAndObliqueEdgesEdgesOnly(self)
-        self.lt_UD_solve_inner_centers_and_oblique_edges = LookupTableIDA777UDSolveInnerCentersAndObliqueEdges(self)
+    lt_UD_solve_inner_centers_and_oblique_edges_center_only = LazyLookupTable(LookupTable777UDSolveInnerCentersAndObliqueEdgesCenterOnly)
+    lt_UD_solve_inner_centers_and_oblique_edges_edges_only = LazyLookupTable(LookupTable777UDSolveInnerCentersAndObliqueEdgesEdgesOnly)
+    lt_UD_solve_inner_centers_and_oblique_edges = LazyLookupTable(LookupTableIDA777UDSolveInnerCentersAndObliqueEdges)
 
-        self.lt_LR_solve_inner_x_center_t_center_middle_oblique_edge = LookupTable777LRSolveInnerXCenterTCenterMiddleObliqueEdge(self)
-        self.lt_LR_solve_oblique_edge = LookupTable777LRSolveObliqueEdge(self)
-        self.lt_LR_solve_inner_centers_and_oblique_edges = LookupTableIDA777LRSolveInnerCentersAndObliqueEdges(self)
+    lt_LR_solve_inner_x_center_t_center_middle_oblique_edge = LazyLookupTable(LookupTable777LRSolveInnerXCenterTCenterMiddleObliqueEdge)
+    lt_LR_solve_oblique_edge = LazyLookupTable(LookupTable777LRSolveObliqueEdge)
+    lt_LR_solve_inner_centers_and_oblique_edges = LazyLookupTable(LookupTableIDA777LRSolveInnerCentersAndObliqueEdges)
 
-        self.lt_FB_solve_inner_x_center_t_center_middle_oblique_edge = LookupTable777FBSolveInnerXCenterTCenterMiddleObliqueEdge(self)
-        self.lt_FB_solve_oblique_edge = LookupTable777FBSolveObliqueEdge(self)
-        self.lt_FB_solve_inner_centers_and_oblique_edges = LookupTableIDA777FBSolveInnerCentersAndObliqueEdges(self)
+    lt_FB_solve_inner_x_center_t_center_middle_oblique_edge = LazyLookupTable(LookupTable777FBSolveInnerXCenterTCenterMiddleObliqueEdge)
+    lt_FB_solve_oblique_edge = LazyLookupTable(LookupTable777FBSolveObliqueEdge)
+    lt_FB_solve_inner_centers_and_oblique_edges = LazyLookupTable(LookupTableIDA777FBSolveInnerCentersAndObliqueEdges)
 
-        self.lt_LFRB_solve_inner_centers = LookupTableIDA777LFRBSolveInnerCenters(self)
-        self.lt_LFRB_solve_inner_centers_and_oblique_edges = LookupTableIDA777LFRBSolveInnerCentersAndObliqueEdges(self)
+    lt_LFRB_solve_inner_centers = LazyLookupTable(LookupTableIDA777LFRBSolveInnerCenters)
+    lt_LFRB_solve_inner_centers_and_oblique_edges = LazyLookupTable(LookupTableIDA777LFRBSolveInnerCentersAndObliqueEdges)
 
     def create_fake_555_for_LR_t_centers(self):
 
         # Create a fake 5x5x5 to stage the UD inner 5x5x5 centers
         fake_555 = RubiksCube555(solved_555, 'URFDLB')
+        self.share_with_fake_cube(fake_555)
         fake_555.lt_init()
 
         for x in range(1, 151):
@@ -2037,6 +2054,7 @@ class RubiksCube777(RubiksCubeNNNOddEdges):
 
         # Create a fake 5x5x5 to stage the UD inner 5x5x5 centers
         fake_555 = RubiksCube555(solved_555, 'URFDLB')
+        self.share_with_fake_cube(fake_555)
         fake_555.lt_init()
 
         for x in range(1, 151):
@@ -2115,6 +2133,7 @@ class RubiksCube777(RubiksCubeNNNOddEdges):
 
         # Create a fake 5x5x5 to solve 7x7x7 centers (they have been reduced to a 5x5x5)
         fake_555 = RubiksCube555(solved_555, 'URFDLB')
+        self.share_with_fake_cube(fake_555)
         fake_555.lt_init()
 
         for x in range(1, 151):
@@ -2257,6 +2276,7 @@ class RubiksCube777(RubiksCubeNNNOddEdges):
 
         # Create a fake 6x6x6 to stage the outside UD oblique edges
         fake_666 = RubiksCube666(solved_666, 'URFDLB')
+        self.share_with_fake_cube(fake_666)
         fake_666.lt_init()
 
         for x in range(1, 217):
@@ -45,6 +45,10 @@ class RubiksCubeNNNEven(RubiksCubeNNNEvenEdges):
     RubiksCubeNNNEven RubiksCube666
     """
 
+    # The centers are solved one orbit at a time via fake 666 and 777 cubes,
+    # this is a guess for the bigger cubes, see RubiksCube.deadline_phases
+    deadline_phases = 12
+
     def phase(self):
         return 'Solve Even NxNxN'
 
@@ -64,6 +68,7 @@ class RubiksCubeNNNEven(RubiksCubeNNNEvenEdges):
             # Group UD centers
             # - create a fake 6x6x6 to solve the inside 4x4 block
             fake_666 = RubiksCube666(solved_666, 'URFDLB')
+            self.share_with_fake_cube(fake_666)
 
             for index in range(1, 217):
                 fake_666.state[index] = 'x'
@@ -125,6 +130,7 @@ class RubiksCubeNNNEven(RubiksCubeNNNEvenEdges):
 
     def solve_inside_777(self, center_orbit_id, max_center_orbits, width, cycle, max_cycle):
         fake_777 = RubiksCube777(solved_777, 'URFDLB')
+        self.share_with_fake_cube(fake_777)
 
         for index in range(1, 295):
             fake_777.state[index] = 'x'
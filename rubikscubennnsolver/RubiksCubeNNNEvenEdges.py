@@ -13,6 +13,7 @@ class RubiksCubeNNNEvenEdges(RubiksCube):
 
     def pair_inside_edges_via_444(self):
         fake_444 = RubiksCube444(solved_444, 'URFDLB')
+        self.share_with_fake_cube(fake_444)
         fake_444.lt_init()
 
         # Fill in the corners so that we can avoid PLL parity when pairing the edges
@@ -73,6 +74,7 @@ class RubiksCubeNNNEvenEdges(RubiksCube):
     def pair_edge_orbit_via_555(self, orbit):
         log.info("%s: pair_edge_orbit_via_555 for %d" % (self, orbit))
         fake_555 = RubiksCube555(solved_555, 'URFDLB')
+        self.share_with_fake_cube(fake_555)
         fake_555.lt_init()
 
         # Fill in the corners so we can avoid certain types of parity
@@ -31,11 +31,16 @@ class RubiksCubeNNNOdd(RubiksCubeNNNOddEdges):
     RubiksCubeNNNOdd RubiksCube777
     """
 
+    # The centers are solved one orbit at a time via fake 777 cubes, this is
+    # a guess for the bigger cubes, see RubiksCube.deadline_phases
+    deadline_phases = 12
+
     def phase(self):
         return 'Solve Odd NxNxN'
 
     def solve_inside_777(self, center_orbit_id, max_center_orbits, width, cycle, max_cycle):
         fake_777 = RubiksCube777(solved_777, 'URFDLB')
+        self.share_with_fake_cube(fake_777)
 
         for index in range(1, 295):
             fake_777.state[index] = 'x'
@@ -14,6 +14,7 @@ class RubiksCubeNNNOddEdges(RubiksCube):
     def pair_edge_orbit_via_555(self, orbit):
         log.info("%s: pair_edge_orbit_via_555 for %d" % (self, orbit))
         fake_555 = RubiksCube555(solved_555, 'URFDLB')
+        self.share_with_fake_cube(fake_555)
         fake_555.lt_init()
 
         # Fill in the corners so we can avoid certain types of parity
@@ -16,7 +16,8 @@ from rubikscubennnsolver.RubiksCube444Misc import (
     low_edges_444,
     tsai_phase2_orient_edges_444
 )
-from rubikscubennnsolver.LookupTable import LookupTable, LookupTableIDA
+from rubikscubennnsolver.Beam import BeamPhase, beam_search, score_with_heuristic
+from rubikscubennnsolver.LookupTable import LazyLookupTable, LookupTable, LookupTableIDA
 import logging
 import sys
 
@@ -537,46 +538,50 @@ class LookupTableIDA444TsaiPhase3(LookupTableIDA):
 
 class RubiksCubeTsai444(RubiksCube444):
 
+    # Set tsai_beam_widths to keep that many phase1, phase2 and phase3
+    # candidates instead of taking the first solution from each phase, see
+    # Beam.py. TPR uses (500, 100, 1) with 10k phase1 solutions to pick from.
+    # tsai_beam_node_budget is the most nodes the phase2 and phase3 IDA
+    # searches explore before settling for the candidates they have.
+    tsai_beam_widths = None
+    tsai_beam_phase1_extra_moves = 2
+    tsai_beam_node_budget = 10000000
+
     def __init__(self, state, order, colormap=None, avoid_pll=True, debug=False):
         RubiksCube444.__init__(self, state, order, colormap, debug)
         self.edge_mapping = {}
 
-    def lt_init(self):
-        if self.lt_init_called:
-            return
-        self.lt_init_called = True
-
-        # ==============
-        # Phase 1 tables
-        # ==============
-        # Stage LR centers
-        self.lt_tsai_phase1 = LookupTable444TsaiPhase1(self)
-
-        # =============
-        # Phase2 tables
-        # =============
-        # - orient the edges into high/low groups
-        # - solve LR centers to one of 12 states
-        # - stage UD and FB centers
-        self.lt_tsai_phase2_centers = LookupTable444TsaiPhase2Centers(self)
-        self.lt_tsai_phase2_centers.preload_cache()
-        self.lt_tsai_phase2 = LookupTableIDA444TsaiPhase2(self)
-
-
-        # =============
-        # Phase3 tables
-        # =============
-        self.lt_tsai_phase3_edges_solve = LookupTable444TsaiPhase3Edges(self)
-        #self.lt_tsai_phase3_edges_solve.preload_cache()
-        self.lt_tsai_phase3_centers_solve = LookupTable444TsaiPhase3CentersSolve(self)
-        #self.lt_tsai_phase3_centers_solve.preload_cache()
-        self.lt_tsai_phase3 = LookupTableIDA444TsaiPhase3(self)
-        #self.lt_tsai_phase3.preload_cache()
-        #self.lt_tsai_phase3.ida_all_the_way = True
-
-        # For tsai this tables is only used if the centers have already been solved
-        # For non-tsai it is always used
-        self.lt_edges = LookupTable444Edges(self)
+    # The tables are only opened the first time they are used, see LazyLookupTable
+
+    # ==============
+    # Phase 1 tables
+    # ==============
+    # Stage LR centers
+    lt_tsai_phase1 = LazyLookupTable(LookupTable444TsaiPhase1)
+
+    # =============
+    # Phase2 tables
+    # =============
+    # - orient the edges into high/low groups
+    # - solve LR centers to one of 12 states
+    # - stage UD and FB centers
+    lt_tsai_phase2_centers = LazyLookupTable(LookupTable444TsaiPhase2Centers, preload=True)
+    lt_tsai_phase2 = LazyLookupTable(LookupTableIDA444TsaiPhase2)
+
+
+    # =============
+    # Phase3 tables
+    # =============
+    lt_tsai_phase3_edges_solve = LazyLookupTable(LookupTable444TsaiPhase3Edges)
+    #lt_tsai_phase3_edges_solve = LazyLookupTable(LookupTable444TsaiPhase3Edges, preload=True)
+    lt_tsai_phase3_centers_solve = LazyLookupTable(LookupTable444TsaiPhase3CentersSolve)
+    #lt_tsai_phase3_centers_solve = LazyLookupTable(LookupTable444TsaiPhase3CentersSolve, preload=True)
+    lt_tsai_phase3 = LazyLookupTable(LookupTableIDA444TsaiPhase3)
+    #lt_tsai_phase3 = LazyLookupTable(LookupTableIDA444TsaiPhase3, preload=True, ida_all_the_way=True)
+
+    # For tsai this tables is only used if the centers have already been solved
+    # For non-tsai it is always used
+    lt_edges = LazyLookupTable(LookupTable444Edges)
 
     def tsai_phase2_orient_edges_state(self, edges_to_flip, return_hex):
         state = self.state
@@ -660,9 +665,31 @@ class RubiksCubeTsai444(RubiksCube444):
         self.state = original_state[:]
         self.solution = original_solution[:]
 
+    def group_centers_guts_beam(self):
+        (phase1_width, phase2_width, phase3_width) = self.tsai_beam_widths
+        self.lt_tsai_phase2.avoid_oll = True
+        self.lt_tsai_phase2.avoid_pll = True
+        self.lt_tsai_phase3.avoid_oll = True
+        self.lt_tsai_phase3.avoid_pll = True
+
+        log.info("%s: Start of beam search, %d steps in" % (self, self.get_solution_len_minus_rotates(self.solution)))
+        beam_search(self, (
+            BeamPhase(self.lt_tsai_phase1, phase1_width, score_with_heuristic(self.lt_tsai_phase2),
+                      moves=moves_444, max_extra_moves=self.tsai_beam_phase1_extra_moves),
+            BeamPhase(self.lt_tsai_phase2, phase2_width, score_with_heuristic(self.lt_tsai_phase3)),
+            BeamPhase(self.lt_tsai_phase3, phase3_width)),
+            node_budget=self.tsai_beam_node_budget)
+        self.print_cube()
+        log.info("%s: End of beam search, %d steps in" % (self, self.get_solution_len_minus_rotates(self.solution)))
+        log.info("")
+
     def group_centers_guts(self):
         self.lt_init()
 
+        if self.tsai_beam_widths:
+            self.group_centers_guts_beam()
+            return
+
         # save cube state
         original_state = self.state[:]
         original_solution = self.solution[:]
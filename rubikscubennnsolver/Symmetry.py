@@ -0,0 +1,239 @@
+#!/usr/bin/env python3
+
+"""
+Symmetry reduced lookup tables.
+
+Many of our tables store a state along with every one of its symmetric
+copies. If you rotate a cube with a y the staged ULFRBD centers are still
+staged, so the state you get from a y of a cube is the same number of moves
+from being staged as the cube you started with. The table only needs to
+store one of them.
+
+A table declares a Symmetry, a list of whole cube rotations/reflections that
+map its state_target onto itself. For each symmetry we
+- move every square of the cube via the rotations/reflections
+- recolor the squares so the faces keep their names, after a y the squares
+  that were on R are on F so the R squares are recolored to F
+
+The canonical state is the lowest state() of all of the symmetric copies of
+the cube, the table only needs the rows for the canonical states (see
+utils/reduce-symmetry.py). The steps in the table solve the symmetric copy,
+conjugate_steps() maps them back to steps for the cube we started with.
+
+The recoloring must not mix the colors that state() lumps together. UD
+centers staging treats L, F, R and B the same but an x would recolor F to U
+and L to L, so two cubes with the same state could end up with different
+canonical states. Tables like that use symmetry_UD_axis instead of
+symmetry_all. LookupTable.pattern_symmetry_state() raises a ValueError if a
+table's state_pattern and symmetry do not fit together.
+"""
+
+import logging
+import re
+
+log = logging.getLogger(__name__)
+
+
+def reflect_x(cube, size):
+    """
+    Mirror the cube top to bottom, U and D trade places and every side is
+    flipped upside down. This is reflect_x_444() for any size of cube.
+
+    >>> from rubikscubennnsolver.RubiksCube444 import reflect_x_444
+    >>> reflect_x(list(range(97)), 4) == reflect_x_444(list(range(97)))
+    True
+    """
+    squares_per_side = size * size
+    result = [cube[0]]
+
+    # D, L, F, R, B, U
+    for side_index in (5, 1, 2, 3, 4, 0):
+        first = (side_index * squares_per_side) + 1
+
+        for row in reversed(range(size)):
+            start = first + (row * size)
+            result.extend(cube[start:start + size])
+
+    return result
+
+
+def conjugate_candidates(step):
+    """
+    A rotation/reflection maps a turn to a turn of the same number of rows
+    on one of the faces
+
+    >>> conjugate_candidates("3Uw'")[:4]
+    ['3Uw', "3Uw'", '3Uw2', '3Lw']
+    """
+    match = re.match(r"^(\d*)([ULFRBD])(w?)(['2]?)$", step)
+
+    if not match:
+        raise ValueError("%s is not a face turn" % step)
+
+    (prefix, face, wide, suffix) = match.groups()
+    return ["%s%s%s%s" % (prefix, candidate_face, wide, candidate_suffix)
+            for candidate_face in 'ULFRBD'
+            for candidate_suffix in ('', "'", '2')]
+
+
+class Symmetry(object):
+    """
+    sequences are the rotations for each symmetry, 'reflect-x' is a
+    reflect_x(). The first sequence must be the identity.
+
+    >>> from rubikscubennnsolver.RubiksCube444 import rotate_444
+    >>> symmetry = Symmetry(("", "y"))
+    >>> len(symmetry.transforms(4, rotate_444))
+    2
+    >>> symmetry.conjugate_steps(1, ["F", "Uw2"], 4, rotate_444)
+    ['R', 'Uw2']
+    >>> reflected = Symmetry(("", "reflect-x"))
+    >>> reflected.conjugate_steps(1, ["U", "F'"], 4, rotate_444)
+    ["D'", 'F']
+    >>> len(set([tuple(permutation) for (permutation, recolor) in symmetry_all.transforms(4, rotate_444)]))
+    48
+    """
+
+    def __init__(self, sequences):
+        assert sequences[0] == "", "the first symmetry must be the identity"
+        self.sequences = tuple(sequences)
+
+        # size -> [(permutation, recolor), ...]
+        self.size_transforms = {}
+
+        # (size, index, step) -> step
+        self.conjugates = {}
+
+    def __len__(self):
+        return len(self.sequences)
+
+    def transforms(self, size, rotate_xxx):
+        """
+        Return a (permutation, recolor) for each symmetry, the symmetric copy
+        of cube is [recolor[cube[x]] for x in permutation]
+        """
+        transforms = self.size_transforms.get(size)
+
+        if transforms is None:
+            squares_per_side = size * size
+            identity = list(range((squares_per_side * 6) + 1))
+            transforms = []
+
+            for sequence in self.sequences:
+                permutation = identity
+
+                for step in sequence.split():
+                    if step == 'reflect-x':
+                        permutation = reflect_x(permutation, size)
+                    else:
+                        permutation = rotate_xxx(permutation, step)
+
+                # The first square of each side tells us which side's squares
+                # landed on it, recolor those squares to this side's name
+                recolor = {}
+
+                for (side_index, side_name) in enumerate('ULFRBD'):
+                    from_side_index = int((permutation[(side_index * squares_per_side) + 1] - 1) / squares_per_side)
+                    recolor['ULFRBD'[from_side_index]] = side_name
+
+                transforms.append((tuple(permutation), recolor))
+
+            self.size_transforms[size] = transforms
+
+        return transforms
+
+    def conjugate_steps(self, index, steps, size, rotate_xxx):
+        """
+        steps solve the symmetric copy of a cube made by symmetry index,
+        return the steps that do the same to the cube itself
+        """
+        result = []
+
+        for step in steps:
+            key = (size, index, step)
+            conjugate = self.conjugates.get(key)
+
+            if conjugate is None:
+                (permutation, recolor) = self.transforms(size, rotate_xxx)[index]
+                identity = list(range(len(permutation)))
+                step_permutation = rotate_xxx(identity, step)
+
+                # We need the step that moves the squares of the cube the way
+                # that step moves the squares of the symmetric copy
+                target = [permutation[x] for x in step_permutation]
+
+                for candidate in conjugate_candidates(step):
+                    candidate_permutation = rotate_xxx(identity, candidate)
+
+                    if [candidate_permutation[x] for x in permutation] == target:
+                        conjugate = candidate
+                        break
+                else:
+                    raise ValueError("could not find the conjugate of %s for symmetry %s" % (step, self.sequences[index]))
+
+                self.conjugates[key] = conjugate
+
+            result.append(conjugate)
+
+        return result
+
+    def moves_not_closed(self, moves, size, rotate_xxx):
+        """
+        Return a (step, sequence, conjugate) for each step in moves whose
+        conjugate for one of our symmetries is not in moves. The steps for a
+        canonical state are conjugated back to the cube so a table can only
+        declare a symmetry if this is empty for its legal moves.
+
+        >>> from rubikscubennnsolver.RubiksCube444 import rotate_444
+        >>> Symmetry(("", "y")).moves_not_closed(["U", "F", "R"], 4, rotate_444)
+        [('R', 'y', 'B')]
+        >>> Symmetry(("", "y")).moves_not_closed(["U", "F", "R", "B", "L"], 4, rotate_444)
+        []
+        """
+        legal = set(moves)
+        result = []
+
+        for index in range(1, len(self.sequences)):
+            for step in moves:
+                conjugate = self.conjugate_steps(index, [step], size, rotate_xxx)[0]
+
+                if conjugate not in legal:
+                    result.append((step, self.sequences[index], conjugate))
+
+        return result
+
+
+def all_rotations():
+    """
+    The 24 whole cube rotations, one for each face that could be on top times
+    each of the four turns around the U/D axis
+    """
+    result = []
+
+    for up in ("", "x", "x x", "x'", "z", "z'"):
+        for turn in ("", "y", "y y", "y'"):
+            result.append(' '.join([step for step in (up, turn) if step]))
+
+    return result
+
+
+# Every rotation and reflection, for tables where the six faces play the same role
+symmetry_all = Symmetry(all_rotations() + ["reflect-x %s" % rotation if rotation else "reflect-x" for rotation in all_rotations()])
+
+# The rotations and reflections that keep U and D on the U/D axis, for tables
+# where U and D have already been dealt with
+symmetry_UD_axis = Symmetry(
+    ("", "y", "y y", "y'",
+     "x x", "x x y", "x x y y", "x x y'",
+     "reflect-x", "reflect-x y", "reflect-x y y", "reflect-x y'",
+     "reflect-x x x", "reflect-x x x y", "reflect-x x x y y", "reflect-x x x y'"))
+
+
+if __name__ == '__main__':
+    import doctest
+
+    logging.basicConfig(level=logging.INFO,
+                        format='%(asctime)s %(filename)16s %(levelname)8s: %(message)s')
+    log = logging.getLogger(__name__)
+
+    doctest.testmod()
@@ -0,0 +1,183 @@
+#!/usr/bin/env python3
+
+"""
+Telemetry for LookupTableIDA.solve()
+
+Each LookupTableIDA.solve() fills in an IDATelemetry and appends it to the
+cube's telemetry list, cube.telemetry_dicts() and cube.telemetry_json() turn
+those into something you can feed to a dashboard or a regression check.
+
+We record
+- the nodes and seconds for each IDA threshold
+- the heuristic calls, seek calls and cache hits/misses of each prune table,
+  including the ones made by the parallel IDA workers
+- how many times we probed our own table and how many of those were hits
+- the transposition table hits and stores
+- the hits/misses of the ida_heuristic() cache and the order the prune
+  tables ended up in, see LookupTableIDA.prune_table_reorder()
+- the length of the solution the phase added to the cube
+
+Timing the heuristic, rotate_xxx() and lookup calls costs a couple of
+time.perf_counter() calls per node so it is only done when the table's
+telemetry_timing is True. The IDA searches add those times to seconds
+themselves, see LookupTableIDA.ida_timing_seconds().
+"""
+
+import json
+import logging
+import time
+
+log = logging.getLogger(__name__)
+
+# The calls we time if telemetry_timing is True
+TIMED_CALLS = ('heuristic', 'rotate', 'lookup')
+
+
+class IDATelemetry(object):
+    """
+    >>> telemetry = IDATelemetry('foo', 'iterative', [])
+    >>> telemetry.add_threshold(5, 100, 0.5)
+    >>> telemetry.table_probe(True)
+    >>> telemetry.finish(3)
+    >>> telemetry.as_dict()['nodes'], telemetry.as_dict()['table_probes']
+    (100, {'hits': 1, 'misses': 0})
+    """
+
+    def __init__(self, phase, engine, prune_tables, timing=False):
+        self.phase = phase
+        self.engine = engine
+        self.prune_tables = prune_tables
+        self.thresholds = []
+        self.bidirectional = None
+        self.table_hits = 0
+        self.table_misses = 0
+        self.transposition_hits = 0
+        self.transposition_stores = 0
+        self.solution_depth = None
+        self.degraded = []
+        self.seconds = {}
+
+        if timing:
+            for name in TIMED_CALLS:
+                self.seconds[name] = 0.0
+        self.heuristic_cache = None
+        self.prune_table_order = None
+        self.start = time.time()
+
+        # The counters of the parallel IDA workers, see add_counters()
+        self.worker_prune_tables = [dict() for pt in prune_tables]
+
+        # The prune table counters only ever go up, remember where they were
+        # so we only report what happened during this search
+        self.prune_table_start = [self.prune_table_counters(pt) for pt in prune_tables]
+
+    def prune_table_counters(self, pt):
+        return {
+            'heuristic_calls': pt.heuristic_calls,
+            'seek_calls': pt.fh_txt_seek_calls_total + pt.fh_txt_seek_calls,
+            'cache_hits': pt.lru_cache_hits,
+            'cache_misses': pt.lru_cache_misses,
+        }
+
+    def add_threshold(self, threshold, nodes, seconds):
+        self.thresholds.append({
+            'threshold': threshold,
+            'nodes': nodes,
+            'seconds': seconds,
+        })
+
+    def table_probe(self, hit):
+        if hit:
+            self.table_hits += 1
+        else:
+            self.table_misses += 1
+
+    def add_transposition_table(self, transposition_table):
+        self.transposition_hits += transposition_table.hits
+        self.transposition_stores += transposition_table.stores
+
+    def counters(self):
+        """
+        The counters a parallel IDA worker sends back to the parent process,
+        call this after finish()
+        """
+        return {
+            'table_hits': self.table_hits,
+            'table_misses': self.table_misses,
+            'seconds': dict([(name, self.seconds[name]) for name in TIMED_CALLS if name in self.seconds]),
+            'prune_tables': [dict([(key, end[key] - start[key]) for key in start.keys()])
+                             for (start, end) in zip(self.prune_table_start, self.prune_table_end)],
+        }
+
+    def add_counters(self, counters):
+        """
+        Add the counters() from a parallel IDA worker to ours
+
+        >>> telemetry = IDATelemetry('foo', 'iterative', [])
+        >>> telemetry.add_counters({'table_hits': 2, 'table_misses': 3, 'seconds': {'rotate': 0.5}, 'prune_tables': []})
+        >>> telemetry.table_hits, telemetry.table_misses, telemetry.seconds
+        (2, 3, {'rotate': 0.5})
+        """
+        self.table_hits += counters['table_hits']
+        self.table_misses += counters['table_misses']
+
+        for (name, seconds) in counters['seconds'].items():
+            self.seconds[name] = self.seconds.get(name, 0.0) + seconds
+
+        for (worker_counters, pt_counters) in zip(self.worker_prune_tables, counters['prune_tables']):
+            for (key, value) in pt_counters.items():
+                worker_counters[key] = worker_counters.get(key, 0) + value
+
+    def finish(self, solution_depth):
+        self.solution_depth = solution_depth
+        self.seconds['total'] = time.time() - self.start
+        self.prune_table_end = [self.prune_table_counters(pt) for pt in self.prune_tables]
+
+    def as_dict(self):
+        prune_tables = {}
+
+        for (pt, start, end, worker_counters) in zip(self.prune_tables, self.prune_table_start, self.prune_table_end, self.worker_prune_tables):
+            prune_tables[str(pt)] = dict([(key, end[key] - start[key] + worker_counters.get(key, 0)) for key in sorted(start.keys())])
+
+        nodes = sum([threshold['nodes'] for threshold in self.thresholds])
+
+        if self.bidirectional is not None:
+            nodes += self.bidirectional['nodes']
+
+        total_seconds = self.seconds.get('total', 0)
+
+        return {
+            'phase': self.phase,
+            'engine': self.engine,
+            'thresholds': self.thresholds,
+            'bidirectional': self.bidirectional,
+            'nodes': nodes,
+            'nodes_per_sec': int(nodes / total_seconds) if total_seconds else 0,
+            'prune_tables': prune_tables,
+            'table_probes': {
+                'hits': self.table_hits,
+                'misses': self.table_misses,
+            },
+            'transposition_table': {
+                'hits': self.transposition_hits,
+                'stores': self.transposition_stores,
+            },
+            'seconds': self.seconds,
+            'heuristic_cache': self.heuristic_cache,
+            'prune_table_order': self.prune_table_order,
+            'solution_depth': self.solution_depth,
+            'degraded': self.degraded,
+        }
+
+    def as_json(self):
+        return json.dumps(self.as_dict(), sort_keys=True)
+
+
+if __name__ == '__main__':
+    import doctest
+
+    logging.basicConfig(level=logging.INFO,
+                        format='%(asctime)s %(filename)16s %(levelname)8s: %(message)s')
+    log = logging.getLogger(__name__)
+
+    doctest.testmod()
@@ -0,0 +1,143 @@
+#!/usr/bin/env python3
+
+"""
+A fixed size transposition table for the LookupTableIDA searches.
+
+IDA used to remember the states it had explored in a dict keyed by the full
+lt_state. That dict had no upper bound and on the deep 6x6x6/7x7x7 searches
+it could grow to millions of entries. Here each state is reduced to a 64-bit
+fingerprint (its hash()) and the table is a few preallocated arrays so the
+memory used is known up front.
+
+For each state we keep
+- depth: the cost_to_here when we explored the state
+- bound: the threshold - cost_to_here that we explored the state with. If
+  we did not find a solution by exploring the state with a budget of 5 moves
+  we will not find one if we come back to it with a budget of 5 or fewer.
+
+The bound does not depend on the threshold so the table is kept from one
+IDA threshold to the next.
+
+Slots are grouped in buckets of two. When a bucket is full the entry with
+the lowest bound is replaced, it is the one that saved us the least work.
+"""
+
+from array import array
+import logging
+
+log = logging.getLogger(__name__)
+
+
+class TranspositionTable(object):
+    """
+    >>> tt = TranspositionTable(1024)
+    >>> tt.capacity
+    102
+    >>> tt.get('UUUULLLL') is None
+    True
+    >>> tt.store('UUUULLLL', 2, 5)
+    >>> tt.get('UUUULLLL')
+    5
+    >>> tt.store('UUUULLLL', 3, 4)
+    >>> tt.get('UUUULLLL')
+    5
+    >>> len(tt)
+    1
+    """
+
+    # bytes per slot: 8 for the fingerprint, 1 for the depth, 1 for the bound
+    slot_size = 10
+
+    def __init__(self, max_bytes):
+        capacity = int(max_bytes / self.slot_size)
+
+        # Two slots per bucket
+        if capacity % 2:
+            capacity -= 1
+
+        assert capacity >= 2, "max_bytes %d is too small for a TranspositionTable" % max_bytes
+        self.capacity = capacity
+        self.buckets = int(capacity / 2)
+        self.fingerprints = array('q', bytes(8 * capacity))
+        self.depths = bytearray(capacity)
+        self.bounds = bytearray(capacity)
+        self.count = 0
+        self.hits = 0
+        self.stores = 0
+        self.replacements = 0
+
+    def __len__(self):
+        return self.count
+
+    def fingerprint(self, key):
+        fingerprint = hash(key)
+
+        # 0 marks an empty slot
+        if not fingerprint:
+            fingerprint = 1
+
+        return fingerprint
+
+    def get(self, key):
+        """
+        Return the bound that key was explored with, None if we have not seen key
+        """
+        fingerprint = self.fingerprint(key)
+        index = ((fingerprint ^ (fingerprint >> 32)) % self.buckets) * 2
+        fingerprints = self.fingerprints
+
+        if fingerprints[index] == fingerprint:
+            self.hits += 1
+            return self.bounds[index]
+
+        if fingerprints[index + 1] == fingerprint:
+            self.hits += 1
+            return self.bounds[index + 1]
+
+        return None
+
+    def store(self, key, depth, bound):
+        fingerprint = self.fingerprint(key)
+        index = ((fingerprint ^ (fingerprint >> 32)) % self.buckets) * 2
+        fingerprints = self.fingerprints
+        bounds = self.bounds
+        self.stores += 1
+
+        for slot in (index, index + 1):
+            if fingerprints[slot] == fingerprint:
+                if bound > bounds[slot]:
+                    self.depths[slot] = depth
+                    bounds[slot] = bound
+                return
+
+        for slot in (index, index + 1):
+            if not fingerprints[slot]:
+                self.count += 1
+                break
+        else:
+            # The bucket is full, replace the entry with the lowest bound. If
+            # they are tied replace the deeper one.
+            self.replacements += 1
+
+            if (bounds[index], -self.depths[index]) <= (bounds[index + 1], -self.depths[index + 1]):
+                slot = index
+            else:
+                slot = index + 1
+
+        fingerprints[slot] = fingerprint
+        self.depths[slot] = depth
+        bounds[slot] = bound
+
+    def log_stats(self, table):
+        log.info("%s: transposition table has %d/%d entries, %d stores, %d hits, %d replacements" %
+                 (table, self.count, self.capacity, self.stores, self.hits, self.replacements))
+
+
+if __name__ == '__main__':
+    import doctest
+
+    logging.basicConfig(level=logging.INFO,
+                        format='%(asctime)s %(filename)16s %(levelname)8s: %(message)s')
+    log = logging.getLogger(__name__)
+
+    doctest.testmod()
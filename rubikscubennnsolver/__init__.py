@@ -2,6 +2,7 @@
 from copy import copy
 from collections import OrderedDict
 from pprint import pformat
+from rubikscubennnsolver.LookupTable import NoIDASolution
 from rubikscubennnsolver.RubiksSide import Side, SolveError, StuckInALoop, ImplementThis
 import itertools
 import json
@@ -12,6 +13,7 @@ import os
 import shutil
 import subprocess
 import sys
+import time
 
 log = logging.getLogger(__name__)
 
@@ -365,6 +367,11 @@ def number_ranges(i):
 
 class RubiksCube(object):
 
+    # About how many LookupTableIDA phases solve() goes through. With a
+    # deadline each phase gets an even share of the time that is left
+    # between it and the phases after it, see LookupTableIDA.ida_phase_budget()
+    deadline_phases = 4
+
     def __init__(self, state_string, order, colormap=None, debug=False):
         init_state = ['dummy', ]
         init_state.extend(list(state_string))
@@ -380,6 +387,16 @@ class RubiksCube(object):
         self.ida_count = 0
         self._phase = None
         self.lt_init_called = False
+
+        # See solve(), deadline is a time.time(), deadline_seconds is how
+        # many seconds solve() was given and degraded_phases are the
+        # LookupTableIDA phases that ran out of time
+        self.deadline = None
+        self.deadline_seconds = None
+        self.degraded_phases = []
+
+        # The IDATelemetry of each LookupTableIDA.solve(), see telemetry_dicts()
+        self.telemetry = []
         self.orient_edges = {}
 
         if colormap:
@@ -3822,11 +3839,105 @@ class RubiksCube(object):
         self.steps_to_solve_3x3x3 = index
         self.solution = solution_minus_markers
 
-    def solve(self):
+    def lt_init(self):
+        """
+        The lookup tables are LazyLookupTable class attributes, each one is
+        opened the first time it is used so there is nothing to do here.
+        """
+        self.lt_init_called = True
+
+    def lt_warm_all(self):
+        """
+        Open (and preload) every lookup table now instead of on first use. This
+        is for long running processes that will solve many cubes, a one-off
+        solve is better off only opening the tables it needs.
+
+        This is also where a table with a sparse_index_budget builds its .idx
+        if it does not have one, opening a table never does.
+        """
+        from rubikscubennnsolver.LookupTable import LazyLookupTable
+        self.lt_init()
+
+        for cls in type(self).__mro__:
+            for (name, value) in cls.__dict__.items():
+                if isinstance(value, LazyLookupTable):
+                    table = getattr(self, name)
+
+                    if getattr(table, 'sparse_index_budget', None) and table.sparse_index is None:
+                        table.build_sparse_index()
+
+    def solve(self, deadline=None):
         """
         The RubiksCube222 and RubiksCube333 child classes will override
         this since they don't need to group centers or edges
+
+        deadline is the number of seconds we have to find a solution. Each
+        LookupTableIDA phase gets a share of the time that is left (see
+        LookupTableIDA.ida_phase_budget()), a phase that runs out of time
+        falls back to a quicker but longer solution and is added to
+        degraded_phases. If a phase has no quicker solution to fall back to it
+        gives up, we stop there and return False, see gave_up().
         """
+        self.degraded_phases = []
+        self.telemetry = []
+
+        if deadline is not None:
+            self.deadline = time.time() + deadline
+            self.deadline_seconds = deadline
+
+        try:
+            self.solve_phases()
+        except NoIDASolution as e:
+            # Without a deadline this is a bug, with one a phase ran out of time
+            if not self.gave_up():
+                raise
+
+            log.warning("%s: gave up, %s" % (self, e))
+        finally:
+            self.deadline = None
+            self.deadline_seconds = None
+
+        if self.degraded_phases:
+            log.warning("%s: %d phases ran out of time: %s" %
+                (self, len(self.degraded_phases), ', '.join([degraded['phase'] for degraded in self.degraded_phases])))
+
+        return not self.gave_up()
+
+    def gave_up(self):
+        """
+        Return True if an IDA phase of the last solve() ran out of time and
+        had nothing to fall back to, the cube is only partly solved
+        """
+        for degraded in self.degraded_phases:
+            if degraded['fallback'] == 'gave up':
+                return True
+
+        return False
+
+    def share_with_fake_cube(self, fake_cube):
+        """
+        Some phases are solved by a fake smaller cube. Give it our deadline so
+        its IDA phases search within our time. The phases that run out of
+        time are added to our degraded_phases and the telemetry of its IDA
+        phases is added to our telemetry as each one finishes, with our
+        deadline_phases that is how its phases know how many are left.
+        """
+        fake_cube.deadline = self.deadline
+        fake_cube.deadline_seconds = self.deadline_seconds
+        fake_cube.deadline_phases = self.deadline_phases
+        fake_cube.degraded_phases = self.degraded_phases
+        fake_cube.telemetry = self.telemetry
+
+    def telemetry_dicts(self):
+        """
+        The telemetry of each IDA phase of the last solve(), see Telemetry.py
+        """
+        return [telemetry.as_dict() for telemetry in self.telemetry]
+
+    def telemetry_json(self):
+        return json.dumps(self.telemetry_dicts(), sort_keys=True)
+
+    def solve_phases(self):
         solved_string = 'U' * self.squares_per_side +\
                         'L' * self.squares_per_side +\
                         'F' * self.squares_per_side +\
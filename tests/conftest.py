@@ -0,0 +1,174 @@
+"""
+Fixtures for the tests. The lookup tables here are small synthetic tables
+written to a temporary directory, the real tables are far too big to
+download for a test run.
+"""
+
+from rubikscubennnsolver.LookupTable import LookupTable, LookupTableIDA, lookup_table_registry
+from rubikscubennnsolver.RubiksCube444 import RubiksCube444, centers_444, moves_444, rotate_444, solved_444
+import pytest
+
+WIDE_MOVES = [step for step in moves_444 if 'w' in step]
+UD_CENTERS_STAGED = 'UUUU' + ('x' * 16) + 'UUUU'
+UD_CENTERS_TABLE = 'lookup-table-4x4x4-test-UD-centers.txt'
+LR_CENTERS_STAGED = ('x' * 4) + 'LLLL' + ('x' * 4) + 'LLLL' + ('x' * 8)
+LR_CENTERS_TABLE = 'lookup-table-4x4x4-test-LR-centers.txt'
+ULR_CENTERS_STAGED = 'UUUU' + 'LLLL' + 'xxxx' + 'LLLL' + 'xxxx' + 'UUUU'
+ULR_CENTERS_TABLE = 'lookup-table-4x4x4-test-ULR-centers.txt'
+
+
+def write_table(filename, rows):
+    """
+    Write rows, a dict of state -> steps, as a sorted lookup-table-*.txt with
+    every line padded to the same width like the real tables
+    """
+    lines = ["%s:%s" % (state, steps) for (state, steps) in sorted(rows.items())]
+    width = max([len(line) for line in lines])
+
+    with open(filename, 'w') as fh:
+        for line in lines:
+            fh.write(line.ljust(width) + '\n')
+
+
+def reverse(steps):
+    result = []
+
+    for step in reversed(steps):
+        if step.endswith("'"):
+            result.append(step[:-1])
+        elif step.endswith('2'):
+            result.append(step)
+        else:
+            result.append(step + "'")
+
+    return result
+
+
+class LookupTableUDCentersStage(LookupTable):
+    state_positions = centers_444
+    state_pattern = {'U': 'U', 'L': 'x', 'F': 'x', 'R': 'x', 'B': 'x', 'D': 'U'}
+
+    def __init__(self, parent, linecount):
+        LookupTable.__init__(self, parent, UD_CENTERS_TABLE, UD_CENTERS_STAGED, linecount=linecount, max_depth=3)
+
+    def state(self):
+        return self.cube_pattern()
+
+
+def build_table(cube, table_class, filename, target, max_depth):
+    """
+    Write filename, every state() of a table_class within max_depth wide
+    moves of target and the steps that take it to target
+    """
+    table = table_class.__new__(table_class)
+    table.parent = cube
+    rows = {}
+    solved_state = cube.state[:]
+    layer = [(solved_state, [])]
+
+    for depth in range(max_depth):
+        next_layer = []
+
+        for (state, steps) in layer:
+            for step in WIDE_MOVES:
+                cube.state = rotate_444(state, step)
+                pattern = table.state()
+
+                if pattern != target and pattern not in rows:
+                    rows[pattern] = ' '.join(reverse(steps + [step]))
+                    next_layer.append((cube.state[:], steps + [step]))
+
+        layer = next_layer
+
+    cube.state = solved_state[:]
+    write_table(filename, rows)
+    return rows
+
+
+def build_ud_centers_table(cube):
+    """
+    Write UD_CENTERS_TABLE, every UD centers pattern within three wide moves
+    of staged and the steps that stage it
+    """
+    return build_table(cube, LookupTableUDCentersStage, UD_CENTERS_TABLE, UD_CENTERS_STAGED, 3)
+
+
+class LookupTableLRCentersStage(LookupTable):
+    state_positions = centers_444
+    state_pattern = {'U': 'x', 'L': 'L', 'F': 'x', 'R': 'L', 'B': 'x', 'D': 'x'}
+
+    def __init__(self, parent, linecount):
+        LookupTable.__init__(self, parent, LR_CENTERS_TABLE, LR_CENTERS_STAGED, linecount=linecount, max_depth=3)
+
+    def state(self):
+        return self.cube_pattern()
+
+
+def build_lr_centers_table(cube):
+    """
+    Write LR_CENTERS_TABLE, every LR centers pattern within three wide moves
+    of staged and the steps that stage it
+    """
+    return build_table(cube, LookupTableLRCentersStage, LR_CENTERS_TABLE, LR_CENTERS_STAGED, 3)
+
+
+class LookupTableIDAULRCentersStage(LookupTableIDA):
+    """
+    Stage the UD and LR centers with the wide moves, the UD centers table is
+    the prune table. The search is small enough to run with every engine.
+    """
+    state_positions = centers_444
+    state_pattern = {'U': 'U', 'L': 'L', 'F': 'x', 'R': 'L', 'B': 'x', 'D': 'U'}
+
+    def __init__(self, parent, linecount, ud_linecount):
+        LookupTableIDA.__init__(self, parent, ULR_CENTERS_TABLE, ULR_CENTERS_STAGED,
+                                moves_444, [step for step in moves_444 if step not in WIDE_MOVES],
+                                (LookupTableUDCentersStage(parent, ud_linecount), ),
+                                linecount=linecount, max_depth=1)
+
+    def state(self):
+        return self.cube_pattern()
+
+
+@pytest.fixture
+def ulr_centers_stage(table_dir, cube):
+    """
+    Write the tables for LookupTableIDAULRCentersStage, returns a function
+    that gives a LookupTableIDAULRCentersStage for a cube scrambled with the
+    steps it is called with
+    """
+    ud_linecount = len(build_ud_centers_table(cube))
+    linecount = len(build_table(cube, LookupTableIDAULRCentersStage, ULR_CENTERS_TABLE, ULR_CENTERS_STAGED, 1))
+
+    def ulr_centers_stage(steps, **kwargs):
+        scrambled = RubiksCube444(solved_444, 'URFDLB')
+
+        for step in steps:
+            scrambled.rotate(step)
+
+        scrambled.solution = []
+        table = LookupTableIDAULRCentersStage(scrambled, linecount, ud_linecount)
+
+        for (key, value) in kwargs.items():
+            setattr(table, key, value)
+
+        return table
+
+    return ulr_centers_stage
+
+
+@pytest.fixture
+def table_dir(tmp_path, monkeypatch):
+    """
+    LookupTable opens its table relative to the current directory, the
+    registry is cleared so each test opens its own copy of a file
+    """
+    monkeypatch.chdir(tmp_path)
+    lookup_table_registry.clear()
+    yield tmp_path
+    lookup_table_registry.clear()
+
+
+@pytest.fixture
+def cube():
+    return RubiksCube444(solved_444, 'URFDLB')
@@ -0,0 +1,86 @@
+"""
+adaptive_prune_tables changes the order the prune tables are looked up in
+and caches the result, the searches must still find a solution of the same
+length
+"""
+
+from conftest import LookupTableLRCentersStage, build_lr_centers_table
+from rubikscubennnsolver.RubiksCube444 import RubiksCube444, solved_444
+import pytest
+import random
+
+SCRAMBLES = (
+    ("Fw'", "Dw2", "Lw'", "Rw2", "Dw", "Uw2"),
+    ("Fw'", "Lw2", "Fw'", "Uw2", "Rw", "Dw'"),
+    ("Dw", "Rw'", "Bw2", "Rw", "Uw2", "Lw"),
+)
+
+
+@pytest.fixture
+def two_prune_tables(ulr_centers_stage, cube):
+    """
+    Returns a function like ulr_centers_stage() whose tables are pruned
+    by the UD and the LR centers tables
+    """
+    linecount = len(build_lr_centers_table(cube))
+
+    def two_prune_tables(steps, **kwargs):
+        table = ulr_centers_stage(steps, **kwargs)
+        table.prune_tables = (table.prune_tables[0], LookupTableLRCentersStage(table.parent, linecount))
+        table.prune_table_stats_init()
+        return table
+
+    return two_prune_tables
+
+
+@pytest.mark.parametrize('ida_engine', ('recursive', 'iterative'))
+@pytest.mark.parametrize('scramble', SCRAMBLES)
+def test_same_solution_length(two_prune_tables, ida_engine, scramble):
+    table = two_prune_tables(scramble, ida_engine=ida_engine)
+    assert table.solve()
+
+    # reorder and evict often
+    adaptive_table = two_prune_tables(scramble, ida_engine=ida_engine, adaptive_prune_tables=True,
+                                      prune_table_reorder_interval=16, ida_heuristic_cache_size=64)
+    assert adaptive_table.solve()
+
+    assert adaptive_table.state() == table.state()
+    assert len(adaptive_table.parent.solution) == len(table.parent.solution)
+    assert sorted(adaptive_table.prune_table_order) == [0, 1]
+
+    telemetry = adaptive_table.parent.telemetry_dicts()[0]
+    assert telemetry['heuristic_cache']['hits'] > 0
+    assert len(adaptive_table.ida_heuristic_cache) <= 64
+
+
+def test_cached_heuristic(two_prune_tables):
+    """
+    With the tables in their original order the adaptive heuristic is the
+    plain one, and a cost we stopped at because it was over the bound is
+    looked at again when we need the exact cost
+    """
+    table = two_prune_tables(())
+    adaptive_table = two_prune_tables((), adaptive_prune_tables=True, prune_table_reorder_interval=10 ** 9)
+    rng = random.Random(1)
+    moves = table.moves_all
+
+    for x in range(200):
+        cube = RubiksCube444(solved_444, 'URFDLB')
+
+        for step in [rng.choice(moves) for y in range(rng.randint(0, 5))]:
+            cube.rotate(step)
+
+        table.parent.state = cube.state[:]
+        adaptive_table.parent.state = cube.state[:]
+        cost_to_goal = table.ida_heuristic()
+
+        bounded_cost_to_goal = adaptive_table.ida_heuristic(0)
+        assert bounded_cost_to_goal <= cost_to_goal
+
+        if not bounded_cost_to_goal:
+            assert not cost_to_goal
+
+        assert adaptive_table.ida_heuristic() == cost_to_goal
+        assert adaptive_table.ida_heuristic() == cost_to_goal
+
+    assert adaptive_table.ida_heuristic_cache_hits >= 200
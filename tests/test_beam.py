@@ -0,0 +1,124 @@
+"""
+The IDA phases of the beam search search every candidate one threshold at
+a time, each candidate keeps its transposition table from one threshold to
+the next
+"""
+
+from conftest import ULR_CENTERS_STAGED
+from rubikscubennnsolver.Beam import BeamPhase, beam_phase_ida, beam_search
+from rubikscubennnsolver.LookupTable import NoIDASolution
+from rubikscubennnsolver.RubiksCube444 import rotate_444
+import pytest
+import time
+
+SCRAMBLES = (
+    ("Fw'", "Dw2", "Lw'", "Rw2", "Dw", "Uw2"),
+    ("Fw'", "Lw'", "Dw'", "Bw", "Uw", "Uw2"),
+    ("Lw", "Uw'", "Lw'", "Dw", "Fw", "Fw2"),
+    ("Bw'", "Rw", "Bw'", "Dw'", "Bw", "Rw2"),
+)
+
+
+def candidates(table):
+    results = []
+
+    for scramble in SCRAMBLES:
+        state = table.parent.state[:]
+
+        for step in scramble:
+            state = rotate_444(state, step)
+
+        results.append((0, state, list(scramble)))
+
+    return results
+
+
+def record_calls(table):
+    """
+    Record the (search, threshold, node_budget, nodes, transposition table
+    entries) of each solve_many_threshold()
+    """
+    solve_many_threshold = table.solve_many_threshold
+    calls = []
+
+    def recorded(search, threshold, node_budget=None, deadline=None):
+        nodes = search.total_ida_count
+        solve_many_threshold(search, threshold, node_budget, deadline)
+        calls.append((search, threshold, node_budget, search.total_ida_count - nodes, len(search.transposition_table)))
+
+    table.solve_many_threshold = recorded
+    return calls
+
+
+def test_solve_many(ulr_centers_stage):
+    table = ulr_centers_stage(SCRAMBLES[0])
+    original_state = table.parent.state[:]
+    results = table.solve_many(5)
+
+    assert 1 <= len(results) <= 5
+    assert table.parent.state == original_state
+
+    for (score, state, solution) in results:
+        table.parent.state = state
+        assert table.state() == ULR_CENTERS_STAGED
+        assert score == len(solution)
+
+
+def test_lockstep(ulr_centers_stage):
+    table = ulr_centers_stage(())
+    calls = record_calls(table)
+    results = beam_phase_ida(table.parent, BeamPhase(table, 20), candidates(table), None)
+    assert results
+
+    # Every candidate is searched at a threshold before any is searched at the next one
+    thresholds = [call[1] for call in calls]
+    assert thresholds == sorted(thresholds)
+    assert len(set(thresholds)) > 1
+
+    # and a candidate keeps its transposition table across the thresholds
+    searched_again = 0
+
+    for (index, call) in enumerate(calls):
+        earlier = [earlier_call for earlier_call in calls[:index] if earlier_call[0] is call[0]]
+
+        if earlier:
+            assert call[4] >= earlier[-1][4]
+
+            if earlier[-1][4]:
+                searched_again += 1
+
+    assert searched_again
+
+
+def test_node_budget_is_for_all_candidates(ulr_centers_stage):
+    table = ulr_centers_stage(())
+    calls = record_calls(table)
+    node_budget = 200
+    beam_phase_ida(table.parent, BeamPhase(table, 1000), candidates(table), node_budget)
+    nodes = 0
+
+    # Each candidate gets what is left of the budget and once it is spent
+    # no more candidates are searched
+    for (search, threshold, call_node_budget, call_nodes, entries) in calls:
+        assert call_node_budget == node_budget - nodes > 0
+        nodes += call_nodes
+
+    assert nodes >= node_budget
+
+
+def test_deadline(ulr_centers_stage):
+    table = ulr_centers_stage(SCRAMBLES[0])
+    cube = table.parent
+    cube.deadline = time.time() - 1
+    cube.deadline_seconds = 1
+
+    with pytest.raises(NoIDASolution):
+        beam_search(cube, (BeamPhase(table, 10), ))
+
+    assert [degraded['fallback'] for degraded in cube.degraded_phases] == ['gave up']
+
+    # Without a deadline the same search finds a solution
+    cube.deadline = None
+    cube.degraded_phases = []
+    beam_search(cube, (BeamPhase(table, 10), ))
+    assert table.state() == ULR_CENTERS_STAGED
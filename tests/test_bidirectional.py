@@ -0,0 +1,72 @@
+"""
+ida_engine = 'bidirectional' finds the shortest path to state_target, the
+IDA engines can only find a longer one
+"""
+
+from rubikscubennnsolver.RubiksCube444 import (
+    LookupTable444FBCentersStageCostOnly,
+    LookupTable444LRCentersStageCostOnly,
+    LookupTable444UDCentersStageCostOnly,
+    LookupTableIDA444ULFRBDCentersStage,
+    RubiksCube444,
+    centers_444,
+    solved_444,
+)
+import pytest
+
+SCRAMBLES = (
+    ("Fw'", "Dw2", "Lw'", "Rw2", "Dw"),
+    ("Fw'", "Lw'", "Dw'", "Bw", "Uw", "Uw2"),
+    ("Lw", "Uw'", "Lw'", "Dw", "Fw", "Fw2"),
+)
+
+
+@pytest.mark.parametrize('scramble', SCRAMBLES)
+def test_shortest_solution(ulr_centers_stage, scramble):
+    table = ulr_centers_stage(scramble)
+    assert table.solve()
+
+    bidirectional_table = ulr_centers_stage(scramble, ida_engine='bidirectional')
+    assert bidirectional_table.solve()
+
+    assert bidirectional_table.state() in bidirectional_table.state_target
+    assert len(bidirectional_table.parent.solution) <= len(table.parent.solution)
+
+
+@pytest.mark.parametrize('table_class', (
+    LookupTableIDA444ULFRBDCentersStage,
+    LookupTable444UDCentersStageCostOnly,
+    LookupTable444LRCentersStageCostOnly,
+    LookupTable444FBCentersStageCostOnly,
+))
+def test_fake_cube_pattern(table_class):
+    """
+    A fake 444 has 'x' squares, state_pattern must see them the way state()
+    does or the pattern engines search a different cube
+    """
+    cube = RubiksCube444(solved_444, 'URFDLB')
+    cube.rotate("Rw")
+    cube.rotate("Uw'")
+
+    for x in centers_444[::3]:
+        cube.state[x] = 'x'
+
+    # The table files are far too big for a test, we only need the patterns
+    table = table_class.__new__(table_class)
+    table.parent = cube
+    assert table.state_from_pattern(table.cube_pattern()) == table.state()
+
+
+def test_fake_cube_bidirectional_encoder():
+    cube = RubiksCube444(solved_444, 'URFDLB')
+    cube.nuke_corners()
+    cube.nuke_edges()
+    cube.rotate("Rw")
+
+    table = LookupTableIDA444ULFRBDCentersStage.__new__(LookupTableIDA444ULFRBDCentersStage)
+    table.parent = cube
+    table.state_target = set(('UUUULLLLFFFFLLLLFFFFUUUU', ))
+    (encoder, target_patterns) = table.bidirectional_encoder()
+
+    assert encoder is not None
+    assert encoder.decode(encoder.encode(table.cube_pattern())) == table.state()
@@ -0,0 +1,86 @@
+"""
+A Bloom filter may say "maybe" for a state that is not in the table but it
+must never say no to a state that is
+"""
+
+from conftest import write_table
+from rubikscubennnsolver.BloomFilter import BloomFilter
+from rubikscubennnsolver.LookupTable import LookupTable, lookup_table_registry
+import os
+import random
+
+
+def random_states(count, seed):
+    rng = random.Random(seed)
+    states = set()
+
+    while len(states) < count:
+        states.add(''.join([rng.choice('ULFRBD') for x in range(12)]))
+
+    return states
+
+
+def test_no_false_negatives():
+    states = random_states(5000, 1)
+    bloom = BloomFilter.for_capacity(len(states), 0.01)
+
+    for state in states:
+        bloom.add(state)
+
+    assert all([state in bloom for state in states])
+
+    # and it is still a useful filter
+    others = random_states(5000, 2) - states
+    false_positives = len([state for state in others if state in bloom])
+    assert false_positives < len(others) * 0.03
+
+
+def test_table_lookups_with_bloom_filter(table_dir, cube):
+    states = random_states(3000, 3)
+    rows = dict([(state, "U L'") for state in states])
+    write_table('lookup-table-4x4x4-test.txt', rows)
+    absent = sorted(random_states(3000, 4) - states)
+
+    # The first time the filter is built and saved, the second time it is
+    # loaded from the .bloom
+    for attempt in range(2):
+        lookup_table_registry.clear()
+        table = LookupTable(cube, 'lookup-table-4x4x4-test.txt', 'x', linecount=len(rows), bloom_filter_error_rate=0.01)
+        assert table.bloom_filter is not None
+        assert os.path.exists('lookup-table-4x4x4-test.bloom')
+
+        for state in states:
+            assert table.steps(state) == ['U', "L'"], state
+
+        for state in absent:
+            assert table.steps(state) is None, state
+
+        # Most of the absent states never touch the table
+        assert table.bloom_filter_negatives > len(absent) * 0.9
+
+        many = table.steps_many(list(states) + absent)
+        assert all([many[state] == ['U', "L'"] for state in states])
+        assert all([many[state] is None for state in absent])
+
+
+def test_rebuilt_table_rebuilds_filter(table_dir, cube):
+    """
+    A table rebuilt with the same linecount and row width is the same size,
+    the .bloom of the old table must not be used for it
+    """
+    old_states = random_states(1000, 5)
+    write_table('lookup-table-4x4x4-test.txt', dict([(state, "U") for state in old_states]))
+    LookupTable(cube, 'lookup-table-4x4x4-test.txt', 'x', linecount=len(old_states), bloom_filter_error_rate=0.01)
+    size = os.path.getsize('lookup-table-4x4x4-test.txt')
+    mtime = os.path.getmtime('lookup-table-4x4x4-test.txt')
+
+    new_states = random_states(1000, 6)
+    write_table('lookup-table-4x4x4-test.txt', dict([(state, "L") for state in new_states]))
+    os.utime('lookup-table-4x4x4-test.txt', (mtime + 10, mtime + 10))
+    assert os.path.getsize('lookup-table-4x4x4-test.txt') == size
+
+    lookup_table_registry.clear()
+    table = LookupTable(cube, 'lookup-table-4x4x4-test.txt', 'x', linecount=len(new_states), bloom_filter_error_rate=0.01)
+
+    for state in new_states:
+        assert table.steps(state) == ['L'], state
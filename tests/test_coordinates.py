@@ -0,0 +1,51 @@
+"""
+The coordinates engine searches on the squares the tables look at instead
+of the whole cube, it must see the same states and costs as the cube would
+"""
+
+from rubikscubennnsolver.RubiksCube444 import rotate_444
+import pytest
+import random
+
+SCRAMBLES = (
+    ("Fw'", "Dw2", "Lw'", "Rw2", "Dw", "Uw2"),
+    ("Fw'", "Lw'", "Dw'", "Bw", "Uw", "Uw2"),
+    ("Bw'", "Rw", "Bw'", "Dw'", "Bw", "Rw2"),
+)
+
+
+def test_moves_match_the_cube(ulr_centers_stage):
+    table = ulr_centers_stage(SCRAMBLES[0])
+
+    # solve() sets this up
+    table.rotate_xxx = rotate_444
+    coordinates = table.ida_coordinates()
+    assert coordinates
+    cube = table.parent
+    rng = random.Random(1)
+
+    for x in range(50):
+        coords = [coordinate.from_cube(cube.state) for coordinate in coordinates]
+        move_id = rng.randrange(len(table.moves_all))
+        cube.state = rotate_444(cube.state, table.moves_all[move_id])
+
+        for (coordinate, coord, pt) in zip(coordinates, coords, [table] + list(table.prune_tables)):
+            coord = coordinate.move(coord, move_id)
+            assert coord == coordinate.from_cube(cube.state)
+            assert coordinate.state(coord) == pt.state()
+
+            if pt is not table:
+                assert coordinate.heuristic(coord) == pt.heuristic()
+
+
+@pytest.mark.parametrize('scramble', SCRAMBLES)
+def test_same_solution_as_recursive(ulr_centers_stage, scramble):
+    table = ulr_centers_stage(scramble)
+    assert table.solve()
+
+    coordinates_table = ulr_centers_stage(scramble, ida_engine='coordinates')
+    assert coordinates_table.solve()
+    assert coordinates_table.coordinates
+
+    assert coordinates_table.parent.solution == table.parent.solution
+    assert coordinates_table.parent.state == table.parent.state
@@ -0,0 +1,89 @@
+"""
+A nibble packed .cost-only.bin must give the same cost for every state as
+the .cost-only.txt with one hex character per state
+"""
+
+from conftest import write_table
+from rubikscubennnsolver.LookupTable import LookupTableCostOnly, NibbleWriter, convert_to_cost_only_table, lookup_table_registry
+import io
+import pytest
+import random
+
+MOVES = ("U", "L'", "F2", "Rw")
+STATE_COUNT = 4001
+
+
+def write_tables():
+    """
+    Write lookup-table-4x4x4-test.txt, a table with hex states, and the
+    .cost-only.txt of it. Return the cost of each state.
+    """
+    rng = random.Random(1)
+    costs = [0] * STATE_COUNT
+    rows = {}
+
+    for state_int in rng.sample(range(STATE_COUNT), 1500) + [STATE_COUNT - 1]:
+        # a few are too long for a nibble and are saved as 15
+        steps = [rng.choice(MOVES) for x in range(rng.randint(1, 17))]
+        rows['%03x' % state_int] = ' '.join(steps)
+        costs[state_int] = min(len(steps), 15)
+
+    write_table('lookup-table-4x4x4-test.txt', rows)
+
+    with open('lookup-table-4x4x4-test-txt.cost-only.txt', 'w') as fh:
+        fh.write(''.join(['%x' % cost for cost in costs]))
+
+    return costs
+
+
+def test_nibble_round_trip(table_dir, cube):
+    costs = write_tables()
+    assert convert_to_cost_only_table('lookup-table-4x4x4-test.txt') == 'lookup-table-4x4x4-test.cost-only.bin'
+
+    table = LookupTableCostOnly(cube, 'lookup-table-4x4x4-test.cost-only.txt', 'x', linecount=STATE_COUNT)
+    assert table.nibble
+    lookup_table_registry.clear()
+    txt_table = LookupTableCostOnly(cube, 'lookup-table-4x4x4-test-txt.cost-only.txt', 'x', linecount=STATE_COUNT)
+    assert txt_table.binary is None
+
+    for state_int in range(STATE_COUNT):
+        assert table.steps_cost(state_int) == costs[state_int], state_int
+        assert txt_table.steps_cost(state_int) == costs[state_int], state_int
+
+    states = list(range(STATE_COUNT - 1, -1, -3))
+    assert list(table.steps_cost_many(states)) == [costs[state_int] for state_int in states]
+
+
+def test_steps_cost_many_without_numpy(table_dir, cube):
+    costs = write_tables()
+    convert_to_cost_only_table('lookup-table-4x4x4-test.txt')
+    table = LookupTableCostOnly(cube, 'lookup-table-4x4x4-test.cost-only.txt', 'x', linecount=STATE_COUNT)
+    table.costs = None
+
+    states = [0, 1, 2, STATE_COUNT - 2, STATE_COUNT - 1]
+    assert table.steps_cost_many(states) == [costs[state_int] for state_int in states]
+
+
+def test_steps_cost_many_with_numpy(table_dir, cube):
+    pytest.importorskip('numpy')
+    costs = write_tables()
+    convert_to_cost_only_table('lookup-table-4x4x4-test.txt')
+    table = LookupTableCostOnly(cube, 'lookup-table-4x4x4-test.cost-only.txt', 'x', linecount=STATE_COUNT)
+    assert table.costs is not None
+
+    states = list(range(STATE_COUNT))
+    assert table.steps_cost_many(states).tolist() == costs
+
+
+def test_nibble_writer_zeros():
+    """
+    A run of zeros can start on either half of a byte
+    """
+    fh = io.BytesIO()
+    writer = NibbleWriter(fh)
+    writer.write(7)
+    writer.write_zeros(4)
+    writer.write(9)
+    writer.write_zeros(3)
+    writer.close()
+    assert fh.getvalue() == bytes([0x70, 0x00, 0x09, 0x00, 0x00])
@@ -0,0 +1,175 @@
+"""
+A LookupTableIDA phase that runs out of time solves one of its prune tables
+first or gives up with NoIDASolution, it never searches without a deadline
+"""
+
+from conftest import (
+    LookupTableLRCentersStage,
+    LookupTableUDCentersStage,
+    UD_CENTERS_STAGED,
+    WIDE_MOVES,
+    build_lr_centers_table,
+    build_ud_centers_table,
+    write_table,
+)
+from rubikscubennnsolver.LookupTable import LookupTableIDA, NoIDASolution
+from rubikscubennnsolver.RubiksCube444 import RubiksCube444, centers_444, edges_444, moves_444, solved_444
+import pytest
+import time
+
+# The UD centers are staged and the U and D edges are where they start
+SOLVED = RubiksCube444(solved_444, 'URFDLB').state
+STAGED = UD_CENTERS_STAGED + ''.join(['U' if SOLVED[x] in 'UD' else 'x' for x in edges_444])
+
+# Only 8 of the centers are U or D so this state is never reached
+UNREACHABLE = 'U' * len(STAGED)
+
+
+class LookupTableIDAUDCentersStage(LookupTableIDA):
+    """
+    Without the wide moves the search can never stage the UD centers so it
+    searches the edges until it runs out of time
+    """
+    state_positions = centers_444 + edges_444
+    state_pattern = LookupTableUDCentersStage.state_pattern
+
+    def __init__(self, parent, prune_tables):
+        LookupTableIDA.__init__(self, parent, 'lookup-table-4x4x4-test-UD-centers-stage.txt', STAGED,
+                                moves_444, WIDE_MOVES, prune_tables, linecount=1, max_depth=1)
+
+    def state(self):
+        return self.cube_pattern()
+
+
+def scrambled_cube(past_deadline=True, steps=("Rw", )):
+    cube = RubiksCube444(solved_444, 'URFDLB')
+
+    for step in steps:
+        cube.rotate(step)
+
+    cube.solution = []
+
+    if past_deadline:
+        cube.deadline = time.time() - 1
+        cube.deadline_seconds = 1
+
+    return cube
+
+
+@pytest.fixture
+def rows(table_dir, cube):
+    write_table('lookup-table-4x4x4-test-UD-centers-stage.txt', {UNREACHABLE: 'Uw'})
+    return build_ud_centers_table(cube)
+
+
+def test_gives_up(rows):
+    cube = scrambled_cube()
+    table = LookupTableIDAUDCentersStage(cube, ())
+    start = time.time()
+
+    with pytest.raises(NoIDASolution):
+        table.solve()
+
+    assert time.time() - start < 5
+    assert [degraded['fallback'] for degraded in cube.degraded_phases] == ['gave up']
+    assert cube.telemetry[-1].degraded == cube.degraded_phases
+
+
+def test_solves_prune_table_first(rows):
+    cube = scrambled_cube()
+    pt = LookupTableUDCentersStage(cube, len(rows))
+    table = LookupTableIDAUDCentersStage(cube, (pt, ))
+
+    assert table.solve()
+    assert table.state() == STAGED
+    assert [degraded['fallback'] for degraded in cube.degraded_phases] == ['solved %s first' % pt]
+    assert cube.solution == ["Rw'"]
+
+
+def test_gives_up_if_fallback_runs_out_of_time(rows, cube):
+    """
+    Solving the UD centers first leaves the U and D edges to move around
+    with the outer moves, that search runs out of time as well. We give up
+    then, the LR centers table is not solved next.
+    """
+    lr_rows = build_lr_centers_table(cube)
+    cube = scrambled_cube(steps=("U", "F", "D'", "B", "Rw", "Uw"))
+    pt = LookupTableUDCentersStage(cube, len(rows))
+    lr_pt = LookupTableLRCentersStage(cube, len(lr_rows))
+    assert lr_pt.steps(lr_pt.state())
+    table = LookupTableIDAUDCentersStage(cube, (pt, lr_pt))
+
+    with pytest.raises(NoIDASolution):
+        table.solve()
+
+    assert [degraded['fallback'] for degraded in cube.degraded_phases] == ['solved %s first' % pt, 'gave up']
+
+
+def test_phase_budget(rows, cube):
+    """
+    The time that is left is split between this phase and the ones after it
+    """
+    table = LookupTableIDAUDCentersStage(cube, ())
+    cube.deadline = time.time() + 12
+    cube.deadline_phases = 4
+    assert 2.9 < table.ida_phase_budget() <= 3
+
+    # The first phase is done, two more to go after this one
+    cube.telemetry.append(None)
+    assert 3.9 < table.ida_phase_budget() <= 4
+
+    # The last phase gets all of the time that is left
+    cube.telemetry.extend([None, None])
+    assert 11.9 < table.ida_phase_budget() <= 12
+
+    # And nothing once the deadline has passed
+    cube.deadline = time.time() - 1
+    assert table.ida_phase_budget() == 0
+
+
+def test_solve_reports_gave_up(rows, monkeypatch):
+    """
+    RubiksCube.solve() returns False when a phase gave up, without a
+    deadline a NoIDASolution is a bug and is raised
+    """
+    cube = scrambled_cube(past_deadline=False)
+    table = LookupTableIDAUDCentersStage(cube, ())
+    monkeypatch.setattr(cube, 'solve_phases', lambda: table.solve())
+
+    assert cube.solve(deadline=0) is False
+    assert cube.gave_up()
+    assert cube.deadline is None
+
+    monkeypatch.setattr(cube, 'solve_phases', lambda: table.solve(max_ida_threshold=2))
+
+    with pytest.raises(NoIDASolution):
+        cube.solve()
+
+    assert not cube.gave_up()
+
+
+def test_no_deadline(rows):
+    """
+    Without a deadline the search is never cut short, give it a max
+    threshold so it ends
+    """
+    cube = scrambled_cube(past_deadline=False)
+    table = LookupTableIDAUDCentersStage(cube, ())
+
+    with pytest.raises(NoIDASolution):
+        table.solve(max_ida_threshold=2)
+
+    assert cube.degraded_phases == []
+
+
+def test_share_with_fake_cube(cube):
+    cube.deadline = time.time() + 10
+    cube.deadline_seconds = 10
+    fake_cube = RubiksCube444(solved_444, 'URFDLB')
+    cube.share_with_fake_cube(fake_cube)
+
+    assert fake_cube.deadline == cube.deadline
+    assert fake_cube.deadline_seconds == cube.deadline_seconds
+    assert fake_cube.deadline_phases == cube.deadline_phases
+    assert fake_cube.degraded_phases is cube.degraded_phases
+    assert fake_cube.telemetry is cube.telemetry
@@ -0,0 +1,59 @@
+"""
+Every ida_engine must find a solution of the same length for the same
+scramble, they only differ in how they walk the tree
+"""
+
+import pytest
+
+IDA_ENGINES = (
+    {'ida_engine': 'recursive'},
+    {'ida_engine': 'iterative'},
+    {'ida_engine': 'coordinates'},
+    {'parallel_ida_workers': 2},
+)
+
+# The shortest solutions of these are the ones IDA finds
+SCRAMBLES = (
+    ("Rw'", "Lw'", "Bw", "Uw'", "Uw2", "Dw2"),
+    ("Dw2", "Bw'", "Uw'", "Lw", "Fw'", "Uw'"),
+    ("Bw", "Uw'", "Fw'", "Uw'", "Dw2", "Lw'"),
+    ("Dw", "Rw'", "Bw2", "Rw", "Uw2", "Lw"),
+)
+
+# IDA stops at the first state it finds in the table, with a 1-deep table
+# that can be a couple of moves longer than the bidirectional search
+LONGER_SCRAMBLES = (
+    ("Lw", "Rw2", "Uw'", "Dw'", "Fw", "Uw'"),
+    ("Fw'", "Lw2", "Fw'", "Uw2", "Rw", "Dw'"),
+)
+
+
+def solution_length(ulr_centers_stage, scramble, settings):
+    table = ulr_centers_stage(scramble, **settings)
+    assert table.solve()
+    assert table.state() in table.state_target
+    return len(table.parent.solution)
+
+
+@pytest.mark.parametrize('scramble', SCRAMBLES)
+def test_same_solution_length(ulr_centers_stage, scramble):
+    lengths = [solution_length(ulr_centers_stage, scramble, settings) for settings in IDA_ENGINES]
+    lengths.append(solution_length(ulr_centers_stage, scramble, {'ida_engine': 'bidirectional'}))
+    assert len(set(lengths)) == 1, lengths
+
+
+@pytest.mark.parametrize('scramble', LONGER_SCRAMBLES)
+def test_bidirectional_is_never_longer(ulr_centers_stage, scramble):
+    lengths = [solution_length(ulr_centers_stage, scramble, settings) for settings in IDA_ENGINES]
+    assert len(set(lengths)) == 1, lengths
+    assert solution_length(ulr_centers_stage, scramble, {'ida_engine': 'bidirectional'}) < lengths[0]
+
+
+def test_coordinates_engine_is_used(ulr_centers_stage):
+    """
+    The coordinates engine falls back to the iterative one if it cannot
+    search this table, the tests above would not notice
+    """
+    table = ulr_centers_stage(SCRAMBLES[1], ida_engine='coordinates')
+    assert table.solve()
+    assert table.coordinates
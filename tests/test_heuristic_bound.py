@@ -0,0 +1,56 @@
+"""
+ida_heuristic(bound) stops looking up prune tables once the cost is more
+than bound, it must not stop any sooner than that
+"""
+
+from rubikscubennnsolver.LookupTable import LookupTableIDA
+
+
+class PruneTable(object):
+
+    def __init__(self, cost, max_depth):
+        self.cost = cost
+        self.max_depth = max_depth
+        self.heuristic_calls = 0
+
+    def heuristic(self):
+        self.heuristic_calls += 1
+        return self.cost
+
+
+def ida_table(*prune_tables):
+    table = LookupTableIDA.__new__(LookupTableIDA)
+    table.use_lt_as_prune = False
+    table.prune_tables = prune_tables
+    return table
+
+
+def test_stops_once_over_bound():
+    table = ida_table(PruneTable(5, 9), PruneTable(7, 9))
+    assert table.ida_heuristic(4) == 5
+    assert [pt.heuristic_calls for pt in table.prune_tables] == [1, 0]
+
+
+def test_equal_to_bound_keeps_looking():
+    table = ida_table(PruneTable(5, 9), PruneTable(7, 9))
+    assert table.ida_heuristic(5) == 7
+    assert [pt.heuristic_calls for pt in table.prune_tables] == [1, 1]
+
+
+def test_no_bound():
+    table = ida_table(PruneTable(5, 9), PruneTable(3, 9), PruneTable(7, 9))
+    assert table.ida_heuristic() == 7
+    assert [pt.heuristic_calls for pt in table.prune_tables] == [1, 1, 1]
+
+
+def test_same_solution_with_and_without_bound(ulr_centers_stage):
+    scramble = ("Fw'", "Lw'", "Dw'", "Bw", "Uw", "Uw2")
+    table = ulr_centers_stage(scramble)
+    assert table.solve()
+
+    unbounded_table = ulr_centers_stage(scramble)
+    unbounded_table.ida_heuristic_bound = lambda threshold, cost_to_here: None
+    assert unbounded_table.solve()
+
+    assert unbounded_table.parent.solution == table.parent.solution
+    assert unbounded_table.total_ida_count == table.total_ida_count
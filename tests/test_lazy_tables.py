@@ -0,0 +1,66 @@
+"""
+A LazyLookupTable is only opened the first time a cube uses it, then it is
+a plain attribute of that cube
+"""
+
+from conftest import LookupTableUDCentersStage, build_ud_centers_table
+from rubikscubennnsolver import RubiksCube
+from rubikscubennnsolver.LookupTable import LazyLookupTable
+from rubikscubennnsolver.RubiksCube444 import solved_444
+
+
+class LookupTableCounted(LookupTableUDCentersStage):
+    linecount = None
+    opened = 0
+
+    def __init__(self, parent):
+        LookupTableCounted.opened += 1
+        LookupTableUDCentersStage.__init__(self, parent, LookupTableCounted.linecount)
+
+
+class LazyCube(RubiksCube):
+    lt_UD_centers_stage = LazyLookupTable(LookupTableCounted)
+    lt_preloaded = LazyLookupTable(LookupTableCounted, preload=True, avoid_oll=True)
+
+
+def setup_tables(cube):
+    LookupTableCounted.linecount = len(build_ud_centers_table(cube))
+    LookupTableCounted.opened = 0
+
+
+def test_opened_on_first_access(table_dir, cube):
+    setup_tables(cube)
+    lazy_cube = LazyCube(solved_444, 'URFDLB')
+    lazy_cube.lt_init()
+    assert LookupTableCounted.opened == 0
+
+    table = lazy_cube.lt_UD_centers_stage
+    assert LookupTableCounted.opened == 1
+    assert table.parent is lazy_cube
+    assert not table.preloaded_cache
+
+    # the second access is the same table
+    assert lazy_cube.lt_UD_centers_stage is table
+    assert LookupTableCounted.opened == 1
+
+    # every cube has its own
+    other_cube = LazyCube(solved_444, 'URFDLB')
+    assert other_cube.lt_UD_centers_stage is not table
+    assert other_cube.lt_UD_centers_stage.parent is other_cube
+    assert LookupTableCounted.opened == 2
+
+
+def test_settings_and_preload(table_dir, cube):
+    setup_tables(cube)
+    table = LazyCube(solved_444, 'URFDLB').lt_preloaded
+    assert table.preloaded_cache
+    assert table.avoid_oll
+
+
+def test_warm_all(table_dir, cube):
+    setup_tables(cube)
+    lazy_cube = LazyCube(solved_444, 'URFDLB')
+    lazy_cube.lt_warm_all()
+    assert LookupTableCounted.opened == 2
+    assert 'lt_UD_centers_stage' in lazy_cube.__dict__
+    assert 'lt_preloaded' in lazy_cube.__dict__
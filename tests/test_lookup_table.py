@@ -0,0 +1,138 @@
+"""
+A lookup for a state must return the same steps no matter how the table is
+stored
+"""
+
+from conftest import write_table
+from rubikscubennnsolver.LookupTable import LookupTable, convert_to_binary_table, convert_to_ranked_table, lookup_table_registry
+import itertools
+import os
+import random
+
+MOVES = ("U", "U'", "U2", "L", "L'", "L2", "F", "F'", "F2")
+
+
+def random_rows(count, seed=1):
+    rng = random.Random(seed)
+    rows = {}
+
+    while len(rows) < count:
+        state = ''.join([rng.choice('ULF') for x in range(8)])
+        rows[state] = ' '.join([rng.choice(MOVES) for x in range(rng.randint(1, 6))])
+
+    return rows
+
+
+def probes(rows, seed=2):
+    """
+    Every state in the table, some that are not and some of the wrong width
+    """
+    rng = random.Random(seed)
+    result = list(rows.keys())
+    result.extend([''.join([rng.choice('ULFR') for x in range(8)]) for y in range(500)])
+    result.extend(['', 'UUU', 'UUUUUUUUU', min(rows)[:7], max(rows) + 'U'])
+    return result
+
+
+def open_table(cube, rows, **kwargs):
+    lookup_table_registry.clear()
+    return LookupTable(cube, 'lookup-table-4x4x4-test.txt', 'UUUUUUUU', linecount=len(rows), **kwargs)
+
+
+def test_mmap_matches_seek(table_dir, cube):
+    rows = random_rows(2000)
+    write_table('lookup-table-4x4x4-test.txt', rows)
+    mmapped = open_table(cube, rows, use_mmap=True)
+    seeked = open_table(cube, rows, use_mmap=False)
+    assert mmapped.mm is not None
+    assert seeked.mm is None
+
+    for state in probes(rows):
+        expected = rows[state].split() if state in rows else None
+        assert mmapped.steps(state) == expected, state
+        assert seeked.steps(state) == expected, state
+
+
+def test_binary_matches_txt(table_dir, cube):
+    rows = random_rows(2000)
+    write_table('lookup-table-4x4x4-test.txt', rows)
+    txt = open_table(cube, rows)
+    convert_to_binary_table('lookup-table-4x4x4-test.txt', ['UUUUUUUU'])
+    assert os.path.exists('lookup-table-4x4x4-test.bin')
+    binary = open_table(cube, rows)
+    assert binary.binary is not None
+    assert os.path.getsize('lookup-table-4x4x4-test.bin') < os.path.getsize('lookup-table-4x4x4-test.txt')
+
+    for state in probes(rows):
+        assert binary.steps(state) == txt.steps(state), state
+
+    for prefix in ('F', 'UL', 'LFU'):
+        expected = ["%s:%s" % (state, steps) for (state, steps) in sorted(rows.items()) if state.startswith(prefix)]
+        assert binary.find_binary_entries_with_prefix(prefix) == expected, prefix
+
+
+def test_ranked_matches_txt(table_dir, cube):
+    # The states are the arrangements of UULLFFFF, only some are in the table
+    rng = random.Random(3)
+    arrangements = sorted(set([''.join(arrangement) for arrangement in itertools.permutations('UULLFFFF')]))
+    rows = {}
+
+    for state in arrangements:
+        if rng.random() < 0.6:
+            rows[state] = ' '.join([rng.choice(MOVES) for x in range(rng.randint(1, 6))])
+
+    write_table('lookup-table-4x4x4-test.txt', rows)
+    txt = open_table(cube, rows)
+    convert_to_ranked_table('lookup-table-4x4x4-test.txt')
+    ranked = open_table(cube, rows)
+    assert ranked.ranker is not None
+    assert ranked.ranker.size == len(arrangements)
+
+    for state in arrangements + probes(rows):
+        assert ranked.steps(state) == txt.steps(state), state
+
+
+def check_steps_many(table, states):
+    expected = dict([(state, table.steps(state)) for state in states])
+    assert table.steps_many(states) == expected
+
+
+def test_steps_many_matches_steps(table_dir, cube):
+    rows = random_rows(2000)
+    write_table('lookup-table-4x4x4-test.txt', rows)
+    rng = random.Random(4)
+
+    # duplicates, the state_target and states in any order
+    states = probes(rows) + ['UUUUUUUU'] + rng.sample(list(rows.keys()), 300)
+    rng.shuffle(states)
+
+    seeked = open_table(cube, rows, use_mmap=False)
+    check_steps_many(seeked, states)
+    check_steps_many(open_table(cube, rows, use_mmap=True), states)
+    check_steps_many(open_table(cube, rows), [])
+
+    preloaded = open_table(cube, rows)
+    preloaded.preload_cache()
+    check_steps_many(preloaded, states)
+
+    convert_to_binary_table('lookup-table-4x4x4-test.txt', ['UUUUUUUU'])
+    binary = open_table(cube, rows)
+    assert binary.binary is not None
+    check_steps_many(binary, states)
+
+
+def test_steps_many_reads_less(table_dir, cube):
+    rows = random_rows(2000)
+    write_table('lookup-table-4x4x4-test.txt', rows)
+    states = sorted(rows.keys())[::4]
+
+    table = open_table(cube, rows, use_mmap=False)
+    table.steps_many(states)
+    steps_many_seeks = table.fh_txt_seek_calls
+
+    table = open_table(cube, rows, use_mmap=False)
+
+    for state in states:
+        table.steps(state)
+
+    assert steps_many_seeks < table.fh_txt_seek_calls * 0.75
@@ -0,0 +1,68 @@
+"""
+The LRU cache in front of steps() must not change what steps() returns
+"""
+
+from conftest import write_table
+from rubikscubennnsolver.LookupTable import LookupTable, lookup_table_registry
+import random
+
+
+def random_rows(count, seed):
+    rng = random.Random(seed)
+    rows = {}
+
+    while len(rows) < count:
+        state = ''.join([rng.choice('ULF') for x in range(10)])
+        rows[state] = ' '.join([rng.choice(("U", "L'", "F2")) for x in range(rng.randint(1, 5))])
+
+    return rows
+
+
+def open_table(cube, rows, lru_cache_size=None):
+    write_table('lookup-table-4x4x4-test.txt', rows)
+    lookup_table_registry.clear()
+    table = LookupTable(cube, 'lookup-table-4x4x4-test.txt', 'x', linecount=len(rows))
+    table.lru_cache_size = lru_cache_size
+    return table
+
+
+def test_same_steps(table_dir, cube):
+    rows = random_rows(500, 1)
+    rng = random.Random(2)
+    states = list(rows.keys()) + [''.join([rng.choice('ULF') for x in range(10)]) for y in range(100)]
+    lookups = [rng.choice(states[:50]) if rng.random() < 0.5 else rng.choice(states) for x in range(3000)]
+
+    table = open_table(cube, rows)
+    expected = [table.steps(state) for state in lookups]
+
+    table = open_table(cube, rows, lru_cache_size=40)
+    assert [table.steps(state) for state in lookups] == expected
+
+    stats = table.lru_cache_stats()
+    assert stats['hits'] + stats['misses'] == len(lookups)
+    assert stats['hits'] > len(lookups) * 0.2
+    assert stats['size'] == 40
+    assert stats['evictions'] == stats['misses'] - stats['size']
+
+
+def test_least_recently_used_is_evicted(table_dir, cube):
+    rows = random_rows(10, 3)
+    (a, b, c) = sorted(rows.keys())[:3]
+    table = open_table(cube, rows, lru_cache_size=2)
+
+    for state in (a, b, a, c):
+        table.steps(state)
+
+    assert list(table.lru_cache.keys()) == [a, c]
+    assert table.lru_cache_stats()['evictions'] == 1
+
+    table.steps(a)
+    table.steps(b)
+    assert (table.lru_cache_hits, table.lru_cache_misses) == (2, 4)
+
+
+def test_misses_are_cached(table_dir, cube):
+    table = open_table(cube, random_rows(10, 4), lru_cache_size=8)
+    assert table.steps('x' * 10) is None
+    assert table.steps('x' * 10) is None
+    assert (table.lru_cache_hits, table.lru_cache_misses) == (1, 1)
@@ -0,0 +1,57 @@
+"""
+ida_move_ordering only changes the order the children are searched in
+"""
+
+import pytest
+
+SCRAMBLES = (
+    ("Fw'", "Dw2", "Lw'", "Rw2", "Dw", "Uw2"),
+    ("Fw'", "Lw'", "Dw'", "Bw", "Uw", "Uw2"),
+    ("Lw", "Uw'", "Lw'", "Dw", "Fw", "Fw2"),
+    ("Bw'", "Rw", "Bw'", "Dw'", "Bw", "Rw2"),
+)
+
+
+def count_heuristic_calls(table):
+    """
+    Count the calls to the heuristic() of our prune table
+    """
+    pt = table.prune_tables[0]
+    heuristic = pt.heuristic
+    calls = [0]
+
+    def counted_heuristic(*args, **kwargs):
+        calls[0] += 1
+        return heuristic(*args, **kwargs)
+
+    pt.heuristic = counted_heuristic
+    return calls
+
+
+@pytest.mark.parametrize('ida_engine', ('recursive', 'iterative'))
+@pytest.mark.parametrize('scramble', SCRAMBLES)
+def test_same_solution_length(ulr_centers_stage, ida_engine, scramble):
+    table = ulr_centers_stage(scramble, ida_engine=ida_engine)
+    assert table.solve()
+
+    ordered_table = ulr_centers_stage(scramble, ida_engine=ida_engine, ida_move_ordering=True)
+    assert ordered_table.solve()
+
+    assert ordered_table.state() == table.state()
+    assert len(ordered_table.parent.solution) == len(table.parent.solution)
+
+
+@pytest.mark.parametrize('ida_engine', ('recursive', 'iterative'))
+def test_heuristic_looked_up_once_per_node(ulr_centers_stage, ida_engine):
+    """
+    The heuristic of a child is looked up when the children are ordered, the
+    search of the child must not look it up again
+    """
+    table = ulr_centers_stage(SCRAMBLES[1], ida_engine=ida_engine, ida_move_ordering=True)
+    calls = count_heuristic_calls(table)
+    assert table.solve()
+
+    # Every node we visited is a child that was ordered (but the root), some
+    # of the ordered children are never visited
+    assert table.total_ida_count > 1000
+    assert table.total_ida_count <= calls[0] < 1.5 * table.total_ida_count
@@ -0,0 +1,61 @@
+"""
+move_successors drops the moves that cannot lead anywhere new, every two
+move sequence must still be reachable via the moves that are left
+"""
+
+from rubikscubennnsolver.RubiksCube444 import moves_444, rotate_444
+import itertools
+
+
+def full_move_table(ulr_centers_stage):
+    table = ulr_centers_stage(("Rw", "U", "Fw'", "L2", "Dw"))
+    table.moves_all = list(moves_444)
+    table.build_move_successors()
+    return table
+
+
+def test_same_face_and_layer_is_dropped(ulr_centers_stage):
+    table = full_move_table(ulr_centers_stage)
+
+    for (prev_step_id, successors) in enumerate(table.move_successors[:-1]):
+        assert prev_step_id not in successors
+        assert all([table.move_layer[step_id] != table.move_layer[prev_step_id] for step_id in successors])
+
+    assert table.move_successors[-1] == tuple(range(len(table.moves_all)))
+
+
+def test_commuting_moves_are_tried_in_one_order(ulr_centers_stage):
+    table = full_move_table(ulr_centers_stage)
+    successors = table.move_successors
+
+    # U D and D U are the same, only one of them is tried
+    u = table.moves_all.index("U")
+    d = table.moves_all.index("D")
+    uw = table.moves_all.index("Uw")
+    assert (d in successors[u]) != (u in successors[d])
+    assert (d in successors[uw]) != (uw in successors[d])
+
+    # U F and F U are not
+    f = table.moves_all.index("F")
+    assert f in successors[u] and u in successors[f]
+
+
+def test_every_two_move_state_is_reachable(ulr_centers_stage):
+    table = full_move_table(ulr_centers_stage)
+    moves_all = table.moves_all
+    state = table.parent.state[:]
+    reachable = set([tuple(state)])
+
+    for (step_id, step) in enumerate(moves_all):
+        one_move = rotate_444(state, step)
+        reachable.add(tuple(one_move))
+
+        for next_step_id in table.move_successors[step_id]:
+            reachable.add(tuple(rotate_444(one_move, moves_all[next_step_id])))
+
+    for (step, next_step) in itertools.product(moves_all, repeat=2):
+        assert tuple(rotate_444(rotate_444(state, step), next_step)) in reachable, (step, next_step)
+
+    # and the successors cut out a good part of the tree
+    pairs = sum([len(successors) for successors in table.move_successors[:-1]])
+    assert pairs < 0.85 * len(moves_all) ** 2
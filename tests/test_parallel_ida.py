@@ -0,0 +1,41 @@
+"""
+The parallel IDA search uses the solution from the lowest numbered subtree
+so it must find the same solution as the serial search, no matter which
+worker finishes first
+"""
+
+import pytest
+
+SCRAMBLES = (
+    ("Lw", "Rw2", "Uw'", "Dw'", "Fw", "Uw'"),
+    ("Fw'", "Lw2", "Fw'", "Uw2", "Rw", "Dw'"),
+    ("Dw", "Rw'", "Bw2", "Rw", "Uw2", "Lw"),
+)
+
+
+@pytest.mark.parametrize('scramble', SCRAMBLES)
+def test_same_solution_as_serial(ulr_centers_stage, scramble):
+    table = ulr_centers_stage(scramble)
+    assert table.solve()
+
+    parallel_table = ulr_centers_stage(scramble, parallel_ida_workers=3)
+    ida_search_parallel = parallel_table.ida_search_parallel
+    thresholds = []
+
+    def counted_ida_search_parallel(threshold, executor, found_index):
+        thresholds.append(threshold)
+        return ida_search_parallel(threshold, executor, found_index)
+
+    parallel_table.ida_search_parallel = counted_ida_search_parallel
+    assert parallel_table.solve()
+
+    # the thresholds were searched in parallel
+    assert thresholds
+    assert parallel_table.parent.solution == table.parent.solution
+    assert parallel_table.parent.state == table.parent.state
+
+
+def test_one_worker_is_serial(ulr_centers_stage):
+    table = ulr_centers_stage(SCRAMBLES[0], parallel_ida_workers=1)
+    table.ida_search_parallel = None
+    assert table.solve()
@@ -0,0 +1,67 @@
+"""
+preload_cache() must give the same steps() whether the table is preloaded
+as a dict or as a CompactRows
+"""
+
+from conftest import write_table
+from rubikscubennnsolver.LookupTable import CompactRows, LookupTable, convert_to_binary_table, lookup_table_registry
+import random
+import sys
+
+
+def random_rows(count, seed):
+    rng = random.Random(seed)
+    rows = {}
+
+    while len(rows) < count:
+        state = ''.join([rng.choice('ULFR') for x in range(10)])
+        rows[state] = ' '.join([rng.choice(("U", "L'", "F2", "Rw", "Uw'")) for x in range(rng.randint(1, 6))])
+
+    return rows
+
+
+def probes(rows, seed):
+    """
+    Every state in the table, some that are not and some of the wrong width
+    """
+    rng = random.Random(seed)
+    result = list(rows.keys())
+    result.extend([''.join([rng.choice('ULFR') for x in range(10)]) for y in range(500)])
+    result.extend(['', 'UUU', 'U' * 11, min(rows)[:9], max(rows) + 'U'])
+    return result
+
+
+def preloaded_table(cube, rows, preload_mode):
+    lookup_table_registry.clear()
+    table = LookupTable(cube, 'lookup-table-4x4x4-test.txt', 'x', linecount=len(rows))
+    table.preload_cache(preload_mode)
+    return table
+
+
+def test_compact_matches_dict(table_dir, cube):
+    rows = random_rows(3000, 1)
+    write_table('lookup-table-4x4x4-test.txt', rows)
+    dict_table = preloaded_table(cube, rows, 'dict')
+    compact_table = preloaded_table(cube, rows, 'compact')
+    assert isinstance(compact_table.cache, CompactRows)
+
+    for state in probes(rows, 2):
+        assert compact_table.steps(state) == dict_table.steps(state), state
+
+    # the point of CompactRows
+    assert len(compact_table.cache.rows) < sys.getsizeof(dict_table.cache)
+
+
+def test_compact_from_binary_table(table_dir, cube):
+    """
+    A sorted .bin table is used as the CompactRows buffer as it is
+    """
+    rows = random_rows(3000, 3)
+    write_table('lookup-table-4x4x4-test.txt', rows)
+    dict_table = preloaded_table(cube, rows, 'dict')
+    convert_to_binary_table('lookup-table-4x4x4-test.txt')
+    compact_table = preloaded_table(cube, rows, 'compact')
+    assert compact_table.binary is not None
+
+    for state in probes(rows, 4):
+        assert compact_table.steps(state) == dict_table.steps(state), state
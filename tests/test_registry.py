@@ -0,0 +1,50 @@
+"""
+Every table for the same file shares one opened copy of it, each table
+still looks at its own cube
+"""
+
+from conftest import UD_CENTERS_STAGED, LookupTableUDCentersStage, build_ud_centers_table
+from rubikscubennnsolver.LookupTable import lookup_table_registry
+from rubikscubennnsolver.RubiksCube444 import RubiksCube444, solved_444
+
+
+def scrambled_cube(*steps):
+    cube = RubiksCube444(solved_444, 'URFDLB')
+
+    for step in steps:
+        cube.rotate(step)
+
+    return cube
+
+
+def test_one_handle_per_filename(table_dir, cube):
+    rows = build_ud_centers_table(cube)
+    first = LookupTableUDCentersStage(scrambled_cube("Rw"), len(rows))
+    second = LookupTableUDCentersStage(scrambled_cube("Fw'", "Uw2"), len(rows))
+
+    assert second.fh_txt is first.fh_txt
+    assert second.mm is first.mm
+    assert second.state() != first.state()
+    assert first.steps() == rows[first.state()].split()
+    assert second.steps() == rows[second.state()].split()
+
+
+def test_preloaded_once(table_dir, cube):
+    rows = build_ud_centers_table(cube)
+    first = LookupTableUDCentersStage(scrambled_cube("Rw"), len(rows))
+    first.preload_cache()
+
+    second = LookupTableUDCentersStage(scrambled_cube("Fw'", "Uw2"), len(rows))
+    second.preload_cache()
+    assert second.cache is first.cache
+    assert second.steps() == rows[second.state()].split()
+
+
+def test_clear_reopens(table_dir, cube):
+    rows = build_ud_centers_table(cube)
+    first = LookupTableUDCentersStage(cube, len(rows))
+    lookup_table_registry.clear()
+    second = LookupTableUDCentersStage(cube, len(rows))
+
+    assert second.fh_txt is not first.fh_txt
+    assert second.state() == first.state() == UD_CENTERS_STAGED
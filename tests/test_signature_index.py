@@ -0,0 +1,89 @@
+"""
+The signature index only tells us where to read, the edges tables must
+return the same lines with or without it
+"""
+
+from conftest import write_table
+from rubikscubennnsolver.LookupTable import LookupTable, lookup_table_registry
+import os
+import random
+
+TABLE = 'lookup-table-4x4x4-test-edges.txt'
+SIGNATURE_WIDTH = 8
+
+
+def random_rows(count, seed):
+    rng = random.Random(seed)
+    rows = {}
+
+    # Some signatures have no rows
+    signatures = rng.sample(range(1 << SIGNATURE_WIDTH), 150)
+
+    while len(rows) < count:
+        signature = '{0:08b}'.format(rng.choice(signatures))
+        state = signature + '_' + ''.join([rng.choice('abcdefgh') for x in range(6)])
+        rows[state] = ' '.join([rng.choice(("U", "L'", "F2", "Rw")) for x in range(rng.randint(1, 5))])
+
+    return rows
+
+
+def open_tables(cube, rows):
+    """
+    Return a table that uses the signature index and one that does not
+    """
+    lookup_table_registry.clear()
+    table = LookupTable(cube, TABLE, 'x', linecount=len(rows))
+    lookup_table_registry.clear()
+    no_index_table = LookupTable(cube, TABLE, 'x', linecount=len(rows))
+    no_index_table.use_signature_index = lambda signature_width: False
+    return (table, no_index_table)
+
+
+def check_signatures(table, no_index_table):
+    for signature in range(1 << SIGNATURE_WIDTH):
+        signature = '{0:08b}'.format(signature)
+        assert table.find_edge_entries_with_signature(signature) == no_index_table.find_edge_entries_with_signature(signature), signature
+
+    for signature in ('00000000', '10000000', '00010010', '01101000', '11111110'):
+        assert (sorted(table.find_edge_entries_with_loose_signature(signature)) ==
+                sorted(no_index_table.find_edge_entries_with_loose_signature(signature))), signature
+
+
+def test_same_lines(table_dir, cube):
+    rows = random_rows(3000, 1)
+    write_table(TABLE, rows)
+    (table, no_index_table) = open_tables(cube, rows)
+    check_signatures(table, no_index_table)
+    assert table.signature_index_width == SIGNATURE_WIDTH
+    assert os.path.exists('lookup-table-4x4x4-test-edges.signature-index')
+
+    # and again with the index loaded from the file
+    (table, no_index_table) = open_tables(cube, rows)
+    check_signatures(table, no_index_table)
+
+
+def test_rebuilt_table_rebuilds_index(table_dir, cube):
+    rows = random_rows(3000, 2)
+    write_table(TABLE, rows)
+    (table, no_index_table) = open_tables(cube, rows)
+    check_signatures(table, no_index_table)
+    size = os.path.getsize(TABLE)
+    mtime = os.path.getmtime(TABLE)
+
+    # Give the rows other signatures, the table is the same size but the
+    # blocks of rows for each signature have moved
+    rng = random.Random(3)
+    mapping = list(range(1 << SIGNATURE_WIDTH))
+    rng.shuffle(mapping)
+    moved_rows = {}
+
+    for (state, steps) in rows.items():
+        signature = '{0:08b}'.format(mapping[int(state[:SIGNATURE_WIDTH], 2)])
+        moved_rows[signature + state[SIGNATURE_WIDTH:]] = steps
+
+    write_table(TABLE, moved_rows)
+    os.utime(TABLE, (mtime + 10, mtime + 10))
+    assert os.path.getsize(TABLE) == size
+
+    (table, no_index_table) = open_tables(cube, moved_rows)
+    check_signatures(table, no_index_table)
@@ -0,0 +1,93 @@
+"""
+A sparse index only narrows the binary search, the lookups must be the same
+with or without one. Opening a table never builds the .idx, that is done up
+front by utils/build-sparse-index.py or lt_warm_all().
+"""
+
+from conftest import write_table
+from rubikscubennnsolver.LookupTable import LookupTable, build_sparse_index, convert_to_binary_table, lookup_table_registry
+import os
+import random
+
+TABLE = 'lookup-table-4x4x4-test.txt'
+
+
+def random_rows(count, seed):
+    rng = random.Random(seed)
+    rows = {}
+
+    while len(rows) < count:
+        state = ''.join([rng.choice('ULFRBD') for x in range(12)])
+        rows[state] = ' '.join([rng.choice(("U", "L'", "F2", "Rw")) for x in range(rng.randint(1, 4))])
+
+    return rows
+
+
+def open_table(cube, linecount):
+    lookup_table_registry.clear()
+
+    # 40 keys of 12 bytes, one every 50 rows
+    return LookupTable(cube, TABLE, 'x', linecount=linecount, sparse_index_budget=12 * 40)
+
+
+def check_lookups(table, rows, absent):
+    for (state, steps) in rows.items():
+        assert table.steps(state) == steps.split(), state
+
+    for state in absent:
+        assert table.steps(state) is None, state
+
+
+def test_opening_a_table_does_not_build_the_index(table_dir, cube):
+    rows = random_rows(2000, 1)
+    write_table(TABLE, rows)
+    absent = sorted(set(random_rows(500, 2)) - set(rows))
+
+    table = open_table(cube, len(rows))
+    assert table.sparse_index is None
+    check_lookups(table, rows, absent)
+    assert not os.path.exists('lookup-table-4x4x4-test.idx')
+
+    table.build_sparse_index()
+    assert os.path.exists('lookup-table-4x4x4-test.idx')
+    assert table.sparse_index_stride == 50
+    check_lookups(table, rows, absent)
+
+    # The next table for the file loads the .idx
+    table = open_table(cube, len(rows))
+    assert table.sparse_index is not None
+    check_lookups(table, rows, absent)
+
+
+def test_binary_table(table_dir, cube):
+    rows = random_rows(2000, 3)
+    write_table(TABLE, rows)
+    absent = sorted(set(random_rows(500, 4)) - set(rows))
+    filename_bin = convert_to_binary_table(TABLE)
+    assert build_sparse_index(filename_bin, 12 * 40) == 'lookup-table-4x4x4-test.bin.idx'
+
+    table = open_table(cube, len(rows))
+    assert table.binary is not None
+    assert table.sparse_index is not None
+    check_lookups(table, rows, absent)
+
+
+def test_stale_index_is_not_used(table_dir, cube):
+    """
+    A table rebuilt with the same linecount is the same size, the .idx of the
+    old table would send lookups to the wrong rows
+    """
+    old_rows = random_rows(2000, 5)
+    write_table(TABLE, dict([(state, "U") for state in old_rows]))
+    build_sparse_index(TABLE, 12 * 40)
+    size = os.path.getsize(TABLE)
+    mtime = os.path.getmtime(TABLE)
+
+    rows = random_rows(2000, 6)
+    write_table(TABLE, dict([(state, "L") for state in rows]))
+    os.utime(TABLE, (mtime + 10, mtime + 10))
+    assert os.path.getsize(TABLE) == size
+
+    table = open_table(cube, len(rows))
+    assert table.sparse_index is None
+    check_lookups(table, dict([(state, "L") for state in rows]), [])
@@ -0,0 +1,92 @@
+"""
+A symmetry reduced table only has the rows for the canonical states, the
+steps for every other state come from conjugating the canonical steps
+"""
+
+from conftest import LookupTableUDCentersStage, UD_CENTERS_STAGED, UD_CENTERS_TABLE, WIDE_MOVES, build_ud_centers_table
+from rubikscubennnsolver.LookupTable import LookupTableIDA, lookup_table_registry
+from rubikscubennnsolver.RubiksCube444 import RubiksCube444, centers_444, moves_444, rotate_444, solved_444
+from rubikscubennnsolver.RubiksSide import SolveError
+from rubikscubennnsolver.Symmetry import symmetry_all, symmetry_UD_axis
+import importlib.util
+import os
+import pytest
+import random
+
+def symmetric_copy(symmetry, index, state):
+    (permutation, recolor) = symmetry.transforms(4, rotate_444)[index]
+    return [recolor.get(state[x], state[x]) for x in permutation]
+
+
+class LookupTableUDCentersStageReduced(LookupTableUDCentersStage):
+    symmetry = symmetry_UD_axis
+
+
+class LookupTableIDAUDCentersStage(LookupTableIDA):
+    state_positions = centers_444
+    state_pattern = LookupTableUDCentersStage.state_pattern
+    symmetry = symmetry_UD_axis
+
+    def __init__(self, parent, moves_illegal):
+        LookupTableIDA.__init__(self, parent, UD_CENTERS_TABLE, UD_CENTERS_STAGED, moves_444, moves_illegal, (), linecount=1, max_depth=3)
+
+    def state(self):
+        return self.cube_pattern()
+
+
+@pytest.mark.parametrize('symmetry', (symmetry_all, symmetry_UD_axis))
+def test_conjugate_steps(symmetry):
+    """
+    Turning the symmetric copy of a cube is the same as turning the cube by
+    the conjugate and then taking the copy
+    """
+    rng = random.Random(1)
+    state = RubiksCube444(solved_444, 'URFDLB').state[:]
+
+    for step in [rng.choice(moves_444) for x in range(20)]:
+        state = rotate_444(state, step)
+
+    for index in range(len(symmetry)):
+        for step in moves_444:
+            (conjugate, ) = symmetry.conjugate_steps(index, [step], 4, rotate_444)
+            assert symmetric_copy(symmetry, index, rotate_444(state, conjugate)) == rotate_444(symmetric_copy(symmetry, index, state), step)
+
+
+def test_reduced_table_round_trip(table_dir, cube):
+    rows = build_ud_centers_table(cube)
+    spec = importlib.util.spec_from_file_location('reduce_symmetry', os.path.join(os.path.dirname(__file__), '..', 'utils', 'reduce-symmetry.py'))
+    reduce_symmetry = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(reduce_symmetry)
+
+    table = LookupTableUDCentersStage(cube, len(rows))
+    table.symmetry = symmetry_UD_axis
+    reduce_symmetry.reduce_symmetry(cube, table)
+    assert os.path.exists(UD_CENTERS_TABLE + '.full')
+
+    lookup_table_registry.clear()
+    rng = random.Random(2)
+
+    for x in range(50):
+        scrambled = RubiksCube444(solved_444, 'URFDLB')
+        scramble = [rng.choice(WIDE_MOVES) for y in range(rng.randint(1, 3))]
+
+        for step in scramble:
+            scrambled.rotate(step)
+
+        scrambled.solution = []
+        reduced = LookupTableUDCentersStageReduced(scrambled, len(rows))
+        assert reduced.linecount < len(rows)
+        reduced.solve()
+        assert reduced.state() == UD_CENTERS_STAGED, scramble
+        assert len(scrambled.solution) <= len(scramble)
+
+
+def test_moves_must_be_closed(table_dir, cube):
+    build_ud_centers_table(cube)
+
+    # Every UD axis symmetry maps the moves to the moves
+    LookupTableIDAUDCentersStage(cube, ())
+
+    # A y maps Rw to Bw so without Lw/Bw/Dw the moves are not closed
+    with pytest.raises(SolveError):
+        LookupTableIDAUDCentersStage(cube, ("Lw", "Lw'", "Lw2", "Bw", "Bw'", "Bw2", "Dw", "Dw'", "Dw2"))
@@ -0,0 +1,76 @@
+"""
+The telemetry of a LookupTableIDA.solve() must add up to what the search did
+"""
+
+import json
+
+SCRAMBLE = ("Fw'", "Lw2", "Fw'", "Uw2", "Rw", "Dw'")
+
+
+def test_counters(ulr_centers_stage):
+    table = ulr_centers_stage(SCRAMBLE)
+    pt = table.prune_tables[0]
+    heuristic_calls = pt.heuristic_calls
+    assert table.solve()
+
+    assert len(table.parent.telemetry) == 1
+    telemetry = table.parent.telemetry_dicts()[0]
+    assert telemetry['phase'] == str(table)
+    assert telemetry['engine'] == 'recursive'
+    assert telemetry['nodes'] == table.total_ida_count
+    assert telemetry['nodes'] == sum([threshold['nodes'] for threshold in telemetry['thresholds']])
+    assert telemetry['solution_depth'] == len(table.parent.solution)
+    assert telemetry['degraded'] == []
+
+    thresholds = [threshold['threshold'] for threshold in telemetry['thresholds']]
+    assert thresholds == list(range(thresholds[0], thresholds[0] + len(thresholds)))
+
+    assert telemetry['prune_tables'][str(pt)]['heuristic_calls'] == pt.heuristic_calls - heuristic_calls
+    assert telemetry['prune_tables'][str(pt)]['heuristic_calls'] > 0
+
+    # we end on a hit in our own table
+    assert telemetry['table_probes']['hits'] >= 1
+    assert json.loads(table.parent.telemetry_json()) == [json.loads(json.dumps(telemetry))]
+
+
+def test_counters_are_per_search(ulr_centers_stage):
+    table = ulr_centers_stage(SCRAMBLE)
+    assert table.solve()
+    first = table.parent.telemetry_dicts()[0]
+
+    # Search again from the same scramble
+    table.parent.state = table.original_state[:]
+    table.parent.solution = []
+    assert table.solve()
+    second = table.parent.telemetry_dicts()[1]
+
+    pt = str(table.prune_tables[0])
+    assert second['prune_tables'][pt] == first['prune_tables'][pt]
+    assert second['nodes'] == first['nodes']
+
+
+def test_parallel_workers_are_counted(ulr_centers_stage):
+    serial_table = ulr_centers_stage(SCRAMBLE)
+    assert serial_table.solve()
+    serial = serial_table.parent.telemetry_dicts()[0]
+
+    table = ulr_centers_stage(SCRAMBLE, parallel_ida_workers=2)
+    pt = table.prune_tables[0]
+    heuristic_calls = pt.heuristic_calls
+    assert table.solve()
+    telemetry = table.parent.telemetry_dicts()[0]
+
+    # most of the heuristic calls were made by the workers
+    parent_calls = pt.heuristic_calls - heuristic_calls
+    assert telemetry['prune_tables'][str(pt)]['heuristic_calls'] > 2 * parent_calls
+    assert telemetry['nodes'] == table.total_ida_count
+    assert telemetry['solution_depth'] == serial['solution_depth']
+
+
+def test_timing(ulr_centers_stage):
+    table = ulr_centers_stage(SCRAMBLE, telemetry_timing=True)
+    assert table.solve()
+    seconds = table.parent.telemetry_dicts()[0]['seconds']
+    assert set(seconds.keys()) == set(('heuristic', 'rotate', 'lookup', 'total'))
+    assert all([value >= 0 for value in seconds.values()])
+    assert seconds['heuristic'] > 0
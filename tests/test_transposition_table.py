@@ -0,0 +1,51 @@
+"""
+The TranspositionTable must stay within the bytes it is given no matter how
+many states the search stores in it
+"""
+
+from rubikscubennnsolver.TranspositionTable import TranspositionTable
+import pytest
+
+
+@pytest.mark.parametrize('max_bytes', (20, 1000, 64 * 1024))
+def test_memory_budget(max_bytes):
+    tt = TranspositionTable(max_bytes)
+    used = (len(tt.fingerprints) * tt.fingerprints.itemsize) + len(tt.depths) + len(tt.bounds)
+    assert used <= max_bytes
+    assert tt.capacity % 2 == 0
+
+    for index in range(tt.capacity * 3):
+        tt.store('state%d' % index, index % 20, index % 7)
+
+    assert len(tt) <= tt.capacity
+    assert len(tt.fingerprints) == tt.capacity
+    assert len(tt.depths) == tt.capacity
+    assert len(tt.bounds) == tt.capacity
+
+
+def test_too_small():
+    with pytest.raises(AssertionError):
+        TranspositionTable(10)
+
+
+def test_keeps_the_larger_bound():
+    tt = TranspositionTable(1024)
+    tt.store('UUUULLLL', 2, 5)
+    tt.store('UUUULLLL', 3, 4)
+    assert tt.get('UUUULLLL') == 5
+    tt.store('UUUULLLL', 1, 7)
+    assert tt.get('UUUULLLL') == 7
+    assert len(tt) == 1
+
+
+def test_replaces_the_lowest_bound():
+    # One bucket of two slots
+    tt = TranspositionTable(20)
+    assert tt.capacity == 2
+    tt.store('a', 1, 5)
+    tt.store('b', 1, 3)
+    tt.store('c', 1, 4)
+    assert tt.get('a') == 5
+    assert tt.get('b') is None
+    assert tt.get('c') == 4
+    assert tt.replacements == 1
@@ -9,7 +9,7 @@ This is a work in progress
 """
 
 from rubikscubennnsolver import ImplementThis, SolveError, StuckInALoop
-from rubikscubennnsolver.LookupTable import NoSteps
+from rubikscubennnsolver.LookupTable import LookupTableIDA, NoSteps
 from math import sqrt
 import argparse
 import logging
@@ -202,6 +202,9 @@ action.add_argument('--tsai', default=False, help='Use the tsai solver, 4x4x4 on
 
 parser.add_argument('--colormap', default=None, type=str, help='Colors for sides U, L, etc')
 parser.add_argument('--order', type=str, default='URFDLB', help='order of sides in --state, default kociemba URFDLB')
+parser.add_argument('--deadline', type=float, default=None, help='seconds to find a solution in, the IDA searches that run out of time settle for a longer solution')
+parser.add_argument('--parallel-ida-workers', type=int, default=None, help='search each IDA threshold with this many processes, only worth it if nothing else is using the CPUs')
+parser.add_argument('--adaptive-prune-tables', default=False, action='store_true', help='evaluate the IDA prune tables cheapest and most useful first and cache the results')
 parser.add_argument('--state', type=str, help='Cube state',
 
 # no longer used
@@ -264,6 +267,12 @@ args = parser.parse_args()
 if args.debug:
     log.setLevel(logging.DEBUG)
 
+if args.parallel_ida_workers:
+    LookupTableIDA.parallel_ida_workers = args.parallel_ida_workers
+
+if args.adaptive_prune_tables:
+    LookupTableIDA.adaptive_prune_tables = True
+
 # no longer used
 #if args.test:
 #    cube = RubiksCube444(solved_444, args.order, args.colormap, avoid_pll=True, debug=args.debug)
@@ -376,7 +385,15 @@ try:
     cube.www_header()
     cube.www_write_cube("Initial Cube")
 
-    cube.solve()
+    cube.solve(deadline=args.deadline)
+
+    if cube.gave_up():
+        log.info("Partial Cube")
+        cube.print_cube()
+        print("ran out of time in %s, see --deadline" %
+            ', '.join([degraded['phase'] for degraded in cube.degraded_phases if degraded['fallback'] == 'gave up']))
+        sys.exit(1)
+
     log.info("Final Cube")
     cube.print_cube()
     cube.print_solution()
@@ -0,0 +1,124 @@
+#!/usr/bin/env python3
+
+"""
+Compare the nodes-per-sec of the LookupTableIDA search engines
+
+    ./utils/benchmark-ida.py --size 5x5x5 --count 5
+    ./utils/benchmark-ida.py --size 7x7x7 --count 2
+    ./utils/benchmark-ida.py --size 4x4x4 --count 5 --engines iterative bidirectional
+
+The cubes come from utils/test_cubes.json. Each engine is run in its own
+process so they all start with a cold LookupTableRegistry. The IDA engines
+must find identical solutions, 'bidirectional' finds the shortest way to
+each table's state_target so its solutions can differ from the others and
+we compare the solution lengths instead.
+"""
+
+from rubikscubennnsolver.LookupTable import LookupTableIDA
+from rubikscubennnsolver.RubiksCube444 import RubiksCube444, solved_444
+from rubikscubennnsolver.RubiksCube555 import RubiksCube555, solved_555
+from rubikscubennnsolver.RubiksCube777 import RubiksCube777, solved_777
+import argparse
+import json
+import logging
+import os
+import subprocess
+import sys
+import time
+
+log = logging.getLogger(__name__)
+
+
+def benchmark(size, engine, count, test_cubes):
+    """
+    Solve count cubes with the engine and return the nodes and seconds spent
+    in each of the IDA tables along with the solutions
+    """
+    stats = {}
+    original_solve = LookupTableIDA.solve
+
+    def timed_solve(self, *args, **kwargs):
+        self.ida_engine = engine
+        self.total_ida_count = 0
+        start = time.time()
+
+        try:
+            return original_solve(self, *args, **kwargs)
+        finally:
+            name = self.__class__.__name__
+            stats.setdefault(name, [0, 0.0])
+            stats[name][0] += self.total_ida_count
+            stats[name][1] += time.time() - start
+
+    LookupTableIDA.solve = timed_solve
+
+    if size == '4x4x4':
+        cube = RubiksCube444(solved_444, 'URFDLB')
+    elif size == '5x5x5':
+        cube = RubiksCube555(solved_555, 'URFDLB')
+    else:
+        cube = RubiksCube777(solved_777, 'URFDLB')
+
+    with open(test_cubes, 'r') as fh:
+        kociemba_strings = json.load(fh)[size][:count]
+
+    solutions = []
+
+    for kociemba_string in kociemba_strings:
+        cube.solution = []
+        cube.load_state(kociemba_string, 'URFDLB')
+        cube.solve()
+        solutions.append(' '.join(cube.solution))
+
+    return {
+        'engine': engine,
+        'stats': stats,
+        'solutions': solutions,
+    }
+
+
+if __name__ == '__main__':
+    engines = ('recursive', 'iterative', 'coordinates', 'bidirectional')
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--size', type=str, default='5x5x5', choices=('4x4x4', '5x5x5', '7x7x7'))
+    parser.add_argument('--count', type=int, default=5, help='number of test cubes to solve')
+    parser.add_argument('--test-cubes', type=str, default=os.path.join(os.path.dirname(os.path.abspath(__file__)), 'test_cubes.json'))
+    parser.add_argument('--engines', type=str, nargs='+', default=['recursive', 'iterative'], choices=engines, help='the engines to compare')
+    parser.add_argument('--engine', type=str, default=None, choices=engines, help='only benchmark this engine')
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.WARNING,
+                        format='%(asctime)s %(filename)16s %(levelname)8s: %(message)s')
+    log = logging.getLogger(__name__)
+
+    if args.engine:
+        print(json.dumps(benchmark(args.size, args.engine, args.count, args.test_cubes)))
+        sys.exit(0)
+
+    results = {}
+
+    for engine in args.engines:
+        output = subprocess.check_output([sys.executable, __file__, '--size', args.size, '--count', str(args.count),
+                                          '--test-cubes', args.test_cubes, '--engine', engine])
+        results[engine] = json.loads(output.decode('utf-8'))
+
+    ida_engines = [engine for engine in args.engines if engine != 'bidirectional']
+
+    for engine in ida_engines[1:]:
+        if results[engine]['solutions'] != results[ida_engines[0]]['solutions']:
+            print("ERROR: the %s and %s engines found different solutions" % (ida_engines[0], engine))
+            sys.exit(1)
+
+    print("%-45s %-14s %12s %10s %14s" % ('table', 'engine', 'nodes', 'secs', 'nodes-per-sec'))
+
+    for name in sorted(results[args.engines[0]]['stats'].keys()):
+        for engine in args.engines:
+            (nodes, secs) = results[engine]['stats'].get(name, (0, 0.0))
+            print("%-45s %-14s %12d %10.2f %14d" % (name, engine, nodes, secs, int(nodes / secs) if secs else 0))
+
+    print("")
+    print("%-14s %16s" % ('engine', 'avg solution'))
+
+    for engine in args.engines:
+        lengths = [len(solution.split()) for solution in results[engine]['solutions']]
+        print("%-14s %16.2f" % (engine, float(sum(lengths)) / len(lengths) if lengths else 0))
@@ -0,0 +1,104 @@
+#!/usr/bin/env python3
+
+"""
+Compare the memory and lookup latency of the LookupTable.preload_cache() modes
+
+    ./utils/benchmark-preload.py lookup-table-4x4x4-step10-ULFRBD-centers-stage.txt
+
+Each mode is run in its own process so one mode's memory does not skew the
+RSS numbers of another.
+"""
+
+from rubikscubennnsolver import RubiksCube
+from rubikscubennnsolver.LookupTable import LookupTable
+import argparse
+import json
+import logging
+import os
+import random
+import re
+import subprocess
+import sys
+import time
+
+log = logging.getLogger(__name__)
+
+
+def get_rss():
+    """
+    Our current resident set size in bytes
+    """
+    with open('/proc/self/statm', 'r') as fh:
+        return int(fh.read().split()[1]) * os.sysconf('SC_PAGE_SIZE')
+
+
+def benchmark(filename, mode, lookups):
+    size = int(re.search(r'lookup-table-(\d+)x', filename).group(1))
+    squares_per_side = size * size
+    cube = RubiksCube(''.join([side * squares_per_side for side in 'URFDLB']), 'URFDLB')
+
+    # Count the lines and grab some states to look up.  Half of the lookups
+    # are for states in the table, half are for states that are not.
+    with open(filename, 'r') as fh:
+        states = [line.split(':')[0] for line in fh]
+
+    linecount = len(states)
+    alphabet = sorted(set(states[0]))
+    random.seed(1234)
+    states_to_find = []
+
+    for x in range(lookups):
+        if x % 2:
+            states_to_find.append(random.choice(states))
+        else:
+            states_to_find.append(''.join(random.choice(alphabet) for y in range(len(states[0]))))
+
+    del states
+
+    table = LookupTable(cube, filename, 'TBD', linecount=linecount)
+    rss_before = get_rss()
+    start = time.time()
+    table.preload_cache(mode)
+    preload_secs = time.time() - start
+    rss_after = get_rss()
+
+    start = time.time()
+    for state in states_to_find:
+        table.steps(state)
+    lookup_secs = time.time() - start
+
+    return {
+        'mode': mode,
+        'linecount': linecount,
+        'preload_secs': preload_secs,
+        'rss_bytes': rss_after - rss_before,
+        'lookup_us': (lookup_secs * 1000000) / lookups,
+    }
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser()
+    parser.add_argument('filename', type=str, help='lookup-table-*.txt file to benchmark')
+    parser.add_argument('--lookups', type=int, default=100000, help='number of lookups to time')
+    parser.add_argument('--mode', type=str, default=None, choices=('dict', 'compact'), help='only benchmark this mode')
+    args = parser.parse_args()
+
+    if not os.path.isfile(args.filename):
+        print("ERROR: %s does not exist" % args.filename)
+        sys.exit(1)
+
+    logging.basicConfig(level=logging.WARNING,
+                        format='%(asctime)s %(filename)16s %(levelname)8s: %(message)s')
+    log = logging.getLogger(__name__)
+
+    if args.mode:
+        print(json.dumps(benchmark(args.filename, args.mode, args.lookups)))
+        sys.exit(0)
+
+    print("%-8s %12s %14s %12s %10s" % ('mode', 'rows', 'RSS', 'preload', 'lookup'))
+
+    for mode in ('dict', 'compact'):
+        output = subprocess.check_output([sys.executable, __file__, args.filename, '--mode', mode, '--lookups', str(args.lookups)])
+        result = json.loads(output.decode('utf-8'))
+        print("%-8s %12d %12.1fMB %11.2fs %8.2fus" % (
+            result['mode'], result['linecount'], result['rss_bytes'] / (1024 * 1024), result['preload_secs'], result['lookup_us']))
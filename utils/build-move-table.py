@@ -0,0 +1,54 @@
+#!/usr/bin/env python3
+
+"""
+Build the move table for a lookup table that declares state_positions and
+state_pattern, see rubikscubennnsolver/Coordinates.py
+
+    ./utils/build-move-table.py --size 4x4x4 lt_UD_centers_stage
+    ./utils/build-move-table.py --size 5x5x5 lt_UD_T_centers_stage lt_UD_X_centers_stage
+
+The move table is saved next to the lookup table as a .move-table file. It
+must be rebuilt whenever the lookup table changes, the IDA searches ignore a
+stale move table and fall back to the slower ProjectionCoordinate.
+"""
+
+from rubikscubennnsolver.RubiksCube444 import RubiksCube444, moves_444, rotate_444, solved_444
+from rubikscubennnsolver.RubiksCube555 import RubiksCube555, moves_555, rotate_555, solved_555
+import argparse
+import logging
+import sys
+
+log = logging.getLogger(__name__)
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--size', type=str, default='4x4x4', choices=('4x4x4', '5x5x5'))
+    parser.add_argument('tables', type=str, nargs='+', help='lookup table attribute of the cube, lt_UD_centers_stage, etc')
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO,
+                        format='%(asctime)s %(filename)16s %(levelname)8s: %(message)s')
+    log = logging.getLogger(__name__)
+
+    if args.size == '4x4x4':
+        cube = RubiksCube444(solved_444, 'URFDLB')
+        moves = moves_444
+        rotate_xxx = rotate_444
+    else:
+        cube = RubiksCube555(solved_555, 'URFDLB')
+        moves = moves_555
+        rotate_xxx = rotate_555
+
+    for name in args.tables:
+        table = getattr(cube, name, None)
+
+        if table is None:
+            print("ERROR: %s does not have a %s table" % (cube.__class__.__name__, name))
+            sys.exit(1)
+
+        if table.state_positions is None or table.state_pattern is None:
+            print("ERROR: %s does not declare state_positions and state_pattern" % table)
+            sys.exit(1)
+
+        table.build_move_table(moves, rotate_xxx)
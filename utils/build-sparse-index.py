@@ -0,0 +1,40 @@
+#!/usr/bin/env python3
+
+"""
+Build the .idx sparse index for a lookup-table-*.txt or lookup-table-*.bin
+file. LookupTable only reads the .idx, it never builds one, so run this for
+every table that has a sparse_index_budget (and again if the table changes).
+The --budget must be the table's sparse_index_budget.
+"""
+
+from rubikscubennnsolver.LookupTable import build_sparse_index
+import argparse
+import logging
+import os
+import sys
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser()
+    parser.add_argument('filename', type=str, help='lookup-table-*.txt or lookup-table-*.bin file to index')
+    parser.add_argument('--budget', type=int, default=16 * 1024 * 1024, help='sparse_index_budget in bytes')
+    args = parser.parse_args()
+
+    # LookupTable uses the .bin if there is one so that is the file to index
+    filename = args.filename
+    filename_bin = filename.replace('.txt', '.bin')
+
+    if filename != filename_bin and os.path.isfile(filename_bin):
+        filename = filename_bin
+
+    if not os.path.isfile(filename):
+        print("ERROR: %s does not exist" % filename)
+        sys.exit(1)
+
+    # setup logging
+    logging.basicConfig(level=logging.INFO,
+                        format='%(asctime)s %(filename)16s %(levelname)8s: %(message)s')
+    log = logging.getLogger(__name__)
+
+    filename_idx = build_sparse_index(filename, args.budget)
+    log.info("%s is %d bytes" % (filename_idx, os.path.getsize(filename_idx)))
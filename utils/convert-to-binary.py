@@ -0,0 +1,37 @@
+#!/usr/bin/env python3
+
+"""
+Convert a lookup-table-*.txt file to the compact lookup-table-*.bin format.
+LookupTable will use the .bin file instead of the .txt file if it exists.
+"""
+
+from rubikscubennnsolver.LookupTable import convert_to_binary_table
+import argparse
+import logging
+import os
+import sys
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser()
+    parser.add_argument('filename', type=str, help='lookup-table-*.txt file to convert')
+    parser.add_argument('--state-target', type=str, default='', help='comma separated list of target states')
+    args = parser.parse_args()
+
+    if not os.path.isfile(args.filename):
+        print("ERROR: %s does not exist" % args.filename)
+        sys.exit(1)
+
+    # setup logging
+    logging.basicConfig(level=logging.INFO,
+                        format='%(asctime)s %(filename)16s %(levelname)8s: %(message)s')
+    log = logging.getLogger(__name__)
+
+    if args.state_target:
+        state_target = args.state_target.split(',')
+    else:
+        state_target = []
+
+    filename_bin = convert_to_binary_table(args.filename, state_target)
+    log.info("%s is %d bytes, %s is %d bytes" %
+        (args.filename, os.path.getsize(args.filename), filename_bin, os.path.getsize(filename_bin)))
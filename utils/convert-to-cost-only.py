@@ -1,5 +1,7 @@
 #!/usr/bin/env python3
 
+from rubikscubennnsolver.LookupTable import convert_to_cost_only_table
+import argparse
 import logging
 import os
 import sys
@@ -7,7 +9,10 @@ import sys
 log = logging.getLogger(__name__)
 
 
-def convert_to_binary(filename):
+def convert_to_hex(filename):
+    """
+    The original .cost-only.txt format, one hex character per state
+    """
     filename_new = filename.replace('.txt', '.cost-only.txt')
     prev_state_int = None
 
@@ -47,15 +52,14 @@ def convert_to_binary(filename):
 
 
 if __name__ == '__main__':
-
-    if len(sys.argv) != 2:
-        print("ERROR: To use './convert-to-cost-only.py FILENAME'")
-        sys.exit(1)
-
-    filename = sys.argv[1]
-
-    if not os.path.isfile(filename):
-        print("ERROR: %s does not exist" % filename)
+    parser = argparse.ArgumentParser()
+    parser.add_argument('filename', type=str, help='lookup-table-*.txt file to convert')
+    parser.add_argument('--hex', default=False, action='store_true',
+                        help='write a .cost-only.txt with one hex character per state instead of a nibble packed .cost-only.bin')
+    args = parser.parse_args()
+
+    if not os.path.isfile(args.filename):
+        print("ERROR: %s does not exist" % args.filename)
         sys.exit(1)
 
     # setup logging
@@ -63,4 +67,7 @@ if __name__ == '__main__':
                         format='%(asctime)s %(filename)16s %(levelname)8s: %(message)s')
     log = logging.getLogger(__name__)
 
-    convert_to_binary(filename)
+    if args.hex:
+        convert_to_hex(args.filename)
+    else:
+        convert_to_cost_only_table(args.filename)
@@ -0,0 +1,60 @@
+#!/usr/bin/env python3
+
+"""
+Convert a lookup table whose states are a k-of-n pattern to a ranked .bin
+table. A ranked table is a dense array indexed by the rank of the state so
+there are no keys to store and no binary search.
+
+./utils/convert-to-ranked.py lookup-table-4x4x4-step11-UD-centers-stage.cost-only.txt
+./utils/convert-to-ranked.py lookup-table-5x5x5-step20-LR-centers-stage.txt --orbits '[[...], [...]]'
+
+The orbits are lists of positions (indexed from the left of the state, or of
+the binary pattern for hex/int states) that are ranked independently.  By
+default every position that is not fixed is in one orbit.
+"""
+
+from rubikscubennnsolver.LookupTable import (
+    convert_cost_only_to_ranked_table,
+    convert_to_ranked_table,
+)
+import argparse
+import json
+import logging
+import os
+import sys
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser()
+    parser.add_argument('filename', type=str, help='lookup-table-*.txt file to convert')
+    parser.add_argument('--state-target', type=str, default='', help='comma separated list of target states')
+    parser.add_argument('--encoding', type=str, default=None, choices=('hex', 'str'), help='how the states are encoded, default is to guess')
+    parser.add_argument('--orbits', type=str, default=None, help='json list of lists of positions')
+    args = parser.parse_args()
+
+    if not os.path.isfile(args.filename):
+        print("ERROR: %s does not exist" % args.filename)
+        sys.exit(1)
+
+    # setup logging
+    logging.basicConfig(level=logging.INFO,
+                        format='%(asctime)s %(filename)16s %(levelname)8s: %(message)s')
+    log = logging.getLogger(__name__)
+
+    if args.orbits:
+        orbits = json.loads(args.orbits)
+    else:
+        orbits = None
+
+    if args.filename.endswith('.cost-only.txt'):
+        filename_bin = convert_cost_only_to_ranked_table(args.filename, orbits)
+    else:
+        if args.state_target:
+            state_target = args.state_target.split(',')
+        else:
+            state_target = []
+
+        filename_bin = convert_to_ranked_table(args.filename, state_target, args.encoding, orbits)
+
+    log.info("%s is %d bytes, %s is %d bytes" %
+        (args.filename, os.path.getsize(args.filename), filename_bin, os.path.getsize(filename_bin)))
@@ -0,0 +1,114 @@
+#!/usr/bin/env python3
+
+"""
+Drop the rows for the non-canonical states of a symmetry from a lookup
+table, see rubikscubennnsolver/Symmetry.py
+
+    ./utils/reduce-symmetry.py --size 5x5x5 --symmetry all lt_ULFRB_centers_solve
+    ./utils/reduce-symmetry.py --size 7x7x7 --symmetry UD-axis lt_LFRB_solve_inner_centers
+
+The table only needs the rows for the canonical states, lookups for every
+other state go through the canonical state. The original .txt is kept as
+.txt.full. Once the table is reduced set its class's symmetry to the same
+symmetry and update its linecount, a table that declares a symmetry must
+only ship the canonical rows.
+
+Each row's state is rebuilt by undoing its steps on a solved cube so this
+only works for tables whose state_target is the state of a solved cube.
+"""
+
+from rubikscubennnsolver import reverse_steps
+from rubikscubennnsolver.LookupTable import LookupTableIDA, get_rotate_xxx
+from rubikscubennnsolver.RubiksCube444 import RubiksCube444, solved_444
+from rubikscubennnsolver.RubiksCube555 import RubiksCube555, solved_555
+from rubikscubennnsolver.RubiksCube777 import RubiksCube777, solved_777
+from rubikscubennnsolver.Symmetry import symmetry_all, symmetry_UD_axis
+import argparse
+import logging
+import os
+import sys
+
+log = logging.getLogger(__name__)
+
+
+def reduce_symmetry(cube, table):
+    rotate_xxx = get_rotate_xxx(cube.size)
+    solved_state = cube.state[:]
+    filename_reduced = table.filename + '.reduced'
+    rows = 0
+    kept = 0
+
+    with open(table.filename, 'r') as fh, open(filename_reduced, 'w') as fh_reduced:
+        for line in fh:
+            (state, steps) = line.rstrip().split(':')
+            cube.state = solved_state[:]
+
+            for step in reverse_steps(steps.split()):
+
+                # reverse_steps() turns U2 into U2'
+                if step.endswith("2'"):
+                    step = step[:-1]
+
+                cube.state = rotate_xxx(cube.state, step)
+
+            if table.state() != state:
+                print("ERROR: undoing %s on a solved cube gives %s instead of %s" % (steps, table.state(), state))
+                sys.exit(1)
+
+            if table.canonical_state() == state:
+                fh_reduced.write(line)
+                kept += 1
+
+            rows += 1
+
+            if rows % 1000000 == 0:
+                log.info("%s: %d rows, kept %d" % (table, rows, kept))
+
+    os.rename(table.filename, table.filename + '.full')
+    os.rename(filename_reduced, table.filename)
+    log.info("%s: kept %d of %d rows (%.1fx smaller), update the linecount to %d" %
+             (table, kept, rows, float(rows) / kept, kept))
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--size', type=str, default='4x4x4', choices=('4x4x4', '5x5x5', '7x7x7'))
+    parser.add_argument('--symmetry', type=str, default='all', choices=('all', 'UD-axis'))
+    parser.add_argument('table', type=str, help='lookup table attribute of the cube, lt_ULFRBD_centers_stage, etc')
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO,
+                        format='%(asctime)s %(filename)16s %(levelname)8s: %(message)s')
+    log = logging.getLogger(__name__)
+
+    if args.size == '4x4x4':
+        cube = RubiksCube444(solved_444, 'URFDLB')
+    elif args.size == '5x5x5':
+        cube = RubiksCube555(solved_555, 'URFDLB')
+    else:
+        cube = RubiksCube777(solved_777, 'URFDLB')
+
+    table = getattr(cube, args.table, None)
+
+    if table is None:
+        print("ERROR: %s does not have a %s table" % (cube.__class__.__name__, args.table))
+        sys.exit(1)
+
+    if table.symmetry is not None:
+        print("ERROR: %s already declares a symmetry, it has been reduced" % table)
+        sys.exit(1)
+
+    table.symmetry = symmetry_all if args.symmetry == 'all' else symmetry_UD_axis
+
+    if isinstance(table, LookupTableIDA):
+        not_closed = table.symmetry.moves_not_closed(table.moves_all, cube.size, get_rotate_xxx(cube.size))
+
+        if not_closed:
+            print("ERROR: %s legal moves are not closed under the symmetry, %s maps %s to %s" % ((table,) + not_closed[0]))
+            sys.exit(1)
+
+    if table.binary is not None:
+        print("ERROR: %s is using %s, reduce the .txt and then convert it again" % (table, table.filename_bin))
+        sys.exit(1)
+
+    reduce_symmetry(cube, table)